@@ -20,14 +20,51 @@
 # Structure of this file adapted roughly from
 # https://github.com/biocore/qurro/blob/master/qurro/scripts/_plot.py.
 
+import sys
 import click
-from .config import MAXN_DEFAULT, MAXE_DEFAULT
-from .main import make_viz
+from .config import (
+    MAXN_DEFAULT,
+    MAXE_DEFAULT,
+    DOT_PROCESSES_DEFAULT,
+    LAYOUT_TIME_BUDGET_DEFAULT,
+    OVERSIZED_COMPONENTS_DEFAULT,
+    OVERSIZED_COMPONENTS_CHOICES,
+    NEIGHBORHOOD_RADIUS_DEFAULT,
+    NEIGHBORHOOD_UNITS_DEFAULT,
+    NEIGHBORHOOD_UNITS_CHOICES,
+    DATA_FORMAT_DEFAULT,
+    DATA_FORMAT_CHOICES,
+    OUTPUT_PRECISION_DEFAULT,
+    SERVE_HOST_DEFAULT,
+    SERVE_PORT_DEFAULT,
+)
 from ._param_descriptions import (
     INPUT,
     OUTPUT_DIR,
+    ASSUME_ORIENTED,
     MAXN,
     MAXE,
+    DOT_PROCESSES,
+    LAYOUT_TIME_BUDGET,
+    OVERSIZED_COMPONENTS,
+    TOP_COMPONENTS,
+    COMPONENTS_CONTAINING,
+    NEIGHBORHOOD,
+    NEIGHBORHOOD_RADIUS,
+    NEIGHBORHOOD_UNITS,
+    DATA_FORMAT,
+    OUTPUT_PRECISION,
+    COMPRESS_DATA,
+    WORK_DIR,
+    RESUME,
+    PROFILE,
+    PROFILE_DETAILED,
+    MANIFEST,
+    WORKERS,
+    SERVE_OUTPUT_DIR,
+    OVERVIEW_OUTPUT_DIR,
+    HOST,
+    PORT,
 )
 
 
@@ -35,13 +72,14 @@ from ._param_descriptions import (
 @click.command(context_settings={"help_option_names": ["-h", "--help"]})
 @click.option("-i", "--input-file", required=True, help=INPUT)
 @click.option("-o", "--output-dir", required=True, help=OUTPUT_DIR)
-# @click.option(
-#    "-ao",
-#    "--assume-oriented",
-#    required=False,
-#    default=False,
-#    help=ASSUME_ORIENTED,
-# )
+@click.option(
+    "-ao",
+    "--assume-oriented",
+    is_flag=True,
+    required=False,
+    default=False,
+    help=ASSUME_ORIENTED,
+)
 @click.option(
     "-maxn",
     "--max-node-count",
@@ -58,6 +96,122 @@ from ._param_descriptions import (
     help=MAXE,
     show_default=True,
 )
+@click.option(
+    "-dp",
+    "--dot-processes",
+    required=False,
+    default=DOT_PROCESSES_DEFAULT,
+    help=DOT_PROCESSES,
+    show_default=True,
+)
+@click.option(
+    "-lt",
+    "--layout-time-budget",
+    required=False,
+    type=float,
+    default=LAYOUT_TIME_BUDGET_DEFAULT,
+    help=LAYOUT_TIME_BUDGET,
+)
+@click.option(
+    "-oc",
+    "--oversized-components",
+    required=False,
+    type=click.Choice(OVERSIZED_COMPONENTS_CHOICES),
+    default=OVERSIZED_COMPONENTS_DEFAULT,
+    help=OVERSIZED_COMPONENTS,
+    show_default=True,
+)
+@click.option(
+    "-tc",
+    "--top-components",
+    required=False,
+    type=int,
+    default=None,
+    help=TOP_COMPONENTS,
+)
+@click.option(
+    "-cc",
+    "--components-containing",
+    required=False,
+    default=None,
+    help=COMPONENTS_CONTAINING,
+)
+@click.option(
+    "-nb",
+    "--neighborhood",
+    required=False,
+    default=None,
+    help=NEIGHBORHOOD,
+)
+@click.option(
+    "-nr",
+    "--neighborhood-radius",
+    required=False,
+    type=int,
+    default=NEIGHBORHOOD_RADIUS_DEFAULT,
+    help=NEIGHBORHOOD_RADIUS,
+    show_default=True,
+)
+@click.option(
+    "-nu",
+    "--neighborhood-units",
+    required=False,
+    type=click.Choice(NEIGHBORHOOD_UNITS_CHOICES),
+    default=NEIGHBORHOOD_UNITS_DEFAULT,
+    help=NEIGHBORHOOD_UNITS,
+    show_default=True,
+)
+@click.option(
+    "-df",
+    "--data-format",
+    required=False,
+    type=click.Choice(DATA_FORMAT_CHOICES),
+    default=DATA_FORMAT_DEFAULT,
+    help=DATA_FORMAT,
+    show_default=True,
+)
+@click.option(
+    "-op",
+    "--output-precision",
+    required=False,
+    type=int,
+    default=OUTPUT_PRECISION_DEFAULT,
+    help=OUTPUT_PRECISION,
+    show_default=True,
+)
+@click.option(
+    "-cd",
+    "--compress-data",
+    is_flag=True,
+    required=False,
+    default=False,
+    help=COMPRESS_DATA,
+)
+@click.option("-wd", "--work-dir", required=False, default=None, help=WORK_DIR)
+@click.option(
+    "-r",
+    "--resume",
+    is_flag=True,
+    required=False,
+    default=False,
+    help=RESUME,
+)
+@click.option(
+    "-pf",
+    "--profile",
+    is_flag=True,
+    required=False,
+    default=False,
+    help=PROFILE,
+)
+@click.option(
+    "-pfd",
+    "--profile-detailed",
+    is_flag=True,
+    required=False,
+    default=False,
+    help=PROFILE_DETAILED,
+)
 # @click.option(
 #    "-mbf", "--metacarvel-bubble-file", required=False, default=None, help=MBF
 # )
@@ -115,9 +269,24 @@ from ._param_descriptions import (
 def run_script(
     input_file: str,
     output_dir: str,
-    # assume_oriented: bool,
+    assume_oriented: bool,
     max_node_count: int,
     max_edge_count: int,
+    dot_processes: int,
+    layout_time_budget: float,
+    oversized_components: str,
+    top_components: int,
+    components_containing: str,
+    neighborhood: str,
+    neighborhood_radius: int,
+    neighborhood_units: str,
+    data_format: str,
+    output_precision: int,
+    compress_data: bool,
+    work_dir: str,
+    resume: bool,
+    profile: bool,
+    profile_detailed: bool,
     # metacarvel_bubble_file: str,
     # user_pattern_file: str,
     # compute_spqr_data: bool,
@@ -142,12 +311,32 @@ def run_script(
     ...which will generate an output directory named "viz". (You'll need to
     replace "graph.gfa" with whatever the path to your assembly graph is.)
     """
+    # We import this here, rather than at the top of this file, so that
+    # "mgsc -h" and argument errors don't have to wait for MetagenomeScope's
+    # dependencies (NetworkX, NumPy, etc.) to be imported.
+    from .main import make_viz
+
     make_viz(
         input_file,
         output_dir,
-        # assume_oriented,
+        assume_oriented,
         max_node_count,
         max_edge_count,
+        dot_processes,
+        layout_time_budget,
+        oversized_components,
+        data_format,
+        output_precision,
+        compress_data,
+        work_dir,
+        resume,
+        profile,
+        profile_detailed,
+        top_components,
+        components_containing,
+        neighborhood,
+        neighborhood_radius,
+        neighborhood_units,
         # metacarvel_bubble_file,
         # user_pattern_file,
         # compute_spqr_data,
@@ -159,5 +348,119 @@ def run_script(
     )
 
 
+@click.command(context_settings={"help_option_names": ["-h", "--help"]})
+@click.option("-m", "--manifest", required=True, help=MANIFEST)
+@click.option(
+    "-w", "--workers", required=False, type=int, default=None, help=WORKERS
+)
+def run_batch_script(manifest: str, workers: int, **viz_kwargs) -> None:
+    """Visualizes many assembly graphs at once.
+
+    This accepts all of the options that mgsc does (except for the input
+    file and output directory, which are instead given in the manifest
+    file); these options are used for every graph. The graphs are processed
+    in parallel, and the output directories share one copy of the
+    visualization's HTML/JS/CSS files (using hard links).
+
+    If any graphs fail to be visualized, this will still try to visualize
+    the other graphs, and will then exit with a status of 1.
+    """
+    # (Imported here for the same reason as in run_script().)
+    from .batch import read_manifest, run_batch
+
+    results = run_batch(read_manifest(manifest), workers, **viz_kwargs)
+    if any(result["error"] is not None for result in results):
+        sys.exit(1)
+
+
+# The batch command accepts all of run_script()'s options, except for the ones
+# that are specific to a single graph. (Each graph would need its own work
+# directory, so checkpointing isn't supported in batch mode yet.)
+run_batch_script.params.extend(
+    param
+    for param in run_script.params
+    if param.name not in ("input_file", "output_dir", "work_dir", "resume")
+)
+
+
+@click.command(context_settings={"help_option_names": ["-h", "--help"]})
+@click.option("-o", "--output-dir", required=True, help=SERVE_OUTPUT_DIR)
+@click.option(
+    "--host",
+    required=False,
+    default=SERVE_HOST_DEFAULT,
+    help=HOST,
+    show_default=True,
+)
+@click.option(
+    "-p",
+    "--port",
+    required=False,
+    type=int,
+    default=SERVE_PORT_DEFAULT,
+    help=PORT,
+    show_default=True,
+)
+def run_serve_script(
+    output_dir: str, host: str, port: int, **serve_kwargs
+) -> None:
+    """Serves a visualization in which components are laid out on demand.
+
+    This parses the graph and identifies patterns in it, then starts a
+    local web server for the visualization: rather than laying out every
+    component up front, each component is laid out the first time it's
+    drawn in the viewer. This is useful for huge graphs that would take a
+    long time to lay out in full.
+
+    This accepts most of the options that mgsc does. Open the URL printed
+    by this command in a web browser to access the visualization.
+    """
+    # (Imported here for the same reason as in run_script().)
+    from .serve import serve
+
+    serve(output_dir=output_dir, host=host, port=port, **serve_kwargs)
+
+
+# The serve command accepts the input file and all of the layout-related
+# options from run_script(). (The data for each component is only laid out
+# and written out when it's requested, so compression and profiling aren't
+# supported in serve mode.)
+run_serve_script.params.extend(
+    param
+    for param in run_script.params
+    if param.name
+    not in ("output_dir", "compress_data", "profile", "profile_detailed")
+)
+
+
+@click.command(context_settings={"help_option_names": ["-h", "--help"]})
+@click.option("-o", "--output-dir", required=True, help=OVERVIEW_OUTPUT_DIR)
+def run_overview_script(output_dir: str, **overview_kwargs) -> None:
+    """Summarizes every component of an assembly graph, without laying
+    anything out.
+
+    This parses the graph and identifies patterns in it, then writes out a
+    TSV file listing each component's node, edge, and pattern counts, total
+    length, and N50, along with an SVG file in which each component is drawn
+    as a square sized by its number of nodes. This is much faster than
+    laying out the whole graph, so it's useful for getting a sense of what a
+    huge graph looks like before choosing which components to visualize
+    (e.g. using mgsc's -cc option).
+    """
+    # (Imported here for the same reason as in run_script().)
+    from .overview import make_overview
+
+    make_overview(output_dir=output_dir, **overview_kwargs)
+
+
+# Nothing is laid out in the overview, so it doesn't need most of
+# run_script()'s options.
+run_overview_script.params.extend(
+    param
+    for param in run_script.params
+    if param.name in ("input_file", "assume_oriented")
+)
+
+
 if __name__ == "__main__":
     run_script()
@@ -30,11 +30,11 @@ OUTPUT_DIR = (
 )
 
 ASSUME_ORIENTED = (
-    "Assume that the nodes in a graph are already oriented, and doesn't "
-    "create duplicates. This will only work with graphs where, for every "
-    "node, its reverse complement node is not present in the same connected "
-    "component; if this is the case for any node, then an error will be "
-    "raised. THIS OPTION ISN'T FINISHED YET!"
+    "Assume that the nodes in a graph are already oriented, and don't "
+    "create reverse complement duplicates. This will only work with graphs "
+    "where, for every node, its reverse complement node is not present in "
+    "the same connected component; if this is the case for any node, then an "
+    "error will be raised. Only impacts GFA, LastGraph, and FASTG files."
 )
 
 MAXN = (
@@ -54,6 +54,147 @@ MAXE = (
     "analogously to --max-node-count."
 )
 
+DOT_PROCESSES = (
+    "Number of Graphviz dot processes to use for layout. If this is 0, "
+    "layout will be done one pattern / component at a time using PyGraphviz. "
+    "Otherwise, this many dot processes will be started and kept running "
+    "during layout, and patterns that can be laid out independently of each "
+    "other will be laid out in parallel. (Using a value above 0 requires the "
+    "dot program to be available on your PATH, but does not require "
+    "PyGraphviz.)"
+)
+
+LAYOUT_TIME_BUDGET = (
+    "Maximum number of seconds to spend laying out any single component "
+    "using dot. Components that take longer than this are instead laid out "
+    "using sfdp, which is much faster on large / tangled components (but "
+    "doesn't produce a hierarchical layout); the visualization will indicate "
+    "which components were laid out this way. If this isn't specified, there "
+    "is no time limit. (Specifying this requires the dot and sfdp programs "
+    "to be available on your PATH.)"
+)
+
+OVERSIZED_COMPONENTS = (
+    "What to do with components that exceed --max-node-count or "
+    '--max-edge-count. "skip" means these components won\'t be laid out or '
+    'included in the visualization. "layered" means these components will '
+    "be laid out using a simple layered layout algorithm that is much faster "
+    "than dot, although its output is less pretty (edges are drawn as "
+    "straight lines, and there will usually be more edge crossings). "
+    '"skeleton" means that only the top level of these components will be '
+    "laid out: patterns will be shown as empty boxes, and nothing inside them "
+    "will be laid out or included in the visualization."
+)
+
+TOP_COMPONENTS = (
+    "Only visualize this many of the largest components in the graph "
+    "(ranked by number of nodes, then by number of edges). The other "
+    "components won't be decomposed into patterns, laid out, or included in "
+    "the visualization."
+)
+
+COMPONENTS_CONTAINING = (
+    "Only visualize the components containing these nodes (given as a "
+    'comma-separated list of node names, e.g. "40,-40,51"). Node names '
+    "must match exactly. If --top-components is also given, the components "
+    "selected by either option are visualized."
+)
+
+NEIGHBORHOOD = (
+    "Only visualize the neighborhood around these nodes (given as a "
+    "comma-separated list of node names), rather than the entire graph. The "
+    "neighborhood includes all nodes within --neighborhood-radius of these "
+    "nodes (ignoring edge directions), along with their reverse complements. "
+    "Useful for looking at a few nodes in a huge graph."
+)
+
+NEIGHBORHOOD_RADIUS = (
+    "Radius of the neighborhood visualized when --neighborhood is given."
+)
+
+NEIGHBORHOOD_UNITS = (
+    'Units of --neighborhood-radius. "hops" means the number of edges between '
+    'a node and the closest of the given nodes. "bp" means the total length '
+    "of the nodes between a node and the closest of the given nodes (so "
+    "nodes adjacent to the given nodes are always included)."
+)
+
+DATA_FORMAT = (
+    "Format used to store the graph's data in the output directory. "
+    '"json" stores the data for each node, edge, and pattern as a list of '
+    'values. "columnar" stores each attribute as a column of values, using '
+    "binary arrays for numeric attributes; this is smaller and faster "
+    "for the visualization to load, but is much harder to read."
+)
+
+OUTPUT_PRECISION = (
+    "Number of decimal places that positions, sizes, and edge weights are "
+    "rounded to in the output. Lower values make the output smaller; the "
+    "default should be plenty for the visualization."
+)
+
+COMPRESS_DATA = (
+    "Gzip the graph's data in the output directory. This makes the output "
+    "several times smaller (which helps if it's stored on a network drive or "
+    "served over the web); the visualization decompresses the data as "
+    "needed. Requires a browser that supports DecompressionStream."
+)
+
+WORK_DIR = (
+    "Directory in which to save checkpoints of the visualization's progress: "
+    "the parsed graph, the graph after pattern decomposition, and every "
+    "component / pattern as soon as it's laid out. If a run crashes or is "
+    "killed, rerunning it with --resume will pick up where it left off. This "
+    "directory will be created if it doesn't already exist."
+)
+
+RESUME = (
+    "Resume from the checkpoints in the work directory (-wd), skipping the "
+    "stages and layouts that have already been done. The input graph and "
+    "layout-related options must be the same as in the run being resumed. "
+    "Without this flag, any checkpoints in the work directory are discarded."
+)
+
+PROFILE = (
+    "Record how much time (wall-clock and CPU) and memory (peak resident set "
+    "size) each stage of the visualization process, and the layout of each "
+    "component, took, along with counts of the work done during pattern "
+    "decomposition. A report is written to profile.json in the output "
+    "directory."
+)
+
+PROFILE_DETAILED = (
+    "Like --profile, but also profiles each stage using cProfile (writing "
+    "the results to .pstats files in the output directory) and lists the "
+    "lines of code responsible for the most memory use in each stage, using "
+    "tracemalloc. This slows things down a lot."
+)
+
+MANIFEST = (
+    "File listing the graphs to visualize. Each line should contain the path "
+    "to an input graph and the output directory to create for it, separated "
+    "by a tab. Empty lines and lines starting with # are ignored."
+)
+
+WORKERS = (
+    "Number of graphs to visualize at once, each in a separate process. If "
+    "this isn't specified, this will be the number of CPUs on this machine."
+)
+
+SERVE_OUTPUT_DIR = (
+    "Output directory to create. The viewer's files will be written here, "
+    "along with the data for each component once it has been laid out."
+)
+
+OVERVIEW_OUTPUT_DIR = (
+    "Output directory to create. A TSV file describing each component, and "
+    "an SVG file drawing the components, will be written here."
+)
+
+HOST = "Address on which to run the server."
+
+PORT = "Port on which to run the server. Use 0 to pick any free port."
+
 # TODO: actually change way this works so that -ubl always true
 MBF = (
     "File describing pre-identified bubbles in the graph, in the format "
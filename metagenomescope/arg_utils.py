@@ -43,3 +43,51 @@ def validate_max_counts(max_node_ct, max_edge_ct):
         raise ValueError("Maximum node count must be at least 1")
     if edgebad:
         raise ValueError("Maximum edge count must be at least 1")
+
+
+def validate_dot_processes(dot_processes):
+    if dot_processes < 0:
+        raise ValueError("Number of dot processes must be at least 0")
+
+
+def validate_layout_time_budget(layout_time_budget):
+    if layout_time_budget is not None and layout_time_budget <= 0:
+        raise ValueError("Layout time budget must be greater than 0")
+
+
+def validate_output_precision(output_precision):
+    if output_precision < 0:
+        raise ValueError("Output precision must be at least 0")
+
+
+def validate_workers(workers):
+    if workers is not None and workers < 1:
+        raise ValueError("Number of workers must be at least 1")
+
+
+def validate_top_components(top_components):
+    if top_components is not None and top_components < 1:
+        raise ValueError("Number of top components must be at least 1")
+
+
+def validate_neighborhood_radius(neighborhood_radius):
+    if neighborhood_radius < 0:
+        raise ValueError("Neighborhood radius must be at least 0")
+
+
+def parse_node_names(node_names):
+    """Converts a comma-separated string of node names to a list.
+
+    Returns None if node_names is None.
+    """
+    if node_names is None:
+        return None
+    names = [n.strip() for n in node_names.split(",") if n.strip() != ""]
+    if len(names) == 0:
+        raise ValueError("No node names given")
+    return names
+
+
+def validate_resume(resume, work_dir):
+    if resume and work_dir is None:
+        raise ValueError("--resume requires a work directory (-wd)")
@@ -37,11 +37,23 @@
 #  that maps to your new function.
 #
 #  3. Add tests for your parser in metagenomescope/tests/assembly_graph_parser/
+#
+# If your filetype implies that every node has a reverse complement node,
+# the function should also accept an assume_oriented keyword argument, and
+# the filetype should be added to ORIENTABLE_FILETYPES -- see
+# remove_unused_complements() and check_oriented().
+#
+# Libraries that are only needed to parse a single filetype (e.g. gfapy)
+# should be imported inside that filetype's parsing function, rather than at
+# the top of this file: importing them takes a while, and there's no need to
+# do this unless we're actually parsing that filetype.
 
 import networkx as nx
-import gfapy
-import pyfastg
-from .input_node_utils import gc_content, negate_node_id
+from .input_node_utils import (
+    gc_content,
+    negate_node_id,
+    negate_fastg_node_id,
+)
 
 
 def is_not_pos_int(number_string):
@@ -134,8 +146,8 @@ def validate_lastgraph_file(graph_file):
     curr_node_fwdseq = None
     curr_node_length = 0
     line_num = 1
-    seen_nodes = []
-    seen_edges = []
+    seen_nodes = set()
+    seen_edges = set()
     for line in graph_file:
         if line_num == 1:
             header_num_nodes_str = line.split()[0]
@@ -217,8 +229,8 @@ def validate_lastgraph_file(graph_file):
                     "Line {}: Edge from {} to {} somehow declared multiple "
                     "times.".format(line_num, split_line[1], split_line[2])
                 )
-            seen_edges.append(fwd_ids)
-            seen_edges.append(rev_ids)
+            seen_edges.add(fwd_ids)
+            seen_edges.add(rev_ids)
         elif in_node_block:
             if curr_node_fwdseq is None:
                 curr_node_fwdseq = line.strip()
@@ -237,8 +249,8 @@ def validate_lastgraph_file(graph_file):
                 # If we've made it here, we've seen all there is to see
                 # about the current node block. We can say that this node
                 # is tentatively valid (and we can add it to seen_nodes).
-                seen_nodes.append(curr_node_id)
-                seen_nodes.append(negate_node_id(curr_node_id))
+                seen_nodes.add(curr_node_id)
+                seen_nodes.add(negate_node_id(curr_node_id))
 
                 # Reset various flag variables
                 in_node_block = False
@@ -293,6 +305,68 @@ def validate_nx_digraph(g, required_node_fields, required_edge_fields):
             )
 
 
+def remove_unused_complements(digraph, negate_func=negate_node_id):
+    """Removes nodes from a graph that only contains one strand of edges.
+
+    When the input graph is assumed to be oriented, parsers only add edges as
+    they're given in the file (rather than also adding the implied reverse
+    complement of each edge). However, we don't always know which strand of a
+    node will be used until we've seen all of the edges -- so parsers still
+    add both strands of each node, and then call this function.
+
+    For each pair of a positive node and its complement, this removes the
+    complement node if it doesn't have any edges; otherwise, if the positive
+    node doesn't have any edges, this removes the positive node. (Nodes
+    without any edges in either orientation are kept as positive nodes.)
+    """
+    positive_node_ids = [
+        node_id
+        for node_id, orientation in digraph.nodes(data="orientation")
+        if orientation == "+"
+    ]
+    for node_id in positive_node_ids:
+        complement_id = negate_func(node_id)
+        if digraph.degree(complement_id) == 0:
+            digraph.remove_node(complement_id)
+        elif digraph.degree(node_id) == 0:
+            digraph.remove_node(node_id)
+
+
+def remove_complement_components(digraph, negate_func):
+    """Removes one component from each pair of reverse complement components.
+
+    This is used with graph files that explicitly include both strands of
+    every node and edge, so we can't just skip implied edges while parsing.
+    The component containing the node earliest in the graph's node order is
+    kept.
+    """
+    kept_node_ids = set()
+    for cc in list(nx.weakly_connected_components(digraph)):
+        some_node_id = next(iter(cc))
+        if negate_func(some_node_id) in kept_node_ids:
+            digraph.remove_nodes_from(cc)
+        else:
+            kept_node_ids.update(cc)
+
+
+def check_oriented(digraph, negate_func=negate_node_id):
+    """Raises a ValueError if any node in a graph is in the same weakly
+    connected component as its reverse complement node.
+
+    If this is the case, then the graph can't be treated as oriented: the
+    component would need to contain both strands of (at least) this node.
+    """
+    for cc in nx.weakly_connected_components(digraph):
+        for node_id in cc:
+            complement_id = negate_func(node_id)
+            if complement_id in cc:
+                raise ValueError(
+                    "Node {} and its reverse complement {} are in the same "
+                    "connected component, so this graph can't be treated as "
+                    "oriented.".format(node_id, complement_id)
+                )
+
+
 def parse_metacarvel_gml(filename):
     """Returns a nx.DiGraph representation of a GML (MetaCarvel output) file.
 
@@ -376,14 +450,21 @@ def parse_metacarvel_gml(filename):
     return g  # , ("orientation",), ("bsize", "orientation", "mean", "stdev")
 
 
-def parse_gfa(filename):
+def parse_gfa(filename, assume_oriented=False):
     """Returns a nx.DiGraph representation of a GFA1 or GFA2 file.
 
+    If assume_oriented is True, then we'll only include edges as they are
+    given in the file (rather than also including their implied reverse
+    complement edges), and each node will only be included in the
+    orientation(s) in which it's used.
+
     NOTE that, at present, we only visualize nodes and edges in the GFA graph.
     A TODO is displaying all or most of the relevant information in these
     graphs, like GfaViz does: see
     https://github.com/marbl/MetagenomeScope/issues/147 for discussion of this.
     """
+    import gfapy
+
     digraph = nx.DiGraph()
     gfa_graph = gfapy.Gfa.from_file(filename)
 
@@ -432,6 +513,9 @@ def parse_gfa(filename):
         edge_tuple = (src_id, tgt_id)
         digraph.add_edge(*edge_tuple)
 
+        if assume_oriented:
+            continue
+
         # Now, try to add the complement of the edge (done manually, since
         # .complement() isn't available for GFA2 edges as of writing)
         complement_tuple = (negate_node_id(tgt_id), negate_node_id(src_id))
@@ -440,10 +524,22 @@ def parse_gfa(filename):
         # loop.gfa test case)
         if complement_tuple != edge_tuple:
             digraph.add_edge(*complement_tuple)
+
+    if assume_oriented:
+        remove_unused_complements(digraph)
+        check_oriented(digraph)
     return digraph
 
 
-def parse_fastg(filename):
+def parse_fastg(filename, assume_oriented=False):
+    """Returns a nx.DiGraph representation of a FASTG file.
+
+    FASTG files explicitly describe both strands of each node and edge, so if
+    assume_oriented is True then we just keep one out of every pair of
+    reverse complement components.
+    """
+    import pyfastg
+
     g = pyfastg.parse_fastg(filename)
     validate_nx_digraph(g, ("length", "cov", "gc"), ())
     # Add an "orientation" attribute for every node.
@@ -462,12 +558,19 @@ def parse_fastg(filename):
                     "orientation?"
                 ).format(n)
             )
+
+    if assume_oriented:
+        check_oriented(g, negate_fastg_node_id)
+        remove_complement_components(g, negate_fastg_node_id)
     return g
 
 
-def parse_lastgraph(filename):
+def parse_lastgraph(filename, assume_oriented=False):
     """Returns a nx.DiGraph representation of a LastGraph (Velvet) file.
 
+    If assume_oriented is True, this only includes edges and nodes as they
+    are used in the file's arcs (see parse_gfa()).
+
     As far as I'm aware, there isn't a standard LastGraph parser available
     for Python. This function, then, just uses a simple line-by-line
     parser. It's not a very smart parser, so if your LastGraph file isn't
@@ -529,7 +632,7 @@ def parse_lastgraph(filename):
                 digraph.add_edge(id1, id2, multiplicity=multiplicity)
                 # Only add implied edge if the edge does not imply itself
                 # (e.g. "ABC" -> "-ABC" or "-ABC" -> "ABC")
-                if not (id1 == nid2 and id2 == nid1):
+                if not assume_oriented and not (id1 == nid2 and id2 == nid1):
                     digraph.add_edge(nid2, nid1, multiplicity=multiplicity)
             elif parsing_node:
                 if not parsed_fwdseq:
@@ -569,6 +672,10 @@ def parse_lastgraph(filename):
                         "fwdseq": None,
                         "revseq": None,
                     }
+
+    if assume_oriented:
+        remove_unused_complements(digraph)
+        check_oriented(digraph)
     return digraph
 
 
@@ -579,6 +686,10 @@ SUPPORTED_FILETYPE_TO_PARSER = {
     "fastg": parse_fastg,
 }
 
+# Filetypes whose parsers accept the assume_oriented argument. (MetaCarvel's
+# GML files are already oriented, so there's nothing to do for them.)
+ORIENTABLE_FILETYPES = ("lastgraph", "gfa", "fastg")
+
 
 def sniff_filetype(filename):
     """Attempts to determine the filetype of the file specified by a filename.
@@ -604,6 +715,10 @@ def sniff_filetype(filename):
     )
 
 
-def parse(filename):
+def parse(filename, assume_oriented=False):
     filetype = sniff_filetype(filename)
+    if assume_oriented and filetype in ORIENTABLE_FILETYPES:
+        return SUPPORTED_FILETYPE_TO_PARSER[filetype](
+            filename, assume_oriented=True
+        )
     return SUPPORTED_FILETYPE_TO_PARSER[filetype](filename)
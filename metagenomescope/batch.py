@@ -0,0 +1,180 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+####
+# "Batch mode": visualizes many graphs at once, using a pool of worker
+# processes. This avoids paying the cost of starting up python (and importing
+# NumPy, NetworkX, PyGraphviz, etc.) for every graph, and lets graphs be
+# processed in parallel.
+
+import contextlib
+import io
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from . import arg_utils
+from .main import make_viz, copy_support_files
+
+
+def read_manifest(manifest_file):
+    """Reads a manifest file listing the graphs to visualize.
+
+    Each line of the manifest file should contain the path to an input graph
+    and the path to the output directory for its visualization, separated
+    by a tab. Empty lines, and lines starting with #, are ignored.
+
+    Returns a list of (input file, output directory) tuples.
+
+    Raises a ValueError if a line is malformed, if the manifest doesn't list
+    any graphs, or if an output directory is listed multiple times.
+    """
+    pairs = []
+    seen_output_dirs = set()
+    with open(manifest_file, "r") as mf:
+        for line_num, line in enumerate(mf, 1):
+            line = line.strip()
+            if line == "" or line.startswith("#"):
+                continue
+            fields = line.split("\t")
+            if len(fields) != 2:
+                raise ValueError(
+                    "Line {} of the manifest file doesn't contain an input "
+                    "file and an output directory separated by a "
+                    "tab.".format(line_num)
+                )
+            input_file, output_dir = (f.strip() for f in fields)
+            norm_output_dir = os.path.abspath(output_dir)
+            if norm_output_dir in seen_output_dirs:
+                raise ValueError(
+                    "Output directory {} is listed multiple times in the "
+                    "manifest file.".format(output_dir)
+                )
+            seen_output_dirs.add(norm_output_dir)
+            pairs.append((input_file, output_dir))
+    if len(pairs) == 0:
+        raise ValueError("The manifest file doesn't list any graphs.")
+    return pairs
+
+
+def run_one(input_file, output_dir, shared_assets_dir, viz_kwargs):
+    """Runs make_viz() on a single graph, in a worker process.
+
+    The messages make_viz() prints would get jumbled together when multiple
+    graphs are processed at once, so we hide them.
+
+    Returns a dict describing how things went: this includes the time taken
+    (in seconds) and, if make_viz() failed, a description of the error.
+    """
+    start_time = time.time()
+    error = None
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            make_viz(
+                input_file,
+                output_dir,
+                shared_assets_dir=shared_assets_dir,
+                **viz_kwargs
+            )
+    except Exception as e:
+        error = "{}: {}".format(type(e).__name__, e)
+    return {
+        "input_file": input_file,
+        "output_dir": output_dir,
+        "seconds": time.time() - start_time,
+        "error": error,
+    }
+
+
+def run_batch(pairs, workers, **viz_kwargs):
+    """Visualizes many graphs using a pool of worker processes.
+
+    pairs should be a list of (input file, output directory) tuples, as
+    returned by read_manifest(); all other keyword arguments are passed on
+    to make_viz() for every graph.
+
+    The support files needed for each visualization are copied once, to a
+    temporary directory alongside the first output directory; each output
+    directory just contains hard links to these files.
+
+    Graphs that fail don't stop the other graphs from being visualized.
+    After all graphs have been processed, this prints a summary of how long
+    each graph took and which graphs failed.
+
+    Returns a list of dicts (see run_one()), one per graph, in the same order
+    as pairs.
+    """
+    arg_utils.validate_workers(workers)
+    # Fail early (rather than after laying out half of the graphs) if any of
+    # the output directories already exist
+    for input_file, output_dir in pairs:
+        arg_utils.check_dir_existence(output_dir)
+
+    # Hard links can't span filesystems, so we put the shared copy of the
+    # support files alongside the output. (The hard links in the output
+    # directories will keep working after this directory is removed.)
+    assets_parent_dir = os.path.dirname(os.path.abspath(pairs[0][1]))
+    os.makedirs(assets_parent_dir, exist_ok=True)
+
+    batch_start_time = time.time()
+    with tempfile.TemporaryDirectory(
+        prefix=".mgsc-assets-", dir=assets_parent_dir
+    ) as shared_assets_dir:
+        copy_support_files(shared_assets_dir)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    run_one,
+                    input_file,
+                    output_dir,
+                    shared_assets_dir,
+                    viz_kwargs,
+                )
+                for input_file, output_dir in pairs
+            ]
+            results = []
+            for i, future in enumerate(futures, 1):
+                result = future.result()
+                print(
+                    "[{}/{}] {} -> {}: {}".format(
+                        i,
+                        len(pairs),
+                        result["input_file"],
+                        result["output_dir"],
+                        "failed" if result["error"] else "done",
+                    ),
+                    flush=True,
+                )
+                results.append(result)
+
+    print("Summary:")
+    for result in results:
+        line = "{:>10.2f}s  {} -> {}".format(
+            result["seconds"], result["input_file"], result["output_dir"]
+        )
+        if result["error"] is not None:
+            line += "  FAILED ({})".format(result["error"])
+        print(line)
+    num_failed = sum(result["error"] is not None for result in results)
+    print(
+        "Visualized {} of {} graph(s) in {:.2f}s.".format(
+            len(results) - num_failed,
+            len(results),
+            time.time() - batch_start_time,
+        )
+    )
+    return results
@@ -0,0 +1,22 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+####
+# Benchmarks for MetagenomeScope: generator.py creates synthetic assembly
+# graphs of controlled sizes and structures, and harness.py times the
+# pipeline's stages on these graphs. Run "python -m metagenomescope.benchmarks
+# --help" for details.
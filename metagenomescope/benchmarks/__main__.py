@@ -0,0 +1,183 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+
+import click
+from ..config import (
+    MAXN_DEFAULT,
+    MAXE_DEFAULT,
+    DOT_PROCESSES_DEFAULT,
+    OVERSIZED_COMPONENTS_DEFAULT,
+    OVERSIZED_COMPONENTS_CHOICES,
+)
+from .._param_descriptions import (
+    MAXN,
+    MAXE,
+    DOT_PROCESSES,
+    OVERSIZED_COMPONENTS,
+)
+from .generator import STRUCTURE_MIXES, generate_graph, write_graph
+from .harness import FILETYPE_EXTENSIONS, run_benchmarks
+
+
+@click.group(context_settings={"help_option_names": ["-h", "--help"]})
+def benchmarks():
+    """Generates synthetic assembly graphs and benchmarks MetagenomeScope on
+    them.
+    """
+
+
+@benchmarks.command()
+@click.option(
+    "-n", "--num-nodes", required=True, type=int, help="Number of nodes."
+)
+@click.option(
+    "-m",
+    "--mix",
+    type=click.Choice(list(STRUCTURE_MIXES)),
+    default="mixed",
+    show_default=True,
+    help="Mix of structures to include in the graph.",
+)
+@click.option(
+    "-cs",
+    "--component-size",
+    type=int,
+    default=500,
+    show_default=True,
+    help="Approximate number of nodes in each (non-tiny) component.",
+)
+@click.option("-s", "--seed", type=int, default=0, show_default=True)
+@click.option(
+    "-o",
+    "--output-file",
+    required=True,
+    help="File to write the graph to. Its filetype is determined by its "
+    "extension (.gfa, .LastGraph, .gml, or .fastg).",
+)
+def generate(num_nodes, mix, component_size, seed, output_file):
+    """Writes out a single synthetic graph."""
+    graph = generate_graph(
+        num_nodes, mix=mix, component_size=component_size, seed=seed
+    )
+    write_graph(graph, output_file)
+    click.echo(
+        "Wrote a graph with {:,} nodes, {:,} edges, and {:,} components to "
+        "{}.".format(
+            len(graph.lengths),
+            len(graph.edges),
+            graph.num_components,
+            output_file,
+        )
+    )
+
+
+@benchmarks.command()
+@click.option(
+    "-n",
+    "--num-nodes",
+    "sizes",
+    type=int,
+    multiple=True,
+    default=[1000, 10000],
+    show_default=True,
+    help="Number of nodes in each graph. Can be given multiple times.",
+)
+@click.option(
+    "-f",
+    "--filetype",
+    "filetypes",
+    type=click.Choice(list(FILETYPE_EXTENSIONS)),
+    multiple=True,
+    default=["gfa"],
+    show_default=True,
+    help="Filetype(s) to write the graphs in. Can be given multiple times.",
+)
+@click.option(
+    "-m",
+    "--mix",
+    "mixes",
+    type=click.Choice(list(STRUCTURE_MIXES)),
+    multiple=True,
+    default=["mixed"],
+    show_default=True,
+    help="Mix(es) of structures to benchmark. Can be given multiple times.",
+)
+@click.option("-s", "--seed", type=int, default=0, show_default=True)
+@click.option(
+    "-g",
+    "--graph-dir",
+    default="benchmark_graphs",
+    show_default=True,
+    help="Directory in which to store (and reuse) the generated graphs.",
+)
+@click.option(
+    "-H",
+    "--history-file",
+    default="benchmark_history.jsonl",
+    show_default=True,
+    help="JSON Lines file to append the results to.",
+)
+@click.option(
+    "-maxn",
+    "--max-node-count",
+    type=int,
+    default=MAXN_DEFAULT,
+    show_default=True,
+    help=MAXN,
+)
+@click.option(
+    "-maxe",
+    "--max-edge-count",
+    type=int,
+    default=MAXE_DEFAULT,
+    show_default=True,
+    help=MAXE,
+)
+@click.option(
+    "-dp",
+    "--dot-processes",
+    type=int,
+    default=DOT_PROCESSES_DEFAULT,
+    show_default=True,
+    help=DOT_PROCESSES,
+)
+@click.option(
+    "-oc",
+    "--oversized-components",
+    type=click.Choice(OVERSIZED_COMPONENTS_CHOICES),
+    default=OVERSIZED_COMPONENTS_DEFAULT,
+    show_default=True,
+    help=OVERSIZED_COMPONENTS,
+)
+def run(sizes, filetypes, mixes, seed, graph_dir, history_file, **kwargs):
+    """Times parsing, decomposition, layout, and serialization on synthetic
+    graphs.
+    """
+    run_benchmarks(
+        sizes,
+        filetypes,
+        mixes,
+        seed=seed,
+        graph_dir=graph_dir,
+        history_file=history_file,
+        **kwargs
+    )
+
+
+if __name__ == "__main__":
+    benchmarks()
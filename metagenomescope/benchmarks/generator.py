@@ -0,0 +1,473 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+####
+# Generates synthetic assembly graphs with a controlled number of nodes and a
+# controlled mix of structures, and writes them out in any of the filetypes
+# MetagenomeScope accepts.
+#
+# A graph is built out of "motifs" (chains, bubbles, etc.). Most motifs are
+# linked together, end to start, into components of about component_size
+# nodes; "tiny" motifs are each their own component. Everything is generated
+# from a seeded random number generator, so the same parameters always give
+# the same graph.
+
+import random
+from .. import assembly_graph_parser
+
+# Maps each motif type to the (min, max) number of nodes in one motif
+MOTIF_SIZES = {
+    "chain": (5, 50),
+    "bubble": (4, 30),
+    "superbubble": (6, 40),
+    "hairball": (10, 60),
+    "tiny": (1, 3),
+}
+
+# Named mixes of motif types, mapping each type to the fraction of nodes it
+# should account for
+STRUCTURE_MIXES = {
+    "chains": {"chain": 1},
+    "bubbles": {"bubble": 1},
+    "superbubbles": {"superbubble": 1},
+    "hairballs": {"hairball": 1},
+    "tiny": {"tiny": 1},
+    "mixed": {
+        "chain": 0.3,
+        "bubble": 0.25,
+        "superbubble": 0.15,
+        "hairball": 0.1,
+        "tiny": 0.2,
+    },
+}
+
+COMPLEMENT = str.maketrans("ACGT", "TGCA")
+
+
+class SyntheticGraph(object):
+    """A synthetic assembly graph.
+
+    Nodes are numbered from 1 to the number of nodes. Each edge is a 4-tuple
+    of (source node, source orientation, target node, target orientation),
+    where orientations are "+" or "-"; like in GFA / LastGraph files, each
+    edge implies its reverse complement edge, which isn't stored separately.
+    """
+
+    def __init__(self, seed, min_length, max_length, reverse_fraction):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.min_length = min_length
+        self.max_length = max_length
+        self.reverse_fraction = reverse_fraction
+        # Index i describes node i + 1
+        self.lengths = []
+        self.covs = []
+        self.reversed = []
+        self.edges = []
+        # Edges and their reverse complements, to avoid adding an edge twice
+        self.seen_edges = set()
+        self.num_components = 0
+
+    def add_node(self):
+        """Adds a node, and returns its ID.
+
+        Some nodes (depending on reverse_fraction) are "reversed": they're
+        always used in the reverse orientation in edges, so that the graph
+        doesn't only contain + nodes.
+        """
+        self.lengths.append(self.rng.randint(self.min_length, self.max_length))
+        self.covs.append(round(self.rng.uniform(1, 100), 2))
+        self.reversed.append(self.rng.random() < self.reverse_fraction)
+        return len(self.lengths)
+
+    def add_edge(self, src, tgt):
+        """Adds an edge from src to tgt (in the orientations they're used in).
+
+        Returns False (without adding anything) if this edge or its reverse
+        complement is already in the graph, or if this edge is a loop.
+        """
+        if src == tgt:
+            return False
+        src_orient = "-" if self.reversed[src - 1] else "+"
+        tgt_orient = "-" if self.reversed[tgt - 1] else "+"
+        edge = (src, src_orient, tgt, tgt_orient)
+        if edge in self.seen_edges:
+            return False
+        self.seen_edges.add(edge)
+        self.seen_edges.add((tgt, flip(tgt_orient), src, flip(src_orient)))
+        self.edges.append(edge)
+        return True
+
+    def iter_sequences(self):
+        """Yields a random sequence for each node, in order.
+
+        Sequences aren't stored (they'd take up lots of memory for large
+        graphs); they're regenerated from the graph's seed, so every writer
+        gives each node the same sequence.
+        """
+        seq_rng = random.Random(self.seed)
+        for length in self.lengths:
+            yield "".join(seq_rng.choices("ACGT", k=length))
+
+    def get_outgoing(self):
+        """Returns a dict mapping (node, orientation) to a list of the
+        (node, orientation)s it has edges to, including the implied reverse
+        complement edges.
+        """
+        outgoing = {}
+        for src, src_orient, tgt, tgt_orient in self.edges:
+            outgoing.setdefault((src, src_orient), []).append(
+                (tgt, tgt_orient)
+            )
+            outgoing.setdefault((tgt, flip(tgt_orient)), []).append(
+                (src, flip(src_orient))
+            )
+        return outgoing
+
+
+def flip(orientation):
+    return "-" if orientation == "+" else "+"
+
+
+def reverse_complement(seq):
+    return seq.translate(COMPLEMENT)[::-1]
+
+
+def add_path(graph, num_nodes, start=None):
+    """Adds a path of new nodes, optionally starting from an existing node.
+
+    Returns the last node in the path.
+    """
+    prev = start
+    for _ in range(num_nodes):
+        curr = graph.add_node()
+        if prev is not None:
+            graph.add_edge(prev, curr)
+        prev = curr
+    return prev
+
+
+def add_chain(graph, size):
+    first = graph.add_node()
+    return first, add_path(graph, size - 1, first)
+
+
+def add_bubble(graph, size):
+    """Adds a bubble: a start and end node, with 2 or 3 branches between
+    them. If there's room, branches contain their own (nested) bubbles.
+    """
+    start = graph.add_node()
+    end = graph.add_node()
+    remaining = max(size - 2, 2)
+    num_branches = min(graph.rng.randint(2, 3), remaining)
+    for i in range(num_branches):
+        branch_size = remaining // (num_branches - i)
+        remaining -= branch_size
+        if branch_size >= 4 and graph.rng.random() < 0.5:
+            inner_start, inner_end = add_bubble(graph, branch_size)
+            graph.add_edge(start, inner_start)
+            graph.add_edge(inner_end, end)
+        else:
+            last = add_path(graph, branch_size, start)
+            graph.add_edge(last, end)
+    return start, end
+
+
+def add_superbubble(graph, size):
+    """Adds a superbubble: a start and end node, with layers of nodes
+    between them that have edges to (usually) multiple nodes in the next
+    layer, and sometimes skip ahead a layer.
+    """
+    start = graph.add_node()
+    layers = [[start]]
+    remaining = max(size - 2, 2)
+    while remaining > 0:
+        width = min(graph.rng.randint(2, 4), remaining)
+        layer = [graph.add_node() for _ in range(width)]
+        remaining -= width
+        prev = layers[-1]
+        for node in layer:
+            graph.add_edge(graph.rng.choice(prev), node)
+        for node in prev:
+            graph.add_edge(node, graph.rng.choice(layer))
+        if len(layers) >= 2 and graph.rng.random() < 0.5:
+            graph.add_edge(graph.rng.choice(layers[-2]), layer[0])
+        layers.append(layer)
+    end = graph.add_node()
+    for node in layers[-1]:
+        graph.add_edge(node, end)
+    return start, end
+
+
+def add_hairball(graph, size):
+    """Adds a tangle of nodes with about two random edges per node."""
+    nodes = [graph.add_node() for _ in range(size)]
+    # Start with a path through all of the nodes, so that it's connected
+    for src, tgt in zip(nodes, nodes[1:]):
+        graph.add_edge(src, tgt)
+    for _ in range(size):
+        graph.add_edge(graph.rng.choice(nodes), graph.rng.choice(nodes))
+    return nodes[0], nodes[-1]
+
+
+MOTIF_FUNCS = {
+    "chain": add_chain,
+    "bubble": add_bubble,
+    "superbubble": add_superbubble,
+    "hairball": add_hairball,
+    # (Tiny motifs are just short chains, which don't get linked to anything)
+    "tiny": add_chain,
+}
+
+
+def get_mix(mix):
+    """Returns a mix of motif types (see STRUCTURE_MIXES).
+
+    mix can either be the name of one of the STRUCTURE_MIXES or a dict.
+    """
+    if type(mix) is str:
+        if mix not in STRUCTURE_MIXES:
+            raise ValueError(
+                "Unrecognized structure mix: {}. Should be one of {}.".format(
+                    mix, ", ".join(STRUCTURE_MIXES)
+                )
+            )
+        mix = STRUCTURE_MIXES[mix]
+    for motif, fraction in mix.items():
+        if motif not in MOTIF_FUNCS:
+            raise ValueError("Unrecognized motif type: {}".format(motif))
+        if fraction < 0:
+            raise ValueError("Motif fractions must be at least 0")
+    if sum(mix.values()) <= 0:
+        raise ValueError("At least one motif fraction must be positive")
+    return mix
+
+
+def generate_graph(
+    num_nodes,
+    mix="mixed",
+    component_size=500,
+    seed=0,
+    min_length=20,
+    max_length=200,
+    reverse_fraction=0.1,
+):
+    """Generates a SyntheticGraph with about num_nodes nodes.
+
+    (The actual number of nodes may be a bit larger, since the last motif
+    of each type is generated in full.)
+
+    Parameters
+    ----------
+    num_nodes: int
+        The number of nodes to generate. (Like in GFA / LastGraph files,
+        each node also implies its reverse complement node.)
+
+    mix: str or dict
+        The mix of structures in the graph; see get_mix().
+
+    component_size: int
+        Motifs (other than "tiny" ones) are linked together into components
+        of about this many nodes.
+
+    seed: int
+        Seed for the random number generator.
+
+    min_length, max_length: int
+        Node sequence lengths are drawn uniformly from this range.
+
+    reverse_fraction: float
+        The fraction of nodes that are used in their reverse orientation.
+    """
+    if num_nodes < 1:
+        raise ValueError("Number of nodes must be at least 1")
+    if component_size < 1:
+        raise ValueError("Component size must be at least 1")
+    if min_length < 1 or max_length < min_length:
+        raise ValueError("Invalid node length range")
+    mix = get_mix(mix)
+
+    graph = SyntheticGraph(seed, min_length, max_length, reverse_fraction)
+    total = sum(mix.values())
+    budgets = {
+        motif: round(num_nodes * fraction / total)
+        for motif, fraction in mix.items()
+        if fraction > 0
+    }
+    # Make sure we generate at least one node
+    if sum(budgets.values()) == 0:
+        budgets[max(mix, key=mix.get)] = num_nodes
+
+    # "Tiny" motifs are each their own component
+    tiny_budget = budgets.pop("tiny", 0)
+    while tiny_budget > 0:
+        min_size, max_size = MOTIF_SIZES["tiny"]
+        size = min(graph.rng.randint(min_size, max_size), tiny_budget)
+        add_chain(graph, size)
+        graph.num_components += 1
+        tiny_budget -= size
+
+    # Everything else is linked together into larger components
+    motifs = sorted(budgets)
+    curr_component_size = 0
+    prev_end = None
+    while any(budgets[m] > 0 for m in motifs):
+        motif = graph.rng.choices(
+            motifs, weights=[budgets[m] for m in motifs]
+        )[0]
+        min_size, max_size = MOTIF_SIZES[motif]
+        size = max(
+            min(graph.rng.randint(min_size, max_size), budgets[motif]),
+            min_size,
+        )
+        num_nodes_before = len(graph.lengths)
+        start, end = MOTIF_FUNCS[motif](graph, size)
+        added = len(graph.lengths) - num_nodes_before
+        budgets[motif] = max(budgets[motif] - added, 0)
+        if prev_end is None:
+            graph.num_components += 1
+        else:
+            graph.add_edge(prev_end, start)
+        curr_component_size += added
+        if curr_component_size >= component_size:
+            prev_end = None
+            curr_component_size = 0
+        else:
+            prev_end = end
+    return graph
+
+
+def write_gfa(graph, filename):
+    with open(filename, "w") as f:
+        f.write("H\tVN:Z:1.0\n")
+        for node_id, seq in enumerate(graph.iter_sequences(), 1):
+            f.write(
+                "S\t{}\t{}\tRC:i:{}\n".format(
+                    node_id, seq, round(graph.covs[node_id - 1] * len(seq))
+                )
+            )
+        for src, src_orient, tgt, tgt_orient in graph.edges:
+            f.write(
+                "L\t{}\t{}\t{}\t{}\t0M\n".format(
+                    src, src_orient, tgt, tgt_orient
+                )
+            )
+
+
+def write_lastgraph(graph, filename):
+    rng = random.Random(graph.seed)
+    with open(filename, "w") as f:
+        f.write(
+            "{}\t{}\t1\t1\n".format(len(graph.lengths), len(graph.lengths))
+        )
+        for node_id, seq in enumerate(graph.iter_sequences(), 1):
+            # LastGraph files give the depth of a node as $O_COV_SHORT1 /
+            # $COV_SHORT1 (= length)
+            o_cov = max(round(graph.covs[node_id - 1] * len(seq)), 1)
+            f.write(
+                "NODE\t{}\t{}\t{}\t0\t0\t0\n{}\n{}\n".format(
+                    node_id, len(seq), o_cov, seq, reverse_complement(seq)
+                )
+            )
+        for src, src_orient, tgt, tgt_orient in graph.edges:
+            f.write(
+                "ARC\t{}{}\t{}{}\t{}\n".format(
+                    "-" if src_orient == "-" else "",
+                    src,
+                    "-" if tgt_orient == "-" else "",
+                    tgt,
+                    rng.randint(1, 20),
+                )
+            )
+
+
+def write_gml(graph, filename):
+    """Writes a MetaCarvel-style GML file.
+
+    MetaCarvel graphs don't implicitly contain reverse complement nodes and
+    edges: each node is just present once, in the orientation it's used in.
+    """
+    rng = random.Random(graph.seed)
+    with open(filename, "w") as f:
+        f.write("graph [\n  directed 1\n")
+        for i, length in enumerate(graph.lengths):
+            f.write(
+                '  node [\n    id {0}\n    label "contig_{0}"\n'
+                '    orientation "{1}"\n    length "{2}"\n  ]\n'.format(
+                    i + 1, "REV" if graph.reversed[i] else "FOW", length
+                )
+            )
+        for src, src_orient, tgt, tgt_orient in graph.edges:
+            f.write(
+                "  edge [\n    source {}\n    target {}\n"
+                '    orientation "{}"\n    mean "{:.2f}"\n'
+                '    stdev "{:.2f}"\n    bsize {}\n  ]\n'.format(
+                    src,
+                    tgt,
+                    ("E" if src_orient == "+" else "B")
+                    + ("B" if tgt_orient == "+" else "E"),
+                    rng.uniform(-100, 1000),
+                    rng.uniform(0, 100),
+                    rng.randint(1, 20),
+                )
+            )
+        f.write("]\n")
+
+
+def write_fastg(graph, filename):
+    """Writes a SPAdes-style FASTG file.
+
+    FASTG files explicitly list both orientations of every node, along with
+    every edge (including the reverse complement edges).
+    """
+    outgoing = graph.get_outgoing()
+
+    def get_decl(node_id, orientation):
+        return "EDGE_{}_length_{}_cov_{}{}".format(
+            node_id,
+            graph.lengths[node_id - 1],
+            graph.covs[node_id - 1],
+            "'" if orientation == "-" else "",
+        )
+
+    with open(filename, "w") as f:
+        for node_id, seq in enumerate(graph.iter_sequences(), 1):
+            for orientation, oriented_seq in (
+                ("+", seq),
+                ("-", reverse_complement(seq)),
+            ):
+                decl = get_decl(node_id, orientation)
+                adj = outgoing.get((node_id, orientation), [])
+                if len(adj) > 0:
+                    decl += ":" + ",".join(get_decl(*n) for n in adj)
+                f.write(">{};\n{}\n".format(decl, oriented_seq))
+
+
+WRITERS = {
+    "gfa": write_gfa,
+    "lastgraph": write_lastgraph,
+    "gml": write_gml,
+    "fastg": write_fastg,
+}
+
+
+def write_graph(graph, filename):
+    """Writes out a SyntheticGraph, using the filetype implied by filename's
+    extension (as in assembly_graph_parser.sniff_filetype()).
+    """
+    filetype = assembly_graph_parser.sniff_filetype(filename)
+    WRITERS[filetype](graph, filename)
@@ -0,0 +1,196 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+####
+# Times the pipeline's stages on synthetic graphs (see generator.py), and
+# records the results in a "history" file: a JSON Lines file with one record
+# per benchmark case, which is appended to on every run so that results can be
+# compared across versions.
+
+import contextlib
+import datetime
+import io
+import json
+import os
+import subprocess
+import tempfile
+from .. import profile_utils
+from ..graph_objects import AssemblyGraph
+from . import generator
+
+# Groups the stages recorded by the Profiler (see make_viz() and
+# AssemblyGraph.process()) into the parts of the pipeline we report times for
+STAGE_GROUPS = {
+    "parse": ("parse",),
+    "decomposition": ("scale", "decompose"),
+    "layout": ("layout", "rotate"),
+    "serialization": ("serialize",),
+}
+
+# Extensions to use for each filetype (see
+# assembly_graph_parser.sniff_filetype())
+FILETYPE_EXTENSIONS = {
+    "gfa": "gfa",
+    "lastgraph": "LastGraph",
+    "gml": "gml",
+    "fastg": "fastg",
+}
+
+
+def get_git_commit():
+    """Returns the hash of the git commit MetagenomeScope's code is at.
+
+    Returns None if this isn't being run from a git repository (or if git
+    isn't available).
+    """
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.decode().strip()
+
+
+def get_graph_filename(graph_dir, num_nodes, mix, seed, filetype):
+    return os.path.join(
+        graph_dir,
+        "synthetic_{}_{}_seed{}.{}".format(
+            mix, num_nodes, seed, FILETYPE_EXTENSIONS[filetype]
+        ),
+    )
+
+
+def run_case(input_file, **graph_kwargs):
+    """Times the pipeline on one graph file.
+
+    All keyword arguments are passed to the AssemblyGraph constructor.
+
+    Returns a dict with the seconds (wall-clock and CPU) taken by each group
+    of stages in STAGE_GROUPS, along with the Profiler's full report.
+    """
+    profiler = profile_utils.Profiler(enabled=True)
+    # Hide the pipeline's usual progress messages
+    with contextlib.redirect_stdout(io.StringIO()):
+        with profiler.stage("parse"):
+            asm_graph = AssemblyGraph(input_file, **graph_kwargs)
+        asm_graph.process(profiler=profiler)
+        with tempfile.TemporaryDirectory() as output_dir:
+            with profiler.stage("serialize"):
+                asm_graph.write_data_chunks(output_dir)
+    report = profiler.get_report(input_file)
+
+    stages = {s["name"]: s for s in report["stages"]}
+    times = {}
+    for group, stage_names in STAGE_GROUPS.items():
+        times[group] = {
+            "wall_seconds": sum(
+                stages[n]["wall_seconds"] for n in stage_names
+            ),
+            "cpu_seconds": sum(stages[n]["cpu_seconds"] for n in stage_names),
+        }
+    return {
+        "graph": {
+            "nodes": len(asm_graph.digraph),
+            "edges": len(asm_graph.digraph.edges),
+            "components": len(asm_graph.cc_num_to_bb),
+        },
+        "times": times,
+        "peak_rss_mb": report["peak_rss_mb"],
+        "report": report,
+    }
+
+
+def run_benchmarks(
+    sizes,
+    filetypes,
+    mixes,
+    seed=0,
+    graph_dir="benchmark_graphs",
+    history_file="benchmark_history.jsonl",
+    **graph_kwargs
+):
+    """Runs every combination of the given graph sizes, filetypes, and
+    structure mixes.
+
+    Synthetic graphs are written to graph_dir (and reused if they're already
+    there, since generating big graphs takes a while). The results of each
+    case are appended to history_file as soon as the case is done; a case
+    that fails is recorded (with its error) rather than stopping everything.
+
+    All other keyword arguments are passed to the AssemblyGraph constructor.
+
+    Returns a list of the records added to history_file.
+    """
+    os.makedirs(graph_dir, exist_ok=True)
+    common = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "git_commit": get_git_commit(),
+        "options": graph_kwargs,
+    }
+    records = []
+    for mix in mixes:
+        for num_nodes in sizes:
+            graph = None
+            for filetype in filetypes:
+                filename = get_graph_filename(
+                    graph_dir, num_nodes, mix, seed, filetype
+                )
+                if not os.path.exists(filename):
+                    if graph is None:
+                        graph = generator.generate_graph(
+                            num_nodes, mix=mix, seed=seed
+                        )
+                    generator.write_graph(graph, filename)
+
+                record = dict(common)
+                record["case"] = {
+                    "mix": mix,
+                    "num_nodes": num_nodes,
+                    "filetype": filetype,
+                    "seed": seed,
+                }
+                try:
+                    record.update(run_case(filename, **graph_kwargs))
+                    record["error"] = None
+                    summary = ", ".join(
+                        "{} {:.2f}s".format(group, t["wall_seconds"])
+                        for group, t in record["times"].items()
+                    )
+                except Exception as e:
+                    record["error"] = "{}: {}".format(type(e).__name__, e)
+                    summary = "FAILED ({})".format(record["error"])
+                print(
+                    "{} ({:,} nodes, {}): {}".format(
+                        mix, num_nodes, filetype, summary
+                    ),
+                    flush=True,
+                )
+                with open(history_file, "a") as hf:
+                    hf.write(json.dumps(record) + "\n")
+                records.append(record)
+    return records
+
+
+def read_history(history_file):
+    """Returns a list of all of the records in a history file."""
+    with open(history_file, "r") as hf:
+        return [json.loads(line) for line in hf if line.strip() != ""]
@@ -0,0 +1,177 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+####
+# Utilities for checkpointing the pipeline to a "work directory" (-wd), so
+# that a run that crashes (or is killed) partway through can be resumed
+# (--resume) without redoing everything.
+#
+# There are two sorts of checkpoints:
+#
+#  -The entire AssemblyGraph is pickled after each stage of the pipeline
+#   (parsing, scaling + pattern decomposition, layout + rotation).
+#
+#  -Layout is the slow part, and a single stage can take hours for a big
+#   graph, so every layout produced by the layout engine(s) is also appended
+#   to a log file as soon as it's done. When resuming, layout restarts from
+#   the first component, but the layouts in this log are reused rather than
+#   recomputed -- so components (and patterns) that were already laid out go
+#   by very quickly.
+
+import hashlib
+import json
+import os
+import pickle
+from . import config
+
+
+def get_settings(input_file, **options):
+    """Returns a dict describing the input graph and options for a run.
+
+    Checkpoints are only reused if these settings match. We use the input
+    file's size and modification time, rather than a hash of its contents,
+    to detect if it has changed; input graphs can be very large.
+
+    All of the options should be JSON-serializable.
+    """
+    stat = os.stat(input_file)
+    settings = {
+        "input_file": os.path.abspath(input_file),
+        "input_size": stat.st_size,
+        "input_mtime_ns": stat.st_mtime_ns,
+    }
+    settings.update(options)
+    # Round-trip this through JSON, so that it can be compared directly with
+    # settings loaded from a file (e.g. tuples will become lists)
+    return json.loads(json.dumps(settings))
+
+
+def clear_checkpoints(work_dir):
+    """Removes any checkpoint files in work_dir."""
+    for fn in (
+        config.CHECKPOINT_SETTINGS_FILE,
+        config.CHECKPOINT_GRAPH_FILE,
+        config.CHECKPOINT_LAYOUTS_FILE,
+    ):
+        path = os.path.join(work_dir, fn)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def save_settings(work_dir, settings):
+    with open(
+        os.path.join(work_dir, config.CHECKPOINT_SETTINGS_FILE), "w"
+    ) as sf:
+        json.dump(settings, sf, indent=1)
+
+
+def save_graph(asm_graph, work_dir):
+    """Pickles an AssemblyGraph to work_dir.
+
+    We write to a temporary file and then move it into place, so that a
+    crash while writing the checkpoint won't clobber the previous one.
+    """
+    path = os.path.join(work_dir, config.CHECKPOINT_GRAPH_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as gf:
+        pickle.dump(asm_graph, gf, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_graph(work_dir, settings):
+    """Loads the AssemblyGraph checkpointed in work_dir.
+
+    Returns None if there isn't a checkpoint in work_dir. Raises a ValueError
+    if there is a checkpoint, but it was made using different settings.
+    """
+    settings_path = os.path.join(work_dir, config.CHECKPOINT_SETTINGS_FILE)
+    graph_path = os.path.join(work_dir, config.CHECKPOINT_GRAPH_FILE)
+    if not os.path.exists(settings_path) or not os.path.exists(graph_path):
+        return None
+    with open(settings_path, "r") as sf:
+        old_settings = json.load(sf)
+    if old_settings != settings:
+        diffs = sorted(
+            k
+            for k in set(old_settings) | set(settings)
+            if old_settings.get(k) != settings.get(k)
+        )
+        raise ValueError(
+            "The checkpoint in work directory {} was made using a different "
+            "input graph or different options (differences: {}). Please use "
+            "another work directory, or don't use --resume.".format(
+                work_dir, ", ".join(diffs)
+            )
+        )
+    with open(graph_path, "rb") as gf:
+        return pickle.load(gf)
+
+
+def get_layout_key(prog, gv_input):
+    """Returns the key used to store a layout in a LayoutCache.
+
+    We hash the DOT string rather than using it directly to keep the cache
+    small: DOT strings for large components can be many megabytes long.
+    """
+    h = hashlib.sha1(prog.encode())
+    h.update(b"\0")
+    h.update(gv_input.encode())
+    return h.digest()
+
+
+class LayoutCache(object):
+    """Stores layouts in an append-only file, so that they survive crashes.
+
+    Each record in the file is a pickled (key, layout) tuple, where layout is
+    the 3-tuple returned by a layout engine (see layout_engines.py). Records
+    are flushed to the file as soon as they're added.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.layouts = {}
+        good_size = 0
+        if os.path.exists(filepath):
+            with open(filepath, "rb") as lf:
+                while True:
+                    try:
+                        key, layout = pickle.load(lf)
+                    except (EOFError, pickle.UnpicklingError):
+                        # If we crashed while writing the last record, it'll
+                        # be truncated; just ignore it.
+                        break
+                    self.layouts[key] = layout
+                    good_size = lf.tell()
+        self.file = open(filepath, "ab")
+        # Get rid of any partial record at the end of the file, so that new
+        # records are readable
+        self.file.truncate(good_size)
+
+    def __len__(self):
+        return len(self.layouts)
+
+    def get(self, key):
+        """Returns the layout stored for key, or None if there isn't one."""
+        return self.layouts.get(key)
+
+    def add(self, key, layout):
+        self.layouts[key] = layout
+        pickle.dump((key, layout), self.file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,172 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+####
+# Utilities for converting the data for a component (as produced by
+# AssemblyGraph.iter_dict_parts()) to a "columnar" format.
+#
+# In this format, rather than storing one list of values per node / edge /
+# pattern, we store one column of values per attribute. Numeric columns are
+# stored as binary typed arrays (encoded in base64, since the output needs to
+# be loadable as JS even when the viewer is opened using file://), which are
+# much smaller than the equivalent JSON text and much faster for the viewer
+# to parse. See DataHolder.decodeColumnarComponent() in the JS code for the
+# other side of this.
+
+import base64
+import numpy
+
+# Attributes that are only used for drawing things, so we don't need to keep
+# them at full precision. (Other float attributes, e.g. coverage, are shown to
+# the user, so we store those as float64s.)
+FLOAT32_FIELDS = {
+    "x",
+    "y",
+    "width",
+    "height",
+    "left",
+    "bottom",
+    "right",
+    "top",
+    "relative_weight",
+}
+
+# Attributes whose values are lists of numbers (of varying length).
+RAGGED_FIELDS = {"ctrl_pt_coords"}
+
+# Used to represent None in int32 columns. (In float columns, None is stored
+# as NaN.)
+INT32_NULL = numpy.iinfo(numpy.int32).min
+INT32_MAX = numpy.iinfo(numpy.int32).max
+
+
+def encode_array(values, dtype):
+    """Returns a base64 string of the little-endian bytes of an array."""
+    arr = numpy.asarray(values, dtype=numpy.dtype(dtype).newbyteorder("<"))
+    return base64.b64encode(arr.tobytes()).decode("ascii")
+
+
+def encode_column(values, float32=False):
+    """Encodes a list of values as a column.
+
+    Returns a dict with a "type" key describing how the column is stored, and
+    a "data" key containing the stored column:
+
+    -"u1": bools, stored as uint8s
+    -"i4": ints that fit in an int32 (None is stored as INT32_NULL)
+    -"f4" or "f8": numbers (None is stored as NaN); we use "f4" if float32
+     is True
+    -"list": anything else (e.g. strings, or columns mixing types), stored as
+     a normal list
+    """
+    non_null = [v for v in values if v is not None]
+    if len(non_null) == 0:
+        return {"type": "list", "data": list(values)}
+
+    if all(type(v) is bool for v in non_null):
+        if len(non_null) == len(values):
+            return {"type": "u1", "data": encode_array(values, "u1")}
+
+    elif all(isinstance(v, (int, numpy.integer)) for v in non_null):
+        if all(INT32_NULL < v <= INT32_MAX for v in non_null):
+            col = [INT32_NULL if v is None else v for v in values]
+            return {"type": "i4", "data": encode_array(col, "i4")}
+
+    if all(
+        isinstance(v, (int, float, numpy.number)) and type(v) is not bool
+        for v in non_null
+    ):
+        dtype = "f4" if float32 else "f8"
+        col = [numpy.nan if v is None else v for v in values]
+        return {"type": dtype, "data": encode_array(col, dtype)}
+
+    return {"type": "list", "data": list(values)}
+
+
+def encode_ragged_column(values):
+    """Encodes a list of lists of numbers as a column.
+
+    The lists are concatenated into one float32 array; we also store an int32
+    array of offsets, where the i-th list is at [offsets[i], offsets[i + 1]).
+    """
+    offsets = numpy.zeros(len(values) + 1, dtype=numpy.int32)
+    offsets[1:] = numpy.cumsum([len(v) for v in values])
+    flat = [x for v in values for x in v]
+    return {
+        "type": "ragged_f4",
+        "data": encode_array(flat, "f4"),
+        "offsets": encode_array(offsets, "i4"),
+    }
+
+
+def encode_columns(rows, attrs):
+    """Encodes a list of rows (each a list of values for the attributes in
+    attrs, which maps attribute names to positions) as a list of columns.
+    """
+    columns = [None] * len(attrs)
+    for attr, pos in attrs.items():
+        values = [row[pos] for row in rows]
+        if attr in RAGGED_FIELDS:
+            columns[pos] = encode_ragged_column(values)
+        else:
+            columns[pos] = encode_column(
+                values, float32=(attr in FLOAT32_FIELDS)
+            )
+    return columns
+
+
+def encode_component(component, node_attrs, edge_attrs, patt_attrs):
+    """Converts a component's data to the columnar format.
+
+    component should be a dict for a laid-out component, as yielded by
+    AssemblyGraph.iter_dict_parts(); the *_attrs dicts are the corresponding
+    entries in the first dict it yields.
+    """
+    node_ids = list(component["nodes"].keys())
+    edge_srcs = []
+    edge_tgts = []
+    edge_rows = []
+    for src, edges_from_src in component["edges"].items():
+        for tgt, edge_data in edges_from_src.items():
+            edge_srcs.append(src)
+            edge_tgts.append(tgt)
+            edge_rows.append(edge_data)
+
+    out = {
+        key: val
+        for key, val in component.items()
+        if key not in ("nodes", "edges", "patts")
+    }
+    out["columnar"] = True
+    out["nodes"] = {
+        "count": len(node_ids),
+        "ids": encode_column(node_ids),
+        "cols": encode_columns(
+            [component["nodes"][n] for n in node_ids], node_attrs
+        ),
+    }
+    out["edges"] = {
+        "count": len(edge_rows),
+        "src": encode_column(edge_srcs),
+        "tgt": encode_column(edge_tgts),
+        "cols": encode_columns(edge_rows, edge_attrs),
+    }
+    out["patts"] = {
+        "count": len(component["patts"]),
+        "cols": encode_columns(component["patts"], patt_attrs),
+    }
+    return out
@@ -189,6 +189,123 @@ PATTERN2COLOR = {
 MAXN_DEFAULT = 7999
 MAXE_DEFAULT = 7999
 
+# The default value for -dp: 0 means "just use PyGraphviz, in this process".
+DOT_PROCESSES_DEFAULT = 0
+
+# Settings for the persistent dot processes used when -dp is > 0. (See
+# layout_engines.DotProcessPoolEngine.) The line limit is the max length, in
+# bytes, of a single line of dot's output; the shutdown timeout is how many
+# seconds we give dot processes to exit nicely before killing them.
+DOT_OUTPUT_LINE_LIMIT = 2 ** 26
+DOT_STDERR_LINES_KEPT = 20
+DOT_SHUTDOWN_TIMEOUT = 10
+
+# Maximum number of seconds to spend laying out a single component with dot.
+# None means "no limit."
+LAYOUT_TIME_BUDGET_DEFAULT = None
+# The Graphviz program used to lay out components that go over the budget.
+# (This can also be "layered", to use the layout in layered_layout.py.)
+LAYOUT_FALLBACK_PROG = "sfdp"
+
+# What to do with components that exceed -maxn or -maxe. "skip" means "don't
+# lay them out at all"; "layered" means "lay them out using the layout in
+# layered_layout.py rather than dot"; "skeleton" means "just lay out the top
+# level of these components, without laying out the insides of patterns."
+OVERSIZED_COMPONENTS_DEFAULT = "skip"
+OVERSIZED_COMPONENTS_CHOICES = ["skip", "layered", "skeleton"]
+
+# Settings for -nb (only visualizing the neighborhood around some nodes). The
+# radius of the neighborhood is measured either in "hops" (number of edges
+# away from a seed node, ignoring edge directions) or in "bp" (the total
+# length of the nodes between a seed node and another node).
+NEIGHBORHOOD_RADIUS_DEFAULT = 3
+NEIGHBORHOOD_UNITS_DEFAULT = "hops"
+NEIGHBORHOOD_UNITS_CHOICES = ["hops", "bp"]
+
+# When drawing the skeleton of a component, we don't know how large each
+# pattern would be if we laid it out. We estimate this by making each pattern a
+# square with (this factor) * (the total area of the nodes in the pattern);
+# the factor accounts for the space dot usually leaves between nodes.
+SKELETON_PATTERN_AREA_FACTOR = 2
+
+# The default value for -p: the number of decimal places that coordinates,
+# dimensions, and edge weights are rounded to in the exported data. Nothing
+# on screen needs more precision than this, and full-precision floats take up
+# a lot of space in the output. (Graphviz only gives us two decimal places for
+# edge control points anyway, and we store these as float32s -- see
+# layout_utils.ControlPointBuffer -- so using more than this won't be very
+# useful.)
+OUTPUT_PRECISION_DEFAULT = 2
+
+# The viewer's data is split into "chunk" files (in a directory with this name
+# within the output directory) that are only loaded once a component in them
+# is drawn. Consecutive components are grouped into the same chunk until it
+# contains at least this many elements (nodes + edges + patterns); components
+# larger than this get a chunk to themselves.
+DATA_CHUNK_DIR = "data"
+DATA_CHUNK_SIZE = 10000
+
+# The format used for component data in these chunk files. "json" stores
+# each node / edge / pattern as a list of values; "columnar" stores each
+# attribute as a column, using binary typed arrays for numeric columns (see
+# columnar_utils.py). The columnar format is much smaller, but is also much
+# less human-readable.
+DATA_FORMAT_DEFAULT = "json"
+DATA_FORMAT_CHOICES = ["json", "columnar"]
+
+# Files written to the work directory (-wd) used to checkpoint the pipeline;
+# see checkpoint_utils.py. The settings file describes the input graph and the
+# options that affect layout, so that we don't resume from a checkpoint made
+# for a different graph or different options. The graph file is a pickled
+# AssemblyGraph, saved after each stage of AssemblyGraph.process(); the layout
+# file is an append-only log of every layout dot (or the fallback / layered
+# engines) produced, so that components laid out before a crash don't need to
+# be laid out again.
+CHECKPOINT_SETTINGS_FILE = "settings.json"
+CHECKPOINT_GRAPH_FILE = "graph.pickle"
+CHECKPOINT_LAYOUTS_FILE = "layouts.pickle"
+
+# Files written to the output directory when profiling (--profile); see
+# profile_utils.py. The pstats filename is formatted with the stage name.
+PROFILE_REPORT_FILE = "profile.json"
+PROFILE_PSTATS_FILE = "profile-{}.pstats"
+# Components with fewer nodes than this are lumped together in the profiling
+# report, rather than getting an entry each. (This matches how layout()
+# reports its progress.)
+PROFILE_MIN_COMPONENT_NODES = 5
+# The number of lines of code allocating the most memory to list for each
+# stage, when using --profile-detailed.
+PROFILE_TOP_ALLOCATIONS = 10
+
+# Settings for serve mode (mgsc-serve; see serve.py). Components are laid out
+# when the viewer first requests them, and their data is then saved (as one
+# JSON file per component) in a directory with this name within the output
+# directory.
+SERVE_HOST_DEFAULT = "127.0.0.1"
+SERVE_PORT_DEFAULT = 8000
+SERVE_COMPONENT_DIR = "components"
+
+# Settings for the component overview (mgsc-overview; see overview.py). Each
+# component is drawn as a square with an area of OVERVIEW_NODE_AREA square
+# points per node, with OVERVIEW_PADDING points between squares. Only the
+# first OVERVIEW_MAX_DRAWN_COMPONENTS components are drawn in the SVG file
+# (all components are listed in the TSV file), and only squares at least
+# OVERVIEW_LABEL_MIN_SIDE points wide are labelled with their size rank.
+OVERVIEW_TSV_FILE = "overview.tsv"
+OVERVIEW_SVG_FILE = "overview.svg"
+OVERVIEW_NODE_AREA = 100
+OVERVIEW_PADDING = 4
+OVERVIEW_MAX_DRAWN_COMPONENTS = 50000
+OVERVIEW_LABEL_MIN_SIDE = 24
+OVERVIEW_FILL_COLOR = "#888888"
+
+# Settings for the layout in layered_layout.py. These mirror dot's defaults
+# for the nodesep and ranksep attributes (both in inches).
+LAYERED_SWEEPS = 4
+LAYERED_POINTS_PER_INCH = 72
+LAYERED_NODESEP = 0.25
+LAYERED_RANKSEP = 0.5
+
 # Various status messages/message prefixes that are displayed to the user.
 USERBUBBLES_SEARCH_MSG = "Identifying user-specified bubbles in the graph..."
 USERPATTERNS_SEARCH_MSG = (
@@ -1,16 +1,29 @@
+import base64
+import gzip
+import heapq
+import io
 import math
 import json
 import os
+import time
 from copy import deepcopy
 from operator import itemgetter
-from collections import deque
+from collections import deque, OrderedDict
 import numpy
 import networkx as nx
-import pygraphviz
 
 
-from .. import assembly_graph_parser, config, layout_utils
+from .. import (
+    assembly_graph_parser,
+    checkpoint_utils,
+    config,
+    layout_utils,
+    layout_engines,
+    columnar_utils,
+    profile_utils,
+)
 from ..msg_utils import operation_msg, conclude_msg
+from ..input_node_utils import negate_node_id, negate_fastg_node_id
 from .pattern import StartEndPattern, Pattern
 
 
@@ -32,13 +45,46 @@ class AssemblyGraph(object):
     def __init__(
         self,
         filename,
+        assume_oriented=False,
         max_node_count=config.MAXN_DEFAULT,
         max_edge_count=config.MAXE_DEFAULT,
+        dot_processes=config.DOT_PROCESSES_DEFAULT,
+        layout_time_budget=config.LAYOUT_TIME_BUDGET_DEFAULT,
+        oversized_components=config.OVERSIZED_COMPONENTS_DEFAULT,
+        output_precision=config.OUTPUT_PRECISION_DEFAULT,
+        top_components=None,
+        components_containing=None,
+        neighborhood=None,
+        neighborhood_radius=config.NEIGHBORHOOD_RADIUS_DEFAULT,
+        neighborhood_units=config.NEIGHBORHOOD_UNITS_DEFAULT,
     ):
-        """Parses the input graph file and initializes the AssemblyGraph."""
+        """Parses the input graph file and initializes the AssemblyGraph.
+
+        If neighborhood is specified, only the nodes near these nodes are
+        kept; see self.extract_neighborhood().
+
+        If top_components and/or components_containing are specified, only
+        some of the graph's components are kept; see
+        self.select_components().
+        """
         self.filename = filename
+        self.assume_oriented = assume_oriented
         self.max_node_count = max_node_count
         self.max_edge_count = max_edge_count
+        self.layout_time_budget = layout_time_budget
+        self.oversized_components = oversized_components
+        self.output_precision = output_precision
+        self.top_components = top_components
+        self.components_containing = components_containing
+        self.neighborhood = neighborhood
+        self.neighborhood_radius = neighborhood_radius
+        self.neighborhood_units = neighborhood_units
+        self.init_layout_engines(dot_processes)
+
+        # The stages of the pipeline that have been completed so far (see
+        # self.process()). This lets us resume from a checkpoint of this
+        # object without redoing anything (see checkpoint_utils.py).
+        self.completed_stages = []
 
         # Each entry in these structures will be a Pattern (or subclass).
         # NOTE that these patterns will only be "represented" in
@@ -73,7 +119,7 @@ class AssemblyGraph(object):
         self.internal_edge_attrs = set(
             [
                 "ctrl_pt_coords",
-                "relative_ctrl_pt_coords",
+                "ctrl_pt_index",
                 "parent_id",
                 "is_outlier",
                 "relative_weight",
@@ -102,14 +148,30 @@ class AssemblyGraph(object):
         # like 20 tests and I don't want to do that ._.
         self.filetype = assembly_graph_parser.sniff_filetype(self.filename)
 
-        self.digraph = assembly_graph_parser.parse(self.filename)
+        self.digraph = assembly_graph_parser.parse(
+            self.filename, assume_oriented=assume_oriented
+        )
         self.check_attrs()
         conclude_msg()
 
-        # Remove nodes/edges in components that are too large to lay out.
+        # If we're only visualizing part of the graph, throw out the rest of
+        # it now (so that even the size checks below only consider this part)
+        self.extract_neighborhood()
+
+        # Remove nodes/edges in components that are too large to lay out (or,
+        # depending on oversized_components, just remember which nodes are in
+        # these components so that we can lay them out differently).
         self.num_too_large_components = 0
+        self.oversized_node_names = set()
         self.remove_too_large_components()
 
+        # Remove components that weren't selected (if the user only asked for
+        # some of the components). These are handled like too-large
+        # components, but we record them separately: they're smaller than the
+        # components we keep, so they're placed after them in the output.
+        self.num_unselected_components = 0
+        self.select_components()
+
         self.reindex_digraph()
 
         # Initialize all edges with is_dup by default, so that in the future we
@@ -136,6 +198,66 @@ class AssemblyGraph(object):
         # memory, I think.)
         self.cc_num_to_bb = {}
 
+        # Records the name of the Graphviz program used to lay out each
+        # component in the graph. This is usually just "dot", but components
+        # that took too long to lay out with dot will have been laid out with
+        # something else. Also indexed by component number.
+        self.cc_num_to_layout_engine = {}
+
+        # Component numbers of components where we've only laid out the top
+        # level (see the "skeleton" option for oversized_components).
+        self.skeleton_cc_nums = set()
+
+        # Stores the control point coordinates of every edge in the graph.
+        # Each edge's "ctrl_pt_index" attribute gives the index of its
+        # coordinates in this buffer. See self.shift_pattern_ctrl_pts().
+        self.ctrl_pts = layout_utils.ControlPointBuffer()
+
+        self.completed_stages.append("parsed")
+
+    def init_layout_engines(self, dot_processes):
+        """Sets up the engines used to lay out patterns and components.
+
+        (See layout_engines.py.) If there's a time budget for laying out each
+        component, then we need an engine that can be interrupted; components
+        that don't fit in the budget are laid out using the fallback engine
+        instead.
+        """
+        self.dot_processes = dot_processes
+        self.layout_engine = layout_engines.get_layout_engine(
+            dot_processes, interruptible=(self.layout_time_budget is not None)
+        )
+        self.fallback_layout_engine = None
+        if self.layout_time_budget is not None:
+            self.fallback_layout_engine = layout_engines.get_layout_engine(
+                dot_processes, prog=config.LAYOUT_FALLBACK_PROG
+            )
+        # Used to lay out components that exceed -maxn / -maxe, if we aren't
+        # just skipping these components.
+        self.oversized_layout_engine = None
+        if self.oversized_components == "layered":
+            self.oversized_layout_engine = layout_engines.LayeredEngine()
+
+    def __getstate__(self):
+        """Used when pickling this object (see checkpoint_utils.py).
+
+        Layout engines can hold things like child processes and event loops,
+        which can't be pickled -- so we leave them out, and just set them up
+        again when unpickling.
+        """
+        state = self.__dict__.copy()
+        for attr in (
+            "layout_engine",
+            "fallback_layout_engine",
+            "oversized_layout_engine",
+        ):
+            del state[attr]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.init_layout_engines(self.dot_processes)
+
     def check_attrs(self):
         """Verifies that nodes and edges in self.digraph don't have attributes
         that would conflict with built-in attributes we store here.
@@ -183,6 +305,23 @@ class AssemblyGraph(object):
                 num_nodes > self.max_node_count
                 or num_edges > self.max_edge_count
             ):
+                if self.oversized_components != "skip":
+                    # Keep this component around, but remember that it's
+                    # oversized. (We save node names rather than IDs because
+                    # we haven't called reindex_digraph() yet, and because
+                    # duplicate nodes created later on will share these names.)
+                    self.oversized_node_names |= cc_node_ids
+                    operation_msg(
+                        (
+                            "Component ({:,} nodes, {:,} edges) exceeds -maxn "
+                            "or -maxe; it will be laid out using the {} "
+                            "layout."
+                        ).format(
+                            num_nodes, num_edges, self.oversized_components
+                        ),
+                        True,
+                    )
+                    continue
                 self.digraph.remove_nodes_from(cc_node_ids)
                 self.num_too_large_components += 1
                 operation_msg(
@@ -199,6 +338,159 @@ class AssemblyGraph(object):
                 "-maxn/-maxe parameters, or reducing the size of the graph."
             )
 
+    def extract_neighborhood(self):
+        """Removes all nodes that aren't in the neighborhood of the nodes
+        named in self.neighborhood.
+
+        The neighborhood is found using a breadth-first search from these
+        "seed" nodes (following edges in both directions) that stops once it
+        gets self.neighborhood_radius away from the seeds. If
+        self.neighborhood_units is "hops", this is the number of edges away
+        from a seed; if it's "bp", this is the total length of the nodes
+        between a seed and another node (so the nodes adjacent to a seed are
+        always included, and a node with a length longer than the radius acts
+        as a barrier). The reverse complements of all nodes in the
+        neighborhood (if the graph has these) are also included.
+
+        This is done right after parsing, so the rest of the pipeline
+        (scaling, decomposition, layout, ...) only sees the neighborhood.
+        """
+        if self.neighborhood is None:
+            return
+
+        missing = sorted(n for n in self.neighborhood if n not in self.digraph)
+        if len(missing) > 0:
+            raise ValueError(
+                "Can't find node(s) {} in the graph.".format(
+                    ", ".join(missing)
+                )
+            )
+
+        def get_neighbors(node):
+            yield from self.digraph.successors(node)
+            yield from self.digraph.predecessors(node)
+
+        # Maps node name to its distance from the closest seed node
+        dists = {n: 0 for n in self.neighborhood}
+        if self.neighborhood_units == "hops":
+            queue = deque(self.neighborhood)
+            while len(queue) > 0:
+                node = queue.popleft()
+                if dists[node] >= self.neighborhood_radius:
+                    continue
+                for neighbor in get_neighbors(node):
+                    if neighbor not in dists:
+                        dists[neighbor] = dists[node] + 1
+                        queue.append(neighbor)
+        else:
+            # Since nodes have different lengths, we need Dijkstra's
+            # algorithm rather than just a BFS
+            seeds = set(self.neighborhood)
+            heap = [(0, n) for n in seeds]
+            heapq.heapify(heap)
+            while len(heap) > 0:
+                dist, node = heapq.heappop(heap)
+                if dist > dists[node]:
+                    continue
+                if node not in seeds:
+                    dist += self.digraph.nodes[node]["length"]
+                if dist > self.neighborhood_radius:
+                    continue
+                for neighbor in get_neighbors(node):
+                    if dist < dists.get(neighbor, float("inf")):
+                        dists[neighbor] = dist
+                        heapq.heappush(heap, (dist, neighbor))
+
+        nodes = set(dists)
+        complement_name_func = self.get_complement_name_func()
+        if complement_name_func is not None:
+            for node in dists:
+                rc = complement_name_func(node)
+                if rc in self.digraph:
+                    nodes.add(rc)
+
+        operation_msg(
+            (
+                "Keeping the neighborhood (radius {:,} {}) of node(s) {}: "
+                "{:,} / {:,} node(s)."
+            ).format(
+                self.neighborhood_radius,
+                self.neighborhood_units,
+                ", ".join(self.neighborhood),
+                len(nodes),
+                len(self.digraph),
+            ),
+            True,
+        )
+        # Copy the subgraph, so that the rest of the graph can be freed
+        self.digraph = self.digraph.subgraph(nodes).copy()
+
+    def select_components(self):
+        """Removes all components except for the ones the user selected.
+
+        If self.top_components is not None, we keep the top_components
+        largest components (ranked by number of nodes, then by number of
+        edges -- like in self.get_connected_components(), although we can't
+        consider patterns yet since this is done before decomposition).
+
+        If self.components_containing is not None, it should be a list of node
+        names; we keep the components containing these nodes. (Node names are
+        matched exactly, so for graphs with implied reverse complement nodes
+        you'll need to specify both "40" and "-40" to select the components
+        containing both strands of node 40.)
+
+        If both are specified, we keep the components selected by either.
+
+        Doing this before decomposition and layout means that we don't waste
+        time on the components that aren't selected.
+        """
+        if self.top_components is None and self.components_containing is None:
+            return
+
+        wccs = list(nx.weakly_connected_components(self.digraph))
+        selected_indices = set()
+
+        if self.top_components is not None:
+            # (All edges incident on the nodes in a weakly connected component
+            # are within that component, so summing the out-degrees of its
+            # nodes gives us its number of edges.)
+            sizes = [
+                (len(cc), sum(d for _, d in self.digraph.out_degree(cc)))
+                for cc in wccs
+            ]
+            selected_indices.update(
+                heapq.nlargest(
+                    self.top_components,
+                    range(len(wccs)),
+                    key=sizes.__getitem__,
+                )
+            )
+
+        if self.components_containing is not None:
+            names = set(self.components_containing)
+            missing = sorted(n for n in names if n not in self.digraph)
+            if len(missing) > 0:
+                raise ValueError(
+                    "Can't find node(s) {} in the graph (or these are in "
+                    "components that were too large to lay out).".format(
+                        ", ".join(missing)
+                    )
+                )
+            for i, cc in enumerate(wccs):
+                if not names.isdisjoint(cc):
+                    selected_indices.add(i)
+
+        for i, cc in enumerate(wccs):
+            if i not in selected_indices:
+                self.digraph.remove_nodes_from(cc)
+                self.num_unselected_components += 1
+        operation_msg(
+            (
+                "Keeping {:,} selected component(s); skipping the other {:,}."
+            ).format(len(selected_indices), self.num_unselected_components),
+            True,
+        )
+
     def reindex_digraph(self):
         """Assigns every node in the graph a unique integer ID, and adds a
         "name" attribute containing the original ID. This unique integer ID
@@ -253,11 +545,13 @@ class AssemblyGraph(object):
         NOTE that this assumes that at least one edge having a weight
         implies that the other edges in the graph have weights. This should
         always be the case, but if there are graphs with partial edge weight
-        data then this may cause problems with scaling later on.
+        data then this may cause problems with scaling later on. (It also
+        means that we can stop looking for a field as soon as we find an edge
+        that has it, rather than building a dict of every edge's value.)
         """
         fn_had = None
         for fn in field_names:
-            if len(nx.get_edge_attributes(self.digraph, fn)) > 0:
+            if any(fn in data for _, _, data in self.digraph.edges(data=True)):
                 if fn_had is None:
                     fn_had = fn
                 else:
@@ -1102,14 +1396,47 @@ class AssemblyGraph(object):
         )
         return p
 
-    def hierarchically_identify_patterns(self):
+    def hierarchically_identify_patterns(self, stats=None):
         """Run all of the pattern detection algorithms above on the graph
         repeatedly until the graph has been "fully" squished into patterns.
+
+        If stats (a profile_utils.DecompositionStats) is given, then calls to
+        the pattern validators and to add_pattern() / add_bubble() are
+        counted and timed.
         """
         # We'll modify this as we go through this method
         self.decomposed_digraph = deepcopy(self.digraph)
 
+        # You could totally switch the order of this tuple up in order to
+        # change the "precedence" of pattern detection. I don't think that
+        # would make a huge difference, though...?
+        detectors = (
+            (self.chains, AssemblyGraph.is_valid_chain, "chain"),
+            (
+                self.cyclic_chains,
+                AssemblyGraph.is_valid_cyclic_chain,
+                "cyclicchain",
+            ),
+            (self.bubbles, AssemblyGraph.is_valid_3node_bubble, "bubble"),
+            (self.bubbles, AssemblyGraph.is_valid_bubble, "bubble"),
+            (self.bubbles, AssemblyGraph.is_valid_superbubble, "bubble"),
+        )
+        add_pattern = self.add_pattern
+        add_bubble = self.add_bubble
+        # (We wrap these functions up front, rather than checking if stats is
+        # None every time we call them, so that this costs nothing when we
+        # aren't profiling.)
+        if stats is not None:
+            detectors = tuple(
+                (collection, stats.wrap_validator(validator), ptype)
+                for collection, validator, ptype in detectors
+            )
+            add_pattern = stats.wrap_adder(add_pattern)
+            add_bubble = stats.wrap_adder(add_bubble)
+
         while True:
+            if stats is not None:
+                stats.passes += 1
             # Run through all of the pattern detection methods on all of the
             # top-level nodes (or node groups) in the decomposed DiGraph.
             # Keep doing this until we get to a point where we've run every
@@ -1117,25 +1444,18 @@ class AssemblyGraph(object):
             # found.
             something_collapsed = False
 
-            # You could totally switch the order of this tuple up in order to
-            # change the "precedence" of pattern detection. I don't think that
-            # would make a huge difference, though...?
-            for collection, validator, ptype in (
-                (self.chains, AssemblyGraph.is_valid_chain, "chain"),
-                (
-                    self.cyclic_chains,
-                    AssemblyGraph.is_valid_cyclic_chain,
-                    "cyclicchain",
-                ),
-                (self.bubbles, AssemblyGraph.is_valid_3node_bubble, "bubble"),
-                (self.bubbles, AssemblyGraph.is_valid_bubble, "bubble"),
-                (self.bubbles, AssemblyGraph.is_valid_superbubble, "bubble"),
-            ):
+            for collection, validator, ptype in detectors:
                 # We sort the nodes in order to make this deterministic
                 # (I doubt the extra time cost from sorting will be a big deal)
-                candidate_nodes = sorted(list(self.decomposed_digraph.nodes))
+                # We use an OrderedDict as an ordered set, rather than a list,
+                # since we remove arbitrary nodes from it as we go along --
+                # and removing from a list takes time linear in its length,
+                # which made this quadratic on large graphs.
+                candidate_nodes = OrderedDict.fromkeys(
+                    sorted(self.decomposed_digraph.nodes)
+                )
                 while len(candidate_nodes) > 0:
-                    n = candidate_nodes[0]
+                    n = next(iter(candidate_nodes))
                     validator_outputs = validator(self.decomposed_digraph, n)
                     pattern_valid = validator_outputs[0]
                     if pattern_valid:
@@ -1147,29 +1467,24 @@ class AssemblyGraph(object):
                             # GitHub for lots and lots of details.
                             s_id = validator_outputs[2]
                             e_id = validator_outputs[3]
-                            p = self.add_bubble(pattern_node_ids, s_id, e_id)
+                            p = add_bubble(pattern_node_ids, s_id, e_id)
                         else:
-                            p = self.add_pattern(pattern_node_ids, ptype)
+                            p = add_pattern(pattern_node_ids, ptype)
 
                         collection.append(p)
-                        candidate_nodes.append(p.pattern_id)
+                        candidate_nodes[p.pattern_id] = None
                         self.id2pattern[p.pattern_id] = p
                         for pn in p.node_ids:
                             # Remove nodes if they're in candidate nodes. There
                             # may be nodes in this pattern not in candidate
                             # nodes, e.g. if duplication was done. In that case
                             # no need to do anything for those nodes.
-                            # This should perform decently; see
-                            # https://stackoverflow.com/a/4915964/10730311.
-                            try:
-                                candidate_nodes.remove(pn)
-                            except ValueError:
-                                continue
+                            candidate_nodes.pop(pn, None)
                         something_collapsed = True
                     else:
                         # If the pattern was invalid, we still need to
                         # remove n
-                        candidate_nodes.remove(n)
+                        del candidate_nodes[n]
             if not something_collapsed:
                 # We didn't collapse anything... so we're done here! We can't
                 # do any more.
@@ -1203,37 +1518,41 @@ class AssemblyGraph(object):
         components at once, so we scale nodes based on the min/max lengths
         throughout the entire graph.
         """
-        node_lengths = nx.get_node_attributes(self.digraph, "length")
-        node_log_lengths = {}
-        for node, length in node_lengths.items():
-            node_log_lengths[node] = math.log(
-                length, config.NODE_SCALING_LOG_BASE
-            )
-        min_log_len = min(node_log_lengths.values())
-        max_log_len = max(node_log_lengths.values())
+        node_data = [data for _, data in self.digraph.nodes(data=True)]
+        lengths = numpy.fromiter(
+            (data["length"] for data in node_data),
+            dtype=numpy.float64,
+            count=len(node_data),
+        )
+        log_lengths = numpy.log(lengths) / math.log(
+            config.NODE_SCALING_LOG_BASE
+        )
+        min_log_len = log_lengths.min()
+        max_log_len = log_lengths.max()
         if min_log_len == max_log_len:
-            for node in self.digraph.nodes:
-                self.digraph.nodes[node]["relative_length"] = 0.5
-                self.digraph.nodes[node][
-                    "longside_proportion"
-                ] = config.MID_LONGSIDE_PROPORTION
+            for data in node_data:
+                data["relative_length"] = 0.5
+                data["longside_proportion"] = config.MID_LONGSIDE_PROPORTION
         else:
-            log_len_range = max_log_len - min_log_len
-            q25, q75 = numpy.percentile(
-                list(node_log_lengths.values()), [25, 75]
+            relative_lengths = (log_lengths - min_log_len) / (
+                max_log_len - min_log_len
             )
-            for node in self.digraph.nodes:
-                node_log_len = node_log_lengths[node]
-                self.digraph.nodes[node]["relative_length"] = (
-                    node_log_len - min_log_len
-                ) / log_len_range
-                if node_log_len < q25:
-                    lp = config.LOW_LONGSIDE_PROPORTION
-                elif node_log_len < q75:
-                    lp = config.MID_LONGSIDE_PROPORTION
-                else:
-                    lp = config.HIGH_LONGSIDE_PROPORTION
-                self.digraph.nodes[node]["longside_proportion"] = lp
+            q25, q75 = numpy.percentile(log_lengths, [25, 75])
+            longside_proportions = numpy.select(
+                [log_lengths < q25, log_lengths < q75],
+                [
+                    config.LOW_LONGSIDE_PROPORTION,
+                    config.MID_LONGSIDE_PROPORTION,
+                ],
+                default=config.HIGH_LONGSIDE_PROPORTION,
+            )
+            for data, rl, lp in zip(
+                node_data,
+                relative_lengths.tolist(),
+                longside_proportions.tolist(),
+            ):
+                data["relative_length"] = rl
+                data["longside_proportion"] = lp
 
     def compute_node_dimensions(self):
         r"""Adds height and width attributes to each node in the graph.
@@ -1274,15 +1593,29 @@ class AssemblyGraph(object):
         MetagenomeScope users, the width and height of each node are really the
         opposite from what we store here.
         """
-        for node in self.digraph.nodes:
-            data = self.digraph.nodes[node]
-            area = config.MIN_NODE_AREA + (
-                data["relative_length"] * config.NODE_AREA_RANGE
-            )
-            # Again, in the interface the height will be the width and the
-            # width will be the height
-            data["height"] = area ** data["longside_proportion"]
-            data["width"] = area / data["height"]
+        node_data = [data for _, data in self.digraph.nodes(data=True)]
+        relative_lengths = numpy.fromiter(
+            (data["relative_length"] for data in node_data),
+            dtype=numpy.float64,
+            count=len(node_data),
+        )
+        longside_proportions = numpy.fromiter(
+            (data["longside_proportion"] for data in node_data),
+            dtype=numpy.float64,
+            count=len(node_data),
+        )
+        areas = config.MIN_NODE_AREA + (
+            relative_lengths * config.NODE_AREA_RANGE
+        )
+        # Again, in the interface the height will be the width and the
+        # width will be the height
+        heights = areas**longside_proportions
+        widths = areas / heights
+        for data, height, width in zip(
+            node_data, heights.tolist(), widths.tolist()
+        ):
+            data["height"] = height
+            data["width"] = width
 
     def scale_edges(self):
         """Scales edges in the graph based on their weights, if present.
@@ -1318,93 +1651,62 @@ class AssemblyGraph(object):
         Exploratory Data Analysis (1977).
         """
 
-        def _assign_default_weight_attrs(edges):
-            """Assigns "normal" attributes to each edge in edges."""
-            for edge in edges:
-                self.digraph.edges[edge]["is_outlier"] = 0
-                self.digraph.edges[edge]["relative_weight"] = 0.5
+        edge_data = [data for _, _, data in self.digraph.edges(data=True)]
+        if any(data.get("is_dup", False) for data in edge_data):
+            raise ValueError(
+                "Duplicate edges shouldn't exist in the graph yet."
+            )
 
         ew_field = self.get_edge_weight_field()
-        if ew_field is not None:
-            operation_msg("Scaling edges based on weights...")
-            real_edges = []
-            weights = []
-            for edge in self.digraph.edges:
-                data = self.digraph.edges[edge]
-                if "is_dup" not in data or not data["is_dup"]:
-                    real_edges.append(edge)
-                    weights.append(data[ew_field])
-                else:
-                    raise ValueError(
-                        "Duplicate edges shouldn't exist in the graph yet."
-                    )
-
-            non_outlier_edges = []
-            non_outlier_edge_weights = []
-            # Only try to flag outlier edges if the graph contains at least 4
-            # edges. With < 4 data points, computing quartiles becomes a bit
-            # silly.
-            if len(weights) >= 4:
-                # Calculate lower and upper Tukey fences. First, compute the
-                # upper and lower quartiles (aka the 25th and 75th percentiles)
-                lq, uq = numpy.percentile(weights, [25, 75])
-                # Determine 1.5 * the interquartile range.
-                # (If desired, we could use other values besides 1.5 -- this
-                # isn't set in stone.)
-                d = 1.5 * (uq - lq)
-                # Now we can calculate the actual Tukey fences:
-                lf = lq - d
-                uf = uq + d
-                # Now, iterate through every edge and flag outliers.
-                # Non-outlier edges will be added to a list of edges that we'll
-                # scale relatively.
-                for edge in real_edges:
-                    data = self.digraph.edges[edge]
-                    ew = data[ew_field]
-                    if ew > uf:
-                        data["is_outlier"] = 1
-                        data["relative_weight"] = 1
-                    elif ew < lf:
-                        data["is_outlier"] = -1
-                        data["relative_weight"] = 0
-                    else:
-                        data["is_outlier"] = 0
-                        non_outlier_edges.append(edge)
-                        non_outlier_edge_weights.append(ew)
-            else:
-                # There are < 4 edges, so consider all edges as "non-outliers."
-                for edge in real_edges:
-                    data = self.digraph.edges[edge]
-                    if "is_dup" not in data or not data["is_dup"]:
-                        data["is_outlier"] = 0
-                        non_outlier_edges.append(edge)
-                        ew = data[ew_field]
-                        non_outlier_edge_weights.append(ew)
-                    else:
-                        raise ValueError(
-                            "Duplicate edges shouldn't exist in the graph yet."
-                        )
-
-            # Perform relative scaling for non-outlier edges, if possible.
-            if len(non_outlier_edges) >= 2:
-                min_ew = min(non_outlier_edge_weights)
-                max_ew = max(non_outlier_edge_weights)
-                if min_ew != max_ew:
-                    ew_range = max_ew - min_ew
-                    for edge in non_outlier_edges:
-                        data = self.digraph.edges[edge]
-                        ew = data[ew_field]
-                        rw = (ew - min_ew) / ew_range
-                        data["relative_weight"] = rw
-                else:
-                    # Can't do edge scaling, so just assign this list of edges
-                    # (... which should in practice just be a list with one or
-                    # zero edges, I guess...?) "default" edge weight attributes
-                    _assign_default_weight_attrs(non_outlier_edges)
-            conclude_msg()
-        else:
+        if ew_field is None:
             # Can't do edge scaling, so just assign every edge "default" attrs
-            _assign_default_weight_attrs(self.digraph.edges)
+            for data in edge_data:
+                data["is_outlier"] = 0
+                data["relative_weight"] = 0.5
+            return
+
+        operation_msg("Scaling edges based on weights...")
+        weights = numpy.fromiter(
+            (data[ew_field] for data in edge_data),
+            dtype=numpy.float64,
+            count=len(edge_data),
+        )
+        is_outlier = numpy.zeros(len(weights), dtype=numpy.int64)
+        relative_weights = numpy.full(len(weights), 0.5)
+        # Only try to flag outlier edges if the graph contains at least 4
+        # edges. With < 4 data points, computing quartiles becomes a bit
+        # silly.
+        if len(weights) >= 4:
+            # Calculate lower and upper Tukey fences. First, compute the
+            # upper and lower quartiles (aka the 25th and 75th percentiles)
+            lq, uq = numpy.percentile(weights, [25, 75])
+            # Determine 1.5 * the interquartile range.
+            # (If desired, we could use other values besides 1.5 -- this
+            # isn't set in stone.)
+            d = 1.5 * (uq - lq)
+            # Now we can calculate the actual Tukey fences, and flag outliers.
+            is_outlier[weights > uq + d] = 1
+            is_outlier[weights < lq - d] = -1
+            relative_weights[is_outlier == 1] = 1
+            relative_weights[is_outlier == -1] = 0
+
+        # Perform relative scaling for non-outlier edges, if possible. If it
+        # isn't possible, these edges just keep the default relative weight.
+        non_outlier_weights = weights[is_outlier == 0]
+        if len(non_outlier_weights) >= 2:
+            min_ew = non_outlier_weights.min()
+            max_ew = non_outlier_weights.max()
+            if min_ew != max_ew:
+                relative_weights[is_outlier == 0] = (
+                    non_outlier_weights - min_ew
+                ) / (max_ew - min_ew)
+
+        for data, outlier, rw in zip(
+            edge_data, is_outlier.tolist(), relative_weights.tolist()
+        ):
+            data["is_outlier"] = outlier
+            data["relative_weight"] = rw
+        conclude_msg()
 
     def is_pattern(self, node_id):
         """Returns True if a node ID is for a pattern, False otherwise.
@@ -1418,12 +1720,13 @@ class AssemblyGraph(object):
         return node_id in self.id2pattern
 
     def get_connected_components(self):
-        """Returns a list of 3-tuples, where the first element in each tuple is
+        """Returns a list of 4-tuples, where the first element in each tuple is
         a set of (top-level) node IDs within this component in the decomposed
         digraph, the second element is the total number of nodes (not
         counting collapsed patterns, but including nodes within patterns and
-        also including duplicate nodes) within this component, and the third
-        element is the total number of edges within this component.
+        also including duplicate nodes) within this component, the third
+        element is the total number of edges within this component, and the
+        fourth element is the total number of patterns within this component.
 
         Components are sorted in descending order by number of nodes first,
         then number of edges, then number of patterns. This is a simple-ish way
@@ -1477,20 +1780,403 @@ class AssemblyGraph(object):
         # friend I am so jealous of you for not being in 2020 any more. If you
         # wanna use all the free time you have in 2021 to submit a PR and make
         # this function prettier, us 2020 denizens would welcome that.
-        return [(ccs[t[0]], t[1], t[2]) for t in sorted_indices_and_cts]
+        return [(ccs[t[0]], t[1], t[2], t[3]) for t in sorted_indices_and_cts]
+
+    def layout_patterns(self, cc_node_ids, engine, deadline=None):
+        """Lays out all of the patterns within a component.
+
+        Patterns are laid out "level by level," starting with the patterns
+        that don't contain any other patterns and working our way up to the
+        top-level patterns in the component. All of the patterns on a given
+        level can be laid out independently of each other, so each level is
+        submitted to the layout engine as a single batch (which lets engines
+        like layout_engines.DotProcessPoolEngine lay them out concurrently).
+
+        If deadline (a time.monotonic() value) is given, this raises a
+        layout_engines.LayoutTimeoutError if layout isn't done by then.
+        """
+        # Go through all patterns in the component in BFS order, so that every
+        # pattern comes before all of the patterns within it.
+        patts = []
+        patt_queue = deque(
+            self.id2pattern[n] for n in cc_node_ids if self.is_pattern(n)
+        )
+        while len(patt_queue) > 0:
+            curr_patt = patt_queue.popleft()
+            patts.append(curr_patt)
+            for child_node_id in curr_patt.node_ids:
+                if self.is_pattern(child_node_id):
+                    patt_queue.append(self.id2pattern[child_node_id])
+
+        # Compute each pattern's "level": 0 for patterns that don't contain
+        # other patterns, and otherwise 1 + the max level of its child patterns.
+        # Going through patts in reverse means that we always know the levels
+        # of a pattern's children before we get to it.
+        levels = []
+        patt_id2level = {}
+        for patt in reversed(patts):
+            level = 0
+            for child_node_id in patt.node_ids:
+                if child_node_id in patt_id2level:
+                    level = max(level, patt_id2level[child_node_id] + 1)
+            patt_id2level[patt.pattern_id] = level
+            if level == len(levels):
+                levels.append([])
+            levels[level].append(patt)
+
+        for level_patts in levels:
+            dot_layouts = engine.layout_many(
+                [patt.get_gv_input(self) for patt in level_patts],
+                timeout=layout_engines.get_timeout(deadline),
+            )
+            for patt, dot_layout in zip(level_patts, dot_layouts):
+                patt.set_layout(dot_layout, self)
+
+    def is_oversized_component(self, cc_node_ids):
+        """Returns True if a component exceeded -maxn or -maxe.
+
+        This is only meaningful if oversized components weren't skipped; see
+        remove_too_large_components().
+
+        cc_node_ids should be a collection of the top-level node IDs in a
+        component of the decomposed digraph.
+        """
+        if len(self.oversized_node_names) == 0:
+            return False
+        # All of the nodes in a component are either oversized or not, so we
+        # just need to find a single (non-pattern) node to check.
+        node_id = next(iter(cc_node_ids))
+        while self.is_pattern(node_id):
+            node_id = self.id2pattern[node_id].node_ids[0]
+        return self.digraph.nodes[node_id]["name"] in self.oversized_node_names
+
+    def layout_component(
+        self, cc_node_ids, top_level_edges, engine, deadline, skeleton=False
+    ):
+        """Lays out a component, including all of the patterns within it.
+
+        Returns the layout of the component's top level (the layout of each
+        pattern is stored in its Pattern object by Pattern.set_layout()).
+
+        See layout_patterns() for an explanation of the deadline parameter.
+
+        If skeleton is True, this only lays out the top level of the
+        component: the top-level patterns in it are treated as boxes of an
+        estimated size, and nothing inside them is laid out.
+        """
+        if skeleton:
+            for node_id in cc_node_ids:
+                if self.is_pattern(node_id):
+                    self.id2pattern[node_id].estimate_size(self)
+        else:
+            # Lay out all of the patterns in this component (could involve
+            # multiple layers, since patterns can contain other patterns).
+            self.layout_patterns(cc_node_ids, engine, deadline)
+
+        # Lay out this component, using the node and edge data for
+        # top-level nodes and edges as well as the width/height computed
+        # for "pattern nodes" (in which other nodes, edges, and patterns
+        # can be contained).
+        gv_input = layout_utils.get_gv_header()
+
+        # Populate GraphViz input with node information
+        # This mirrors what's done in Pattern.get_gv_input().
+        for node_id in cc_node_ids:
+            if self.is_pattern(node_id):
+                height = self.id2pattern[node_id].height
+                width = self.id2pattern[node_id].width
+                shape = self.id2pattern[node_id].shape
+            else:
+                data = self.digraph.nodes[node_id]
+                height = data["height"]
+                width = data["width"]
+                shape = config.NODE_ORIENTATION_TO_SHAPE[data["orientation"]]
+            gv_input += "\t{} [height={},width={},shape={}];\n".format(
+                node_id, height, width, shape
+            )
+
+        # Add edge info.
+        for edge in top_level_edges:
+            gv_input += "\t{} -> {};\n".format(edge[0], edge[1])
+
+        gv_input += "}"
+        # Actually perform layout for this component!
+        # If you're wondering why MetagenomeScope is taking so long to run
+        # on your graph and you traced your way back to this line of code,
+        # then boy do I have an NP-Hard problem for you .____________.
+        return engine.layout(
+            gv_input, timeout=layout_engines.get_timeout(deadline)
+        )
+
+    def get_complement_name_func(self):
+        """Returns a function that converts a node name to the name of its
+        reverse complement node, or None if the input graph's filetype doesn't
+        have reverse complement nodes (or if we're assuming that the graph is
+        already oriented, in which case we only kept one strand).
+        """
+        if self.assume_oriented:
+            return None
+        if self.filetype in ("gfa", "lastgraph"):
+            return negate_node_id
+        elif self.filetype == "fastg":
+            return negate_fastg_node_id
+        return None
+
+    def iter_basic_node_ids(self, node_ids):
+        """Yields the IDs of all non-pattern nodes in (or, for patterns,
+        within) a collection of node IDs."""
+        stack = list(node_ids)
+        while len(stack) > 0:
+            node_id = stack.pop()
+            if self.is_pattern(node_id):
+                stack.extend(self.id2pattern[node_id].node_ids)
+            else:
+                yield node_id
+
+    def _get_mirror_key(self, node_id, name_func):
+        """Returns a key describing a node or pattern, used to match it with
+        the corresponding node or pattern in a mirror component.
+
+        name_func is applied to all node names, so that calling this with the
+        complement name function on a node in one component gives the same
+        key as calling this with the identity function on the corresponding
+        node in the mirror component.
+        """
+        if self.is_pattern(node_id):
+            patt = self.id2pattern[node_id]
+            return (
+                patt.pattern_type,
+                tuple(
+                    sorted(
+                        name_func(self.digraph.nodes[n]["name"])
+                        for n in self.iter_basic_node_ids(patt.node_ids)
+                    )
+                ),
+            )
+        data = self.digraph.nodes[node_id]
+        return ("node", name_func(data["name"]), data.get("is_dup", False))
+
+    def _match_mirror_nodes(self, node_ids, twin_node_ids, rc, mapping):
+        """Matches up nodes / patterns in a component with those in its
+        mirror component, recursing into patterns.
+
+        Adds matches to mapping. Returns True if everything matched, and False
+        otherwise.
+        """
+        twin_key2id = {}
+        for twin_id in twin_node_ids:
+            key = self._get_mirror_key(twin_id, lambda name: name)
+            if key in twin_key2id:
+                return False
+            twin_key2id[key] = twin_id
+        if len(twin_key2id) != len(node_ids):
+            return False
+        for node_id in node_ids:
+            twin_id = twin_key2id.get(self._get_mirror_key(node_id, rc))
+            if twin_id is None:
+                return False
+            mapping[node_id] = twin_id
+            if self.is_pattern(node_id) and not self._match_mirror_nodes(
+                self.id2pattern[node_id].node_ids,
+                self.id2pattern[twin_id].node_ids,
+                rc,
+                mapping,
+            ):
+                return False
+        return True
+
+    def _edges_are_mirrored(self, edges, twin_edges, mapping):
+        if len(edges) != len(twin_edges):
+            return False
+        for src, tgt in edges:
+            if (mapping[tgt], mapping[src]) not in twin_edges:
+                return False
+        return True
+
+    def get_mirror_mapping(self, cc_node_ids, twin_cc_node_ids, rc):
+        """Tries to match up a component with its reverse complement.
+
+        If the two components have "mirrored" structure -- every node,
+        pattern, and edge in one component has a counterpart in the other
+        component, with edges reversed -- this returns a dict mapping the IDs
+        of all nodes and patterns in the first component to the corresponding
+        IDs in the second component. Otherwise, this returns None.
+
+        The components should have mirrored structure in most cases, but
+        pattern detection doesn't always find the same patterns in a
+        component and its reverse complement.
+        """
+        mapping = {}
+        if not self._match_mirror_nodes(
+            cc_node_ids, twin_cc_node_ids, rc, mapping
+        ):
+            return None
+        if not self._edges_are_mirrored(
+            self.decomposed_digraph.subgraph(cc_node_ids).edges,
+            self.decomposed_digraph.subgraph(twin_cc_node_ids).edges,
+            mapping,
+        ):
+            return None
+        for node_id, twin_id in mapping.items():
+            if self.is_pattern(node_id) and not self._edges_are_mirrored(
+                self.id2pattern[node_id].subgraph.edges,
+                self.id2pattern[twin_id].subgraph.edges,
+                mapping,
+            ):
+                return None
+        return mapping
+
+    def find_mirror_components(self, ccs):
+        """Finds pairs of components that are reverse complements of each
+        other.
 
-    def layout(self):
-        """Lays out the graph's components, handling patterns specially."""
+        ccs should be the output of get_connected_components().
+
+        Returns a dict mapping the index (in ccs) of the second component in
+        each pair to a 2-tuple of (the index of the first component in the
+        pair, the output of get_mirror_mapping() for these components). We
+        only need to lay out the first component in each pair; the layout of
+        the second component can then be derived using mirror_component().
+        """
+        rc = self.get_complement_name_func()
+        if rc is None:
+            return {}
+
+        name2cc_index = {}
+        for i, cc_tuple in enumerate(ccs):
+            for node_id in self.iter_basic_node_ids(cc_tuple[0]):
+                name2cc_index[self.digraph.nodes[node_id]["name"]] = i
+
+        twins = {}
+        paired = set()
+        for i, cc_tuple in enumerate(ccs):
+            # We don't bother with components that we can lay out trivially
+            # (see layout()), or with skeleton components.
+            if i in paired or (cc_tuple[1] == 1 and cc_tuple[2] == 0):
+                continue
+            if self.oversized_components == "skeleton" and (
+                self.is_oversized_component(cc_tuple[0])
+            ):
+                continue
+            some_node_id = next(self.iter_basic_node_ids(cc_tuple[0]))
+            name = self.digraph.nodes[some_node_id]["name"]
+            j = name2cc_index.get(rc(name))
+            # If j == i, then this component is its own reverse complement.
+            if j is None or j <= i or j in paired:
+                continue
+            if ccs[j][1:] != cc_tuple[1:]:
+                continue
+            mapping = self.get_mirror_mapping(cc_tuple[0], ccs[j][0], rc)
+            if mapping is not None:
+                twins[j] = (i, mapping)
+                paired.add(i)
+                paired.add(j)
+        return twins
+
+    def mirror_component(self, src_cc_num, src_cc_node_ids, cc_num, mapping):
+        """Derives the layout of a component from that of its mirror image.
+
+        src_cc_num should be the number of an already-laid-out component
+        (whose top-level node IDs are given in src_cc_node_ids), and
+        mapping should be the output of get_mirror_mapping() for that
+        component and this one. Since this component is the reverse
+        complement of the other component, we can lay it out by just flipping
+        the other component's layout vertically -- all of the edges are
+        reversed, so they still point downwards.
+        """
+        bb = self.cc_num_to_bb[src_cc_num]
+        self.cc_num_to_bb[cc_num] = bb
+        # The bounding box is stored in inches; we need it in points.
+        height = bb[1] * config.POINTS_PER_INCH
+
+        for node_id, twin_id in mapping.items():
+            if self.is_pattern(node_id):
+                patt = self.id2pattern[node_id]
+                twin = self.id2pattern[twin_id]
+                twin.cc_num = cc_num
+                twin.width = patt.width
+                twin.height = patt.height
+                twin.left = patt.left
+                twin.right = patt.right
+                twin.bottom = height - patt.top
+                twin.top = height - patt.bottom
+                # Edge control points within patterns are stored relative to
+                # the pattern's bottom left corner, so we mirror them within
+                # the pattern rather than within the entire component.
+                patt_height = patt.top - patt.bottom
+                for src, tgt, src_data in patt.subgraph.edges(data=True):
+                    data = twin.subgraph.edges[mapping[tgt], mapping[src]]
+                    data["cc_num"] = cc_num
+                    data["ctrl_pt_index"] = self.ctrl_pts.mirror(
+                        src_data["ctrl_pt_index"], patt_height
+                    )
+            else:
+                data = self.digraph.nodes[node_id]
+                twin_data = self.digraph.nodes[twin_id]
+                twin_data["cc_num"] = cc_num
+                twin_data["x"] = data["x"]
+                twin_data["y"] = height - data["y"]
+
+        for src, tgt in self.decomposed_digraph.subgraph(
+            src_cc_node_ids
+        ).edges:
+            data = self.decomposed_digraph.edges[mapping[tgt], mapping[src]]
+            data["cc_num"] = cc_num
+            src_data = self.decomposed_digraph.edges[src, tgt]
+            data["ctrl_pt_index"] = self.ctrl_pts.mirror(
+                src_data["ctrl_pt_index"], height
+            )
+
+    def layout(self, profiler=None, cc_nums=None, ccs=None):
+        """Lays out the graph's components, handling patterns specially.
+
+        If profiler (a profile_utils.Profiler) is given, the layout of each
+        component is profiled.
+
+        If cc_nums (a collection of component numbers, as used in
+        self.cc_num_to_bb) is given, only these components are laid out; this
+        is used to lay out components on demand (see serve.py). These
+        components are always laid out from scratch, since the components
+        they mirror may not have been laid out (or may have already been
+        rotated). ccs, if given, should be the output of
+        self.get_connected_components(); this saves us from recomputing it.
+        """
+        if profiler is None:
+            profiler = profile_utils.Profiler()
         # Do layout one component at a time.
         # (We don't bother checking for skipped components, since we should
         # have already called self.remove_too_large_components().)
         first_small_component = False
+        if ccs is None:
+            ccs = self.get_connected_components()
+        # Components that are reverse complements of earlier components don't
+        # need to be laid out from scratch.
+        twins = {}
+        if cc_nums is None:
+            twins = self.find_mirror_components(ccs)
         for cc_i, cc_tuple in enumerate(
-            self.get_connected_components(), self.num_too_large_components + 1
+            ccs, self.num_too_large_components + 1
         ):
+            if cc_nums is not None and cc_i not in cc_nums:
+                continue
             cc_node_ids = cc_tuple[0]
             cc_full_node_ct = cc_tuple[1]
             cc_full_edge_ct = cc_tuple[2]
+            profiler.start_component(cc_i, cc_full_node_ct, cc_full_edge_ct)
+
+            # Oversized components (if we haven't removed them) are either
+            # laid out using a faster engine or just have their skeleton laid
+            # out using the normal engine.
+            oversized = self.is_oversized_component(cc_node_ids)
+            skeleton = oversized and self.oversized_components == "skeleton"
+            engine = self.layout_engine
+            deadline = None
+            if oversized and not skeleton:
+                engine = self.oversized_layout_engine
+            elif self.layout_time_budget is not None:
+                deadline = time.monotonic() + self.layout_time_budget
+            if skeleton:
+                self.skeleton_cc_nums.add(cc_i)
 
             if cc_full_node_ct >= 5:
                 operation_msg(
@@ -1529,75 +2215,74 @@ class AssemblyGraph(object):
                         data["width"] + 0.1,
                         data["height"] + 0.1,
                     )
+                    self.cc_num_to_layout_engine[cc_i] = engine.prog
                     continue
 
-            # Lay out this component, using the node and edge data for
-            # top-level nodes and edges as well as the width/height computed
-            # for "pattern nodes" (in which other nodes, edges, and patterns
-            # can be contained).
-            gv_input = layout_utils.get_gv_header()
+            cc_index = cc_i - self.num_too_large_components - 1
+            if cc_index in twins:
+                src_index, mapping = twins[cc_index]
+                src_cc_num = src_index + self.num_too_large_components + 1
+                self.mirror_component(
+                    src_cc_num, ccs[src_index][0], cc_i, mapping
+                )
+                src_engine = self.cc_num_to_layout_engine[src_cc_num]
+                self.cc_num_to_layout_engine[cc_i] = src_engine
+                if not first_small_component:
+                    conclude_msg(
+                        "Done (mirrored component {:,}).".format(src_cc_num)
+                    )
+                continue
 
-            # Populate GraphViz input with node information
-            # This mirrors what's done in Pattern.layout().
-            # Also, while we're at it, set component numbers to make traversal
-            # easier later on.
+            # Set component numbers to make traversal easier later on.
             for node_id in cc_node_ids:
                 if self.is_pattern(node_id):
                     self.id2pattern[node_id].set_cc_num(self, cc_i)
-                    # Lay out the pattern in isolation (could involve multiple
-                    # layers, since patterns can contain other patterns).
-                    self.id2pattern[node_id].layout(self)
-                    height = self.id2pattern[node_id].height
-                    width = self.id2pattern[node_id].width
-                    shape = self.id2pattern[node_id].shape
                 else:
-                    data = self.digraph.nodes[node_id]
-                    data["cc_num"] = cc_i
-                    height = data["height"]
-                    width = data["width"]
-                    shape = config.NODE_ORIENTATION_TO_SHAPE[
-                        data["orientation"]
-                    ]
-                gv_input += "\t{} [height={},width={},shape={}];\n".format(
-                    node_id, height, width, shape
-                )
-
-            # Add edge info.
+                    self.digraph.nodes[node_id]["cc_num"] = cc_i
             top_level_edges = self.decomposed_digraph.subgraph(
                 cc_node_ids
             ).edges
             for edge in top_level_edges:
-                gv_input += "\t{} -> {};\n".format(edge[0], edge[1])
                 self.decomposed_digraph.edges[edge]["cc_num"] = cc_i
 
-            gv_input += "}"
-            top_level_cc_graph = pygraphviz.AGraph(gv_input)
-            # Actually perform layout for this component!
-            # If you're wondering why MetagenomeScope is taking so long to run
-            # on your graph and you traced your way back to this line of code,
-            # then boy do I have an NP-Hard problem for you .____________.
-            top_level_cc_graph.layout(prog="dot")
-
-            # Output the layout info for this component to an xdot file
-            # (TODO, reenable with the -px option; will be nice for debugging)
-            # top_level_cc_graph.draw("cc_{}.xdot".format(cc_i))
+            # Lay out the component. If there's a time budget and we go over
+            # it, throw away whatever we've done so far for this component and
+            # lay it out again using the (hopefully much faster) fallback
+            # engine.
+            try:
+                dot_layout = self.layout_component(
+                    cc_node_ids, top_level_edges, engine, deadline, skeleton
+                )
+            except layout_engines.LayoutTimeoutError:
+                engine = self.fallback_layout_engine
+                operation_msg(
+                    "Component {:,} took more than {:,} second(s) to lay "
+                    "out; laying it out using {} instead...".format(
+                        cc_i, self.layout_time_budget, engine.prog
+                    )
+                )
+                dot_layout = self.layout_component(
+                    cc_node_ids, top_level_edges, engine, None, skeleton
+                )
+            self.cc_num_to_layout_engine[cc_i] = engine.prog
+            bb, node_pos, edge_pos = dot_layout
 
-            self.cc_num_to_bb[cc_i] = layout_utils.get_bb_x2_y2(
-                top_level_cc_graph.graph_attr["bb"]
-            )
+            self.cc_num_to_bb[cc_i] = layout_utils.get_bb_x2_y2(bb)
 
             # Go through _all_ nodes, edges, and patterns within this
             # component and set final position information. Nodes and edges
             # within patterns will need to be updated based on their parent
             # pattern's position information.
             for node_id in cc_node_ids:
-                gv_node = top_level_cc_graph.get_node(node_id)
                 # The (x, y) position for this node describes its center pos
-                x, y = layout_utils.getxy(gv_node.attr["pos"])
+                x, y = layout_utils.getxy(node_pos[node_id])
 
                 if self.is_pattern(node_id):
                     patt = self.id2pattern[node_id]
                     patt.set_bb(x, y)
+                    if skeleton:
+                        # Nothing inside this pattern was laid out.
+                        continue
 
                     # "Reconcile" child nodes, edges, and patterns' relative
                     # positions with the absolute position of this pattern in
@@ -1637,35 +2322,36 @@ class AssemblyGraph(object):
                                 data["y"] = (
                                     curr_patt.bottom + data["relative_y"]
                                 )
-
-                        for edge in curr_patt.subgraph.edges:
-                            data = curr_patt.subgraph.edges[edge]
-                            data[
-                                "ctrl_pt_coords"
-                            ] = layout_utils.shift_control_points(
-                                data["relative_ctrl_pt_coords"],
-                                curr_patt.left,
-                                curr_patt.bottom,
-                            )
+                        # (Edges within patterns are shifted all at once,
+                        # after all components have been laid out -- see
+                        # self.shift_pattern_ctrl_pts().)
 
                 else:
                     # Save data for this normal node
                     self.digraph.nodes[node_id]["x"] = x
                     self.digraph.nodes[node_id]["y"] = y
 
-            # Save ctrl pt data for top-level edges
+            # Save ctrl pt data for top-level edges. These are already in the
+            # component's coordinate system, so they won't need to be shifted.
             for edge in top_level_edges:
                 data = self.decomposed_digraph.edges[edge]
-                gv_edge = top_level_cc_graph.get_edge(*edge)
-                coords = layout_utils.get_control_points(gv_edge.attr["pos"])
-                data["ctrl_pt_coords"] = coords
+                coords = layout_utils.get_control_points(edge_pos[edge])
+                data["ctrl_pt_index"] = self.ctrl_pts.add(coords)
 
             if not first_small_component:
                 conclude_msg()
 
+        profiler.stop_component()
         if first_small_component:
             conclude_msg()
 
+        # Shut down any processes the layout engine(s) started.
+        self.layout_engine.close()
+        if self.fallback_layout_engine is not None:
+            self.fallback_layout_engine.close()
+
+        self.shift_pattern_ctrl_pts(cc_nums)
+
         # At this point, we are now done with layout. Coordinate information
         # for nodes and edges is stored in self.digraph or in the
         # subgraphs of patterns; coordinate information for patterns is stored
@@ -1673,6 +2359,47 @@ class AssemblyGraph(object):
         # be able to make a JSON representation of this graph and move on to
         # visualizing it in the browser!
 
+    def shift_pattern_ctrl_pts(self, cc_nums=None):
+        """Converts the control points of edges within patterns to absolute
+        coordinates.
+
+        During layout, the control points of each edge within a pattern are
+        stored relative to the pattern's bottom left corner (top-level edges'
+        control points are already absolute). Rather than shifting these one
+        edge at a time, we shift all of them at once, in place -- so the
+        relative coordinates aren't kept around after this.
+
+        If cc_nums is given, only patterns in these components are shifted.
+        """
+        indices = []
+        lefts = []
+        bottoms = []
+        for patt in self.id2pattern.values():
+            if cc_nums is not None and patt.cc_num not in cc_nums:
+                continue
+            # Skeleton components' patterns weren't laid out internally
+            if patt.cc_num in self.skeleton_cc_nums:
+                continue
+            for _, _, index in patt.subgraph.edges(data="ctrl_pt_index"):
+                indices.append(index)
+                lefts.append(patt.left)
+                bottoms.append(patt.bottom)
+        self.ctrl_pts.shift(
+            numpy.array(indices, dtype=numpy.int64),
+            numpy.array(lefts, dtype=numpy.float32),
+            numpy.array(bottoms, dtype=numpy.float32),
+        )
+
+    def get_ctrl_pt_coords(self, edge_data):
+        """Returns a list of an edge's control point coordinates.
+
+        edge_data should be the edge's data dict. Coordinates are rounded to
+        self.output_precision decimal places.
+        """
+        return self.ctrl_pts.get_list(
+            edge_data["ctrl_pt_index"], decimals=self.output_precision
+        )
+
     def dot(self, output_filepath, component_number):
         """TODO. Visualizes a component of the laid out graph.
 
@@ -1687,18 +2414,30 @@ class AssemblyGraph(object):
     def to_cytoscape_compatible_format(self):
         """TODO."""
 
-    def to_dict(self):
-        """Returns a dict representation of the graph usable as JSON.
+    def iter_dict_parts(self, cc_nums=None, ccs=None):
+        """Generates a dict representation of the graph usable as JSON, one
+        piece at a time.
 
-        (The dict will need to be pushed through json.dumps() first in order
-        to make it valid JSON, of course -- e.g. converting Nones to nulls,
-        etc.)
+        The first thing yielded is a dict of "global" information about the
+        graph; after that, this yields one dict for each component in the
+        graph (in the order used by self.get_connected_components(), preceded
+        by placeholders for components that were too large to lay out, and
+        followed by placeholders for components that weren't selected). Only
+        one component's dict is created at a time, so callers that write
+        these out as they go (see self.write_json()) never need to hold the
+        entire graph's representation in memory.
 
         This should be analogous to the SQLite3 database schema previously
         used for MgSc.
 
         Should only be called after self.process() has already been called.
 
+        If cc_nums (a collection of component numbers) is given, then only
+        the dicts for these components are yielded after the global
+        information (without any placeholders), and only these components
+        need to have been laid out; see serve.py. ccs is the same as in
+        self.layout().
+
         Inspired by to_dict() in Empress.
         """
         # Determine what data we'll export. Each node and edge should have a
@@ -1743,6 +2482,28 @@ class AssemblyGraph(object):
             "pattern_type",
             "parent_id",
         ]
+        # Positions, dimensions, and edge weights are rounded to
+        # self.output_precision decimal places as we export them: the viewer
+        # doesn't need full-precision floats, and they take up a lot of space.
+        rounded_fields = set(
+            [
+                "x",
+                "y",
+                "width",
+                "height",
+                "left",
+                "bottom",
+                "right",
+                "top",
+                "relative_weight",
+            ]
+        )
+
+        def get_rounded(attr, val):
+            if attr in rounded_fields and val is not None:
+                return round(float(val), self.output_precision)
+            return val
+
         # These dicts map field names to 0-indexed position in a data list
         NODE_ATTRS = {}
         EDGE_ATTRS = {}
@@ -1790,7 +2551,9 @@ class AssemblyGraph(object):
                         )
 
                 else:
-                    out_node_data[NODE_ATTRS[attr]] = graph_node_data[attr]
+                    out_node_data[NODE_ATTRS[attr]] = get_rounded(
+                        attr, graph_node_data[attr]
+                    )
 
             return out_node_data
 
@@ -1801,7 +2564,15 @@ class AssemblyGraph(object):
             for attr in EDGE_ATTRS.keys():
                 val = None
 
-                if attr not in graph_edge_data:
+                if attr == "ctrl_pt_coords" and "ctrl_pt_index" in (
+                    graph_edge_data
+                ):
+                    # Control points are stored separately from the other
+                    # edge data; see self.ctrl_pts.
+                    out_edge_data[EDGE_ATTRS[attr]] = self.get_ctrl_pt_coords(
+                        graph_edge_data
+                    )
+                elif attr not in graph_edge_data:
                     # If this is a duplicate edge (i.e. connecting a dup node
                     # and its original node), then it isn't a "real" edge -- so
                     # it is to be expected that it won't have this data.
@@ -1822,7 +2593,7 @@ class AssemblyGraph(object):
                             )
                         )
                 else:
-                    val = graph_edge_data[attr]
+                    val = get_rounded(attr, graph_edge_data[attr])
                     out_edge_data[EDGE_ATTRS[attr]] = val
 
             return (
@@ -1831,6 +2602,19 @@ class AssemblyGraph(object):
                 out_edge_data,
             )
 
+        def get_patt_data(patt):
+            """Analogue of get_node_data() for patterns.
+
+            All of the stuff in PATT_ATTRS should be literal attributes of
+            Pattern objects, so this is blessedly simple (ish).
+            """
+            out_patt_data = [None] * len(PATT_ATTRS)
+            for attr in PATT_ATTRS.keys():
+                out_patt_data[PATT_ATTRS[attr]] = get_rounded(
+                    attr, getattr(patt, attr)
+                )
+            return out_patt_data
+
         def add_edge(component_dict, edge, edge_data):
             if edge[0] in component_dict["edges"]:
                 if edge[1] in component_dict["edges"][edge[0]]:
@@ -1843,44 +2627,60 @@ class AssemblyGraph(object):
             else:
                 component_dict["edges"][edge[0]] = {edge[1]: edge_data}
 
-        # This is the dict we'll return from this function.
-        out = {
+        # This is the first thing we yield from this function.
+        header = {
             "node_attrs": NODE_ATTRS,
             "edge_attrs": EDGE_ATTRS,
             "patt_attrs": PATT_ATTRS,
             "extra_node_attrs": list(self.extra_node_attrs),
             "extra_edge_attrs": list(self.extra_edge_attrs),
-            "components": [],
             "input_file_basename": self.basename,
             "input_file_type": self.filetype,
             "total_num_nodes": self.digraph.number_of_nodes(),
             "total_num_edges": self.digraph.number_of_edges(),
         }
+        yield header
 
         # Hack: indicate the number of skipped components in the exported data.
         # There are obviously much more efficient ways to do this (e.g. just
         # pass the number of skipped components as a global data property), but
         # this works with the JS I have set up right now and dude it's 5am give
         # me a break
-        for n in range(self.num_too_large_components):
-            out["components"].append({"skipped": True})
+        if cc_nums is None:
+            for n in range(self.num_too_large_components):
+                yield {"skipped": True}
 
         # For each component:
         # (This is the same general strategy for iterating through the graph as
         # self.layout() uses.)
+        if ccs is None:
+            ccs = self.get_connected_components()
         for cc_i, cc_tuple in enumerate(
-            self.get_connected_components(), self.num_too_large_components + 1
+            ccs, self.num_too_large_components + 1
         ):
+            if cc_nums is not None and cc_i not in cc_nums:
+                continue
+            skeleton = cc_i in self.skeleton_cc_nums
             this_component = {
                 "nodes": {},
                 "edges": {},
                 "patts": [],
-                "bb": self.cc_num_to_bb[cc_i],
+                "bb": [
+                    round(float(v), self.output_precision)
+                    for v in self.cc_num_to_bb[cc_i]
+                ],
+                "layout_engine": self.cc_num_to_layout_engine[cc_i],
                 "skipped": False,
+                "skeleton": skeleton,
             }
             # Go through top-level nodes and collapsed patterns
             for node_id in cc_tuple[0]:
-                if self.is_pattern(node_id):
+                if skeleton and self.is_pattern(node_id):
+                    # Only the top level of this component was laid out, so
+                    # just add this pattern (and none of its descendants).
+                    patt = self.id2pattern[node_id]
+                    this_component["patts"].append(get_patt_data(patt))
+                elif self.is_pattern(node_id):
                     # Add pattern data, and data for child + descendant
                     # nodes and edges
                     patt = self.id2pattern[node_id]
@@ -1888,9 +2688,7 @@ class AssemblyGraph(object):
                     while len(patt_queue) > 0:
                         curr_patt = patt_queue.popleft()
 
-                        # Add data for this pattern. All of the stuff in
-                        # PATT_ATTRS should be literal attributes of Pattern
-                        # objects, so this step is blessedly simple (ish).
+                        # Add data for this pattern.
                         #
                         # One important thing to note: we store patterns in a
                         # list, not in a dict. This is because we unfortunately
@@ -1902,10 +2700,9 @@ class AssemblyGraph(object):
                         # for each component such that every pattern is added
                         # before its child pattern(s) are, we avoid this
                         # problem.
-                        data = [None] * len(PATT_ATTRS)
-                        for attr in PATT_ATTRS.keys():
-                            data[PATT_ATTRS[attr]] = getattr(curr_patt, attr)
-                        this_component["patts"].append(data)
+                        this_component["patts"].append(
+                            get_patt_data(curr_patt)
+                        )
 
                         # Add data for the nodes within this pattern, and add
                         # patterns within this pattern to the queue.
@@ -1946,14 +2743,201 @@ class AssemblyGraph(object):
                     edge[1],
                     self.decomposed_digraph.edges[edge],
                 )
+                if skeleton:
+                    # The nodes this edge originally pointed to might be
+                    # inside patterns, which aren't included in the skeleton.
+                    # So just connect the top-level nodes / patterns instead.
+                    os, ot = edge
                 add_edge(this_component, [os, ot], data)
 
             # Since we're going through components in the order dictated by
-            # self.get_connected_components() we can just add component JSONs
-            # to out["components"] as we go through things.
-            out["components"].append(this_component)
+            # self.get_connected_components() we can just yield component
+            # JSONs as we go through things.
+            yield this_component
+
+        # Components that weren't selected (see self.select_components()) are
+        # smaller than the ones we kept, so they go at the end
+        if cc_nums is None:
+            for n in range(self.num_unselected_components):
+                yield {"skipped": True}
+
+    def to_dict(self):
+        """Returns a dict representation of the graph usable as JSON.
+
+        (The dict will need to be pushed through json.dumps() first in order
+        to make it valid JSON, of course -- e.g. converting Nones to nulls,
+        etc.)
+
+        This builds the entire representation at once; see
+        self.iter_dict_parts() and self.write_json() for a way to avoid that.
+        """
+        parts = self.iter_dict_parts()
+        out = next(parts)
+        out["components"] = list(parts)
         return out
 
+    def write_json(self, json_file):
+        """Writes a JSON representation of the graph to a file object.
+
+        The output is equivalent to json.dumps(self.to_dict()), but components
+        are serialized and written one at a time as they're produced.
+        """
+        parts = self.iter_dict_parts()
+        header = next(parts)
+        json_file.write("{")
+        for key, val in header.items():
+            json_file.write(
+                "{}: {}, ".format(json.dumps(key), json.dumps(val))
+            )
+        json_file.write('"components": [')
+        for i, component in enumerate(parts):
+            if i > 0:
+                json_file.write(", ")
+            json.dump(component, json_file)
+        json_file.write("]}")
+
+    def write_data_chunks(
+        self,
+        output_dir,
+        chunk_size=config.DATA_CHUNK_SIZE,
+        data_format=config.DATA_FORMAT_DEFAULT,
+        compress=False,
+    ):
+        """Writes the graph's component data to "chunk" files in output_dir,
+        and returns a small index describing these chunks.
+
+        Each chunk file is a JS file (so that the viewer can load it using
+        RequireJS, even when it's being viewed using file://) that defines an
+        object mapping components' size ranks to their data, formatted as in
+        self.iter_dict_parts(). Consecutive components are added to a chunk
+        until it contains at least chunk_size nodes + edges + patterns. If
+        data_format is "columnar", each component's data is converted using
+        columnar_utils.encode_component() before being written out.
+
+        If compress is True, the object in each chunk file is gzipped, and
+        the chunk file instead defines an object with a single "gzip" key
+        mapping to the base64-encoded gzipped data. (The viewer decompresses
+        this using a DecompressionStream.)
+
+        The returned index is formatted like self.to_dict(), except that each
+        laid-out component only has a few summary fields (bounding box, layout
+        engine, skeleton flag, node and edge counts, and the names of its
+        nodes -- so that the viewer can search for a node without loading
+        every chunk) plus the position of its chunk file in "chunk_files".
+
+        Chunk files are written as components are produced, so at most one
+        chunk's worth of component data is held in memory at once.
+        """
+        if data_format not in config.DATA_FORMAT_CHOICES:
+            raise ValueError(
+                "Unrecognized data format: {}".format(data_format)
+            )
+        chunk_dir = os.path.join(output_dir, config.DATA_CHUNK_DIR)
+        os.makedirs(chunk_dir, exist_ok=True)
+
+        parts = self.iter_dict_parts()
+        index = next(parts)
+        index["chunk_files"] = []
+        index["components"] = []
+        name_pos = index["node_attrs"]["name"]
+
+        # chunk_file is the actual file we're writing to; chunk_out is where
+        # we write the chunk's data (either chunk_file, or a gzip stream that
+        # we write out to chunk_file once we're done with this chunk).
+        chunk_file = None
+        chunk_out = None
+        chunk_gzip_buffer = None
+
+        def open_chunk():
+            chunk_path = "{}/chunk{}.js".format(
+                config.DATA_CHUNK_DIR, len(index["chunk_files"]) + 1
+            )
+            index["chunk_files"].append(chunk_path)
+            chunk_file = open(os.path.join(output_dir, chunk_path), "w")
+            chunk_gzip_buffer = None
+            if compress:
+                # mtime=0 keeps the output the same across runs
+                chunk_gzip_buffer = io.BytesIO()
+                chunk_out = io.TextIOWrapper(
+                    gzip.GzipFile(
+                        fileobj=chunk_gzip_buffer, mode="wb", mtime=0
+                    ),
+                    encoding="utf-8",
+                )
+            else:
+                chunk_file.write("define(")
+                chunk_out = chunk_file
+            chunk_out.write("{")
+            return chunk_file, chunk_out, chunk_gzip_buffer
+
+        def close_chunk(chunk_file, chunk_out, chunk_gzip_buffer):
+            chunk_out.write("}")
+            if compress:
+                # Closing the gzip stream writes out the gzip trailer, but
+                # doesn't close chunk_gzip_buffer
+                chunk_out.close()
+                chunk_file.write('define({"gzip": "')
+                chunk_file.write(
+                    base64.b64encode(chunk_gzip_buffer.getvalue()).decode(
+                        "ascii"
+                    )
+                )
+                chunk_file.write('"}')
+            chunk_file.write(");\n")
+            chunk_file.close()
+
+        chunk_fill = 0
+        for size_rank, component in enumerate(parts, 1):
+            if component["skipped"]:
+                index["components"].append(component)
+                continue
+
+            if chunk_file is None:
+                chunk_file, chunk_out, chunk_gzip_buffer = open_chunk()
+            else:
+                chunk_out.write(", ")
+            chunk_out.write('"{}": '.format(size_rank))
+            if data_format == "columnar":
+                json.dump(
+                    columnar_utils.encode_component(
+                        component,
+                        index["node_attrs"],
+                        index["edge_attrs"],
+                        index["patt_attrs"],
+                    ),
+                    chunk_out,
+                )
+            else:
+                json.dump(component, chunk_out)
+
+            num_edges = sum(len(tgts) for tgts in component["edges"].values())
+            index["components"].append(
+                {
+                    "skipped": False,
+                    "bb": component["bb"],
+                    "layout_engine": component["layout_engine"],
+                    "skeleton": component["skeleton"],
+                    "num_nodes": len(component["nodes"]),
+                    "num_edges": num_edges,
+                    "node_names": sorted(
+                        set(n[name_pos] for n in component["nodes"].values())
+                    ),
+                    "chunk": len(index["chunk_files"]) - 1,
+                }
+            )
+
+            chunk_fill += (
+                len(component["nodes"]) + num_edges + len(component["patts"])
+            )
+            if chunk_fill >= chunk_size:
+                close_chunk(chunk_file, chunk_out, chunk_gzip_buffer)
+                chunk_file = None
+                chunk_fill = 0
+
+        if chunk_file is not None:
+            close_chunk(chunk_file, chunk_out, chunk_gzip_buffer)
+        return index
+
     def to_json(self):
         """Calls self.to_dict() and then pushes that through json.dumps().
 
@@ -1964,10 +2948,18 @@ class AssemblyGraph(object):
         """
         return json.dumps(self.to_dict())
 
-    def rotate_from_TB_to_LR(self):
-        """Rotates the graph so it flows from L -> R rather than T -> B."""
+    def rotate_from_TB_to_LR(self, cc_nums=None, ctrl_pt_start=0):
+        """Rotates the graph so it flows from L -> R rather than T -> B.
+
+        If cc_nums is given, only these components are rotated. In this case
+        ctrl_pt_start should be the number of edges that were in self.ctrl_pts
+        before these components were laid out, so that only the control
+        points added since then are rotated.
+        """
+        if cc_nums is None:
+            cc_nums = self.cc_num_to_bb.keys()
         # Rotate and scale bounding boxes
-        for cc_num in self.cc_num_to_bb.keys():
+        for cc_num in cc_nums:
             bb = self.cc_num_to_bb[cc_num]
             self.cc_num_to_bb[cc_num] = [
                 bb[1] * config.POINTS_PER_INCH,
@@ -1976,6 +2968,12 @@ class AssemblyGraph(object):
 
         # Rotate patterns
         for patt in self.id2pattern.values():
+            if patt.cc_num not in cc_nums:
+                continue
+            # In skeleton components, only top-level patterns were laid out.
+            in_skeleton = patt.cc_num in self.skeleton_cc_nums
+            if in_skeleton and patt.parent_id is not None:
+                continue
             # Swap height and width
             patt.width, patt.height = patt.height, patt.width
             patt.width *= config.POINTS_PER_INCH
@@ -1993,54 +2991,161 @@ class AssemblyGraph(object):
             patt.top = -r
             patt.bottom = -l
 
-            # Rotate edges within this pattern
-            for edge in patt.subgraph.edges:
-                data = patt.subgraph.edges[edge]
-                data["ctrl_pt_coords"] = layout_utils.rotate_ctrl_pt_coords(
-                    data["ctrl_pt_coords"]
-                )
+        # Rotate and scale normal nodes. We gather everything into arrays
+        # first so that the math can be done all at once.
+        node_data = [
+            data
+            for _, data in self.digraph.nodes(data=True)
+            if data.get("cc_num") in cc_nums
+            and not (
+                data["cc_num"] in self.skeleton_cc_nums
+                and data["parent_id"] is not None
+            )
+        ]
+        cols = {}
+        for attr in ("width", "height", "x", "y"):
+            cols[attr] = numpy.fromiter(
+                (data[attr] for data in node_data),
+                dtype=numpy.float64,
+                count=len(node_data),
+            )
+        # Swap height and width (and convert them from inches to points)
+        new_widths = cols["height"] * config.POINTS_PER_INCH
+        new_heights = cols["width"] * config.POINTS_PER_INCH
+        new_xs, new_ys = layout_utils.rotate(cols["x"], cols["y"])
+        for data, w, h, x, y in zip(
+            node_data,
+            new_widths.tolist(),
+            new_heights.tolist(),
+            new_xs.tolist(),
+            new_ys.tolist(),
+        ):
+            data["width"] = w
+            data["height"] = h
+            data["x"] = x
+            data["y"] = y
 
-        # Rotate normal nodes
-        for node_id in self.digraph.nodes:
-            data = self.digraph.nodes[node_id]
-            data["width"], data["height"] = data["height"], data["width"]
-            data["width"] *= config.POINTS_PER_INCH
-            data["height"] *= config.POINTS_PER_INCH
-            if "x" not in data:
-                print(data, "tf lol")
-            data["x"], data["y"] = layout_utils.rotate(data["x"], data["y"])
-
-        # Rotate edges
-        for edge in self.decomposed_digraph.edges:
-            data = self.decomposed_digraph.edges[edge]
-            data["ctrl_pt_coords"] = layout_utils.rotate_ctrl_pt_coords(
-                data["ctrl_pt_coords"]
+        # Rotate edges (both top-level edges and edges within patterns)
+        self.ctrl_pts.rotate(ctrl_pt_start)
+
+    def use_layout_cache(self, layout_cache):
+        """Makes the layout engines reuse / store layouts in a LayoutCache.
+
+        See checkpoint_utils.py.
+        """
+        self.layout_engine = layout_engines.CachingEngine(
+            self.layout_engine, layout_cache
+        )
+        if self.fallback_layout_engine is not None:
+            self.fallback_layout_engine = layout_engines.CachingEngine(
+                self.fallback_layout_engine, layout_cache
+            )
+        if self.oversized_layout_engine is not None:
+            self.oversized_layout_engine = layout_engines.CachingEngine(
+                self.oversized_layout_engine, layout_cache
             )
 
-    def process(self):
-        """Basic pipeline for preparing a graph for visualization."""
-
-        # Node/edge scaling is done *before* pattern detection, so duplicate
-        # nodes/edges created during pattern detection shouldn't influence
-        # relative scaling stuff. (For what it's worth, duplicate nodes should
-        # be drawn with the same width/height/etc. as their original node, and
-        # duplicate edges (linking one duplicate node with another) should just
-        # be drawn as non-outlier edges with a special style.
-        operation_msg("Scaling nodes based on lengths...")
-        self.scale_nodes()
-        self.compute_node_dimensions()
-        conclude_msg()
+    def complete_stage(self, stage, work_dir):
+        """Records that a stage of process() is done, and checkpoints this
+        object to work_dir (if work_dir isn't None).
+        """
+        self.completed_stages.append(stage)
+        if work_dir is not None:
+            operation_msg("Saving a checkpoint to {}...".format(work_dir))
+            checkpoint_utils.save_graph(self, work_dir)
+            conclude_msg()
 
-        self.scale_edges()
+    def decompose(self, work_dir=None, profiler=None):
+        """Scales nodes and edges, then identifies patterns in the graph.
 
-        operation_msg("Running hierarchical pattern decomposition...")
-        self.hierarchically_identify_patterns()
-        conclude_msg()
+        This is the first part of self.process(); work_dir and profiler are
+        the same as there. This is done separately when components are laid
+        out on demand (see serve.py).
+        """
+        if profiler is None:
+            profiler = profile_utils.Profiler()
+
+        if "decomposed" in self.completed_stages:
+            operation_msg(
+                "Skipping node/edge scaling and pattern decomposition "
+                "(already done in the checkpoint).",
+                True,
+            )
+        else:
+            # Node/edge scaling is done *before* pattern detection, so
+            # duplicate nodes/edges created during pattern detection shouldn't
+            # influence relative scaling stuff. (For what it's worth,
+            # duplicate nodes should be drawn with the same width/height/etc.
+            # as their original node, and duplicate edges (linking one
+            # duplicate node with another) should just be drawn as
+            # non-outlier edges with a special style.
+            with profiler.stage("scale"):
+                operation_msg("Scaling nodes based on lengths...")
+                self.scale_nodes()
+                self.compute_node_dimensions()
+                conclude_msg()
 
-        operation_msg("Laying out the graph...", True)
-        self.layout()
-        operation_msg("...Finished laying out the graph.", True)
+                self.scale_edges()
 
-        operation_msg("Rotating and scaling things as needed...")
-        self.rotate_from_TB_to_LR()
-        conclude_msg()
+            with profiler.stage("decompose"):
+                operation_msg("Running hierarchical pattern decomposition...")
+                self.hierarchically_identify_patterns(
+                    profiler.decomposition_stats
+                )
+                conclude_msg()
+            self.complete_stage("decomposed", work_dir)
+
+    def process(self, work_dir=None, profiler=None):
+        """Basic pipeline for preparing a graph for visualization.
+
+        If work_dir is given, then this object is checkpointed to it after
+        each stage of the pipeline, and every layout done is saved there as
+        soon as it's done (see checkpoint_utils.py). Stages that have already
+        been completed (if this object was loaded from a checkpoint) are
+        skipped.
+
+        If profiler (a profile_utils.Profiler) is given, each stage (and the
+        layout of each component) is profiled.
+        """
+        if profiler is None:
+            profiler = profile_utils.Profiler()
+
+        self.decompose(work_dir, profiler)
+
+        if "laid_out" in self.completed_stages:
+            operation_msg(
+                "Skipping layout (already done in the checkpoint).", True
+            )
+            return
+
+        layout_cache = None
+        if work_dir is not None:
+            layout_cache = checkpoint_utils.LayoutCache(
+                os.path.join(work_dir, config.CHECKPOINT_LAYOUTS_FILE)
+            )
+            if len(layout_cache) > 0:
+                operation_msg(
+                    "Reusing {} layout(s) saved in the checkpoint.".format(
+                        len(layout_cache)
+                    ),
+                    True,
+                )
+            self.use_layout_cache(layout_cache)
+        try:
+            with profiler.stage("layout"):
+                operation_msg("Laying out the graph...", True)
+                self.layout(profiler)
+                operation_msg("...Finished laying out the graph.", True)
+        finally:
+            if layout_cache is not None:
+                layout_cache.close()
+                # Get rid of the CachingEngines, since the cache is closed now
+                self.init_layout_engines(self.dot_processes)
+
+        # (Rotation is part of the same stage as layout since it changes the
+        # layout in place, so it can't be safely redone.)
+        with profiler.stage("rotate"):
+            operation_msg("Rotating and scaling things as needed...")
+            self.rotate_from_TB_to_LR()
+            conclude_msg()
+        self.complete_stage("laid_out", work_dir)
@@ -17,7 +17,6 @@
 # along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
 
 
-import pygraphviz
 from metagenomescope import config, layout_utils
 
 
@@ -109,32 +108,23 @@ class Pattern(object):
         for edge in self.subgraph.edges:
             self.subgraph.edges[edge]["cc_num"] = cc_num
 
-    def layout(self, asm_graph):
-        # Recursively go through all of the nodes within this pattern. If any
-        # of these isn't actually a node (and is actually a pattern), then lay
-        # out that pattern!
-        id2pattern = {}
-        for node_id in self.node_ids:
-            if asm_graph.is_pattern(node_id):
-                asm_graph.id2pattern[node_id].layout(asm_graph)
-                id2pattern[node_id] = asm_graph.id2pattern[node_id]
-
-        # Now that all of the patterns (if present) within this pattern have
-        # been laid out, lay out this pattern.
+    def get_gv_input(self, asm_graph):
+        """Returns a DOT string describing the contents of this pattern.
 
+        All of the patterns within this pattern need to have already been laid
+        out (so that we know how large they are).
+        """
         gv_input = layout_utils.get_gv_header()
 
         # Add node info
         for node_id in self.node_ids:
-            if node_id in id2pattern:
+            if asm_graph.is_pattern(node_id):
                 # If this node is a collapsed pattern, get its dimensions from
-                # its Pattern object using id2pattern.
-                # This is a pretty roundabout way of doing this but it works
-                # and honestly that is all I can hope for right now. Out of all
-                # the years that have happened, 2020 certainly is one of them.
-                height = id2pattern[node_id].height
-                width = id2pattern[node_id].width
-                shape = id2pattern[node_id].shape
+                # its Pattern object.
+                child_patt = asm_graph.id2pattern[node_id]
+                height = child_patt.height
+                width = child_patt.width
+                shape = child_patt.shape
             else:
                 # If this is a normal node, get its dimensions from the
                 # graph. Shape is based on the node's orientation, which should
@@ -153,24 +143,27 @@ class Pattern(object):
             gv_input += "\t{} -> {};\n".format(edge[0], edge[1])
 
         gv_input += "}"
+        return gv_input
 
-        # Now, we can lay out this pattern's graph! Yay.
-        cg = pygraphviz.AGraph(gv_input)
-        cg.layout(prog="dot")
+    def set_layout(self, dot_layout, asm_graph):
+        """Records the results of laying out this pattern.
+
+        dot_layout should be the layout of this pattern's DOT string (from
+        self.get_gv_input()), as produced by one of the engines in
+        layout_engines.
+        """
+        bb, node_pos, edge_pos = dot_layout
 
         # Extract dimension info. The first two coordinates in the bounding box
         # (bb) should always be (0, 0).
         # The width and height we store here are large enough in order to
         # contain the layout of the nodes/edges/other patterns in this pattern.
-        self.width, self.height = layout_utils.get_bb_x2_y2(
-            cg.graph_attr["bb"]
-        )
+        self.width, self.height = layout_utils.get_bb_x2_y2(bb)
 
         # Extract relative node coordinates (x and y)
         for node_id in self.node_ids:
-            node = cg.get_node(node_id)
-            x, y = layout_utils.getxy(node.attr["pos"])
-            if node_id in id2pattern:
+            x, y = layout_utils.getxy(node_pos[node_id])
+            if asm_graph.is_pattern(node_id):
                 # Assign x and y for this pattern.
                 #
                 # We should not need to _update_ the child node/edge positions
@@ -180,17 +173,66 @@ class Pattern(object):
                 # down through the patterns and update positions accordingly --
                 # no need to slow ourselves down by repeatedly updating this
                 # information throughout the layout process.
-                id2pattern[node_id].relative_x = x
-                id2pattern[node_id].relative_y = y
+                asm_graph.id2pattern[node_id].relative_x = x
+                asm_graph.id2pattern[node_id].relative_y = y
             else:
                 asm_graph.digraph.nodes[node_id]["relative_x"] = x
                 asm_graph.digraph.nodes[node_id]["relative_y"] = y
 
-        # Extract (relative) edge control points
+        # Extract (relative) edge control points. These are stored in the
+        # assembly graph's shared buffer, and will be converted to absolute
+        # coordinates after the whole graph has been laid out.
         for edge in self.subgraph.edges:
-            cg_edge = cg.get_edge(*edge)
-            coords = layout_utils.get_control_points(cg_edge.attr["pos"])
-            self.subgraph.edges[edge]["relative_ctrl_pt_coords"] = coords
+            coords = layout_utils.get_control_points(edge_pos[edge])
+            index = asm_graph.ctrl_pts.add(coords)
+            self.subgraph.edges[edge]["ctrl_pt_index"] = index
+
+    def layout(self, asm_graph):
+        """Lays out this pattern, after laying out all patterns within it.
+
+        This lays out everything one pattern at a time; AssemblyGraph.layout()
+        instead lays out all of the patterns in a component "level by level,"
+        so that the layout engine can work on multiple patterns at once.
+        """
+        # Recursively go through all of the nodes within this pattern. If any
+        # of these isn't actually a node (and is actually a pattern), then lay
+        # out that pattern!
+        for node_id in self.node_ids:
+            if asm_graph.is_pattern(node_id):
+                asm_graph.id2pattern[node_id].layout(asm_graph)
+
+        # Now that all of the patterns (if present) within this pattern have
+        # been laid out, lay out this pattern.
+        dot_layout = asm_graph.layout_engine.layout(
+            self.get_gv_input(asm_graph)
+        )
+        self.set_layout(dot_layout, asm_graph)
+
+    def get_node_area(self, asm_graph):
+        """Returns the total area (in square inches) of all nodes in this
+        pattern, including nodes within descendant patterns.
+        """
+        area = 0
+        for node_id in self.node_ids:
+            if asm_graph.is_pattern(node_id):
+                area += asm_graph.id2pattern[node_id].get_node_area(asm_graph)
+            else:
+                data = asm_graph.digraph.nodes[node_id]
+                area += data["width"] * data["height"]
+        return area
+
+    def estimate_size(self, asm_graph):
+        """Sets this pattern's width and height without laying it out.
+
+        This is used when we're only laying out the "skeleton" of a component
+        (see AssemblyGraph.layout()): the pattern is drawn as an empty box, so
+        we just need a rough idea of how much space it'd take up.
+        """
+        side = (
+            self.get_node_area(asm_graph) * config.SKELETON_PATTERN_AREA_FACTOR
+        ) ** 0.5
+        self.width = side
+        self.height = side
 
     def set_bb(self, x, y):
         """Given a center position of this Pattern, sets its bounding box.
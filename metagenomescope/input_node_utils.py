@@ -56,3 +56,20 @@ def negate_node_id(id_string):
         return id_string[1:]
     else:
         return "-" + id_string
+
+
+def negate_fastg_node_id(id_string):
+    """Negates a node ID from a FASTG file, by flipping its "+" / "-" suffix.
+
+    (pyfastg names nodes like "1+" and "1-", rather than "1" and "-1".)
+
+    This will raise a ValueError if id_string doesn't end with "+" or "-".
+    """
+    if id_string.endswith("+"):
+        return id_string[:-1] + "-"
+    elif id_string.endswith("-"):
+        return id_string[:-1] + "+"
+    else:
+        raise ValueError(
+            "Node ID {} doesn't end with + or -".format(id_string)
+        )
@@ -0,0 +1,264 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+####
+# A simple layered ("Sugiyama-style") graph layout, implemented using NumPy.
+#
+# This is nowhere near as nice as what dot produces -- there are no dummy
+# nodes for long edges, edges are just drawn as straight lines, and crossing
+# minimization is pretty basic -- but it runs in roughly linear time, so it's
+# usable on components that are way too large for dot to handle.
+#
+# Like dot's output, all positions here are given in points, with the origin
+# at the bottom left of the layout and "rank 0" at the top of the layout.
+
+import numpy
+from . import config
+
+
+def break_cycles(num_nodes, sources, targets):
+    """Orders the nodes in a graph so that as few edges as possible go
+    "backwards."
+
+    This is done by computing a reverse postorder of a depth-first search
+    through the graph: for a DAG this is a topological sort, and for a graph
+    with cycles the only edges that go backwards are DFS back edges. We start
+    the search from nodes without incoming edges first, so that these end up
+    near the start of the ordering.
+
+    Returns a numpy array mapping each node to its (0-indexed) position in
+    the ordering.
+    """
+    # Set up a CSR-style adjacency list
+    edge_order = numpy.argsort(sources, kind="stable")
+    adj = targets[edge_order].tolist()
+    indptr = numpy.zeros(num_nodes + 1, dtype=numpy.int64)
+    numpy.cumsum(numpy.bincount(sources, minlength=num_nodes), out=indptr[1:])
+    indptr = indptr.tolist()
+
+    in_degrees = numpy.bincount(targets, minlength=num_nodes)
+    roots = numpy.concatenate(
+        (numpy.flatnonzero(in_degrees == 0), numpy.flatnonzero(in_degrees))
+    ).tolist()
+
+    visited = [False] * num_nodes
+    postorder = []
+    for root in roots:
+        if visited[root]:
+            continue
+        visited[root] = True
+        # Each stack entry is [node, index of the next out-edge to visit]
+        stack = [[root, indptr[root]]]
+        while len(stack) > 0:
+            top = stack[-1]
+            node, i = top
+            if i < indptr[node + 1]:
+                top[1] += 1
+                child = adj[i]
+                if not visited[child]:
+                    visited[child] = True
+                    stack.append([child, indptr[child]])
+            else:
+                postorder.append(node)
+                stack.pop()
+
+    positions = numpy.empty(num_nodes, dtype=numpy.int64)
+    positions[postorder] = numpy.arange(num_nodes - 1, -1, -1)
+    return positions
+
+
+def assign_ranks(num_nodes, positions, sources, targets):
+    """Assigns each node a rank using longest-path ranking.
+
+    Assumes that every edge goes "forwards" in positions (i.e. the output of
+    break_cycles(), after reversing back edges and removing loops).
+
+    Every node without incoming edges gets rank 0, and every other node gets
+    a rank one greater than the highest rank of its predecessors.
+    """
+    # If we go through edges in order of their source node's position, then
+    # by the time we get to an edge all of the edges pointing to its source
+    # node have already been seen -- so its source node's rank is final.
+    edge_order = numpy.argsort(positions[sources], kind="stable")
+    ranks = [0] * num_nodes
+    for src, tgt in zip(
+        sources[edge_order].tolist(), targets[edge_order].tolist()
+    ):
+        if ranks[tgt] <= ranks[src]:
+            ranks[tgt] = ranks[src] + 1
+    return numpy.array(ranks, dtype=numpy.int64)
+
+
+def _order_within_ranks(ranks, keys):
+    """Returns each node's 0-indexed position within its rank, when the
+    nodes in each rank are sorted by keys.
+    """
+    sorted_nodes = numpy.lexsort((keys, ranks))
+    sorted_ranks = ranks[sorted_nodes]
+    rank_starts = numpy.searchsorted(sorted_ranks, sorted_ranks, side="left")
+    order = numpy.empty(len(ranks), dtype=numpy.float64)
+    order[sorted_nodes] = numpy.arange(len(ranks)) - rank_starts
+    return order
+
+
+def order_ranks(ranks, positions, sources, targets, num_sweeps):
+    """Orders the nodes within each rank to reduce edge crossings.
+
+    We start with nodes ordered by their positions (from break_cycles()), and
+    then do num_sweeps sweeps of the barycenter heuristic, alternating between
+    using each node's predecessors and each node's successors. Each sweep
+    moves all nodes at once (based on the previous sweep's ordering), which
+    lets us do the entire sweep using vectorized operations.
+    """
+    num_nodes = len(ranks)
+    order = _order_within_ranks(ranks, positions)
+    for sweep in range(num_sweeps):
+        if sweep % 2 == 0:
+            nodes, neighbors = targets, sources
+        else:
+            nodes, neighbors = sources, targets
+        neighbor_cts = numpy.bincount(nodes, minlength=num_nodes)
+        sums = numpy.bincount(
+            nodes, weights=order[neighbors], minlength=num_nodes
+        )
+        # Nodes without any neighbors in this direction just stay put
+        barycenters = order.copy()
+        has_neighbors = neighbor_cts > 0
+        barycenters[has_neighbors] = (
+            sums[has_neighbors] / neighbor_cts[has_neighbors]
+        )
+        # Break ties using the current order, so that nodes with the same
+        # barycenter don't get shuffled around arbitrarily
+        order = _order_within_ranks(
+            ranks, barycenters + (order / (num_nodes + 1))
+        )
+    return order
+
+
+def layered_layout(
+    widths, heights, sources, targets, num_sweeps=config.LAYERED_SWEEPS
+):
+    """Lays out a graph.
+
+    widths and heights should be numpy arrays of node dimensions, in inches.
+    Nodes are identified by their index in these arrays; sources and targets
+    should be integer numpy arrays of the same length, where edge i goes from
+    node sources[i] to node targets[i].
+
+    Returns a 4-tuple of (bounding box width, bounding box height, node x
+    positions, node y positions), all in points.
+    """
+    num_nodes = len(widths)
+    w = widths * config.LAYERED_POINTS_PER_INCH
+    h = heights * config.LAYERED_POINTS_PER_INCH
+    nodesep = config.LAYERED_NODESEP * config.LAYERED_POINTS_PER_INCH
+    ranksep = config.LAYERED_RANKSEP * config.LAYERED_POINTS_PER_INCH
+
+    # Make the graph acyclic by reversing back edges (and ignoring loops,
+    # which don't impact the layout)
+    positions = break_cycles(num_nodes, sources, targets)
+    not_loop = sources != targets
+    backwards = positions[sources] > positions[targets]
+    dag_sources = numpy.where(backwards, targets, sources)[not_loop]
+    dag_targets = numpy.where(backwards, sources, targets)[not_loop]
+
+    ranks = assign_ranks(num_nodes, positions, dag_sources, dag_targets)
+    order = order_ranks(ranks, positions, dag_sources, dag_targets, num_sweeps)
+    num_ranks = ranks.max() + 1
+
+    # Assign x positions: nodes in each rank are placed left to right, and
+    # then each rank is centered horizontally.
+    sorted_nodes = numpy.lexsort((order, ranks))
+    sorted_ranks = ranks[sorted_nodes]
+    sorted_space = w[sorted_nodes] + nodesep
+    cumulative_space = numpy.cumsum(sorted_space) - sorted_space
+    rank_starts = numpy.searchsorted(sorted_ranks, numpy.arange(num_ranks))
+    lefts = cumulative_space - cumulative_space[rank_starts][sorted_ranks]
+    rank_widths = (
+        numpy.bincount(sorted_ranks, weights=sorted_space, minlength=num_ranks)
+        - nodesep
+    )
+    bb_width = rank_widths.max()
+    x = numpy.empty(num_nodes, dtype=numpy.float64)
+    x[sorted_nodes] = (
+        lefts
+        + (w[sorted_nodes] / 2)
+        + ((bb_width - rank_widths) / 2)[sorted_ranks]
+    )
+
+    # Assign y positions: rank 0 is at the top, and every node in a rank is
+    # vertically centered on that rank.
+    rank_heights = numpy.zeros(num_ranks, dtype=numpy.float64)
+    numpy.maximum.at(rank_heights, ranks, h)
+    rank_tops = (
+        numpy.cumsum(rank_heights)
+        - rank_heights
+        + (ranksep * numpy.arange(num_ranks))
+    )
+    bb_height = rank_heights.sum() + (ranksep * (num_ranks - 1))
+    y = bb_height - (rank_tops + (rank_heights / 2))[ranks]
+
+    return bb_width, bb_height, x, y
+
+
+def get_edge_ctrl_pts(x, y, heights, sources, targets):
+    """Returns a (# edges) x 8 numpy array of edge control points.
+
+    Each row is [x1, y1, x2, y2, x3, y3, x4, y4]: the control points of a
+    cubic Bezier curve (that happens to be a straight line) going from the
+    bottom of the source node to the top of the target node, mirroring the
+    tailport=s / headport=n settings we use with dot. Loops are drawn as
+    small curves on the right side of their node.
+    """
+    half_h = heights * config.LAYERED_POINTS_PER_INCH / 2
+    start_x = x[sources]
+    start_y = y[sources] - half_h[sources]
+    end_x = x[targets]
+    end_y = y[targets] + half_h[targets]
+    dx = (end_x - start_x) / 3
+    dy = (end_y - start_y) / 3
+    pts = numpy.column_stack(
+        (
+            start_x,
+            start_y,
+            start_x + dx,
+            start_y + dy,
+            start_x + (2 * dx),
+            start_y + (2 * dy),
+            end_x,
+            end_y,
+        )
+    )
+
+    loops = sources == targets
+    if loops.any():
+        lx = x[sources[loops]]
+        ly = y[sources[loops]]
+        lh = half_h[sources[loops]]
+        pts[loops] = numpy.column_stack(
+            (
+                lx,
+                ly - lh,
+                lx + 2 * lh,
+                ly - lh,
+                lx + 2 * lh,
+                ly + lh,
+                lx,
+                ly + lh,
+            )
+        )
+    return pts
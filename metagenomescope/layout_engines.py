@@ -0,0 +1,402 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+####
+# This module contains "layout engines": objects that take as input DOT
+# language strings (as produced by AssemblyGraph.layout() and
+# Pattern.layout()) and return the positions Graphviz assigned to the nodes and
+# edges described in these strings.
+#
+# Every engine has the same interface:
+#
+#  -layout_many(gv_inputs, timeout=None) takes a list of DOT strings and
+#   returns a list of the same length, where each element is the 3-tuple of
+#   (bounding box string, {node ID: pos string}, {(src, tgt): pos string})
+#   described in layout_utils.parse_dot_layout(). If timeout (a number of
+#   seconds) is given and layout takes longer than that, this gives up and
+#   raises a LayoutTimeoutError.
+#
+#  -layout(gv_input, timeout=None) is the same thing, but for just a single
+#   DOT string.
+#
+#  -close() frees up any resources (e.g. child processes) held by the engine.
+#   Engines can still be used after close() is called; they'll just have to
+#   set things up again.
+#
+# Every engine also has a "prog" attribute, naming the Graphviz program it
+# uses (e.g. "dot").
+
+import asyncio
+import time
+from . import config, layout_utils, layered_layout, checkpoint_utils
+
+
+class LayoutTimeoutError(Exception):
+    """Raised when laying something out takes longer than allowed."""
+
+
+def get_timeout(deadline):
+    """Converts a deadline (a time.monotonic() value) to a timeout.
+
+    Returns None if deadline is None (i.e. there is no deadline). Raises a
+    LayoutTimeoutError if the deadline has already passed.
+    """
+    if deadline is None:
+        return None
+    timeout = deadline - time.monotonic()
+    if timeout <= 0:
+        raise LayoutTimeoutError("Deadline passed.")
+    return timeout
+
+
+class PygraphvizEngine(object):
+    """Lays out graphs in this process, using PyGraphviz.
+
+    This is what MetagenomeScope has always done by default. Graphs are laid
+    out one at a time. Since there's no way to interrupt PyGraphviz in the
+    middle of layout, this engine doesn't support timeouts.
+    """
+
+    def __init__(self, prog="dot"):
+        # Imported here, rather than at the top of this file, so that the
+        # other engine(s) in this module can be used on systems where
+        # PyGraphviz isn't installed.
+        import pygraphviz
+
+        self.pygraphviz = pygraphviz
+        self.prog = prog
+
+    def layout(self, gv_input, timeout=None):
+        if timeout is not None:
+            raise ValueError("PygraphvizEngine doesn't support timeouts.")
+        cg = self.pygraphviz.AGraph(gv_input)
+        cg.layout(prog=self.prog)
+        node_pos = {}
+        for node in cg.nodes():
+            node_pos[int(node)] = node.attr["pos"]
+        edge_pos = {}
+        for edge in cg.edges():
+            edge_pos[(int(edge[0]), int(edge[1]))] = edge.attr["pos"]
+        return cg.graph_attr["bb"], node_pos, edge_pos
+
+    def layout_many(self, gv_inputs, timeout=None):
+        return [self.layout(gv_input, timeout) for gv_input in gv_inputs]
+
+    def close(self):
+        pass
+
+
+class DotProcessPoolEngine(object):
+    """Lays out graphs using a pool of persistent Graphviz processes.
+
+    Each process in the pool is a long-running "dot -Tdot" process: dot reads
+    graphs from its stdin one after another, and writes out each laid-out
+    graph as soon as it's done with it. This lets us avoid paying process
+    startup costs for every pattern / component we lay out, and lets us lay
+    out multiple graphs at once (which is where the speedup from this engine
+    comes from -- PyGraphviz holds the GIL during layout, so there isn't a
+    good way to parallelize layout within a single process).
+
+    Jobs are passed to the processes through a bounded asyncio.Queue: if all
+    processes are busy and the queue is full, we just wait until there's room
+    in the queue before submitting more work. This keeps us from building up a
+    giant backlog of DOT strings in memory.
+
+    The processes are started lazily (the first time something is laid out),
+    and are stopped when close() is called. If layout_many() runs out of time,
+    the processes are killed (there's no other way to stop dot in the middle
+    of laying out a graph).
+    """
+
+    def __init__(self, num_processes, prog="dot", queue_size=None):
+        if num_processes < 1:
+            raise ValueError("Need at least 1 process to lay out graphs.")
+        self.num_processes = num_processes
+        self.prog = prog
+        if queue_size is None:
+            queue_size = 2 * num_processes
+        self.queue_size = queue_size
+
+        self.loop = None
+        # Each entry is a 3-tuple of (asyncio.subprocess.Process, list of
+        # recent lines the process wrote to stderr, the task that's reading
+        # the process' stderr).
+        self.procs = []
+
+    def _get_loop(self):
+        if self.loop is None or self.loop.is_closed():
+            self.loop = asyncio.new_event_loop()
+        return self.loop
+
+    async def _drain_stderr(self, proc, stderr_lines):
+        """Reads a process' stderr, so that it never fills up and blocks dot.
+
+        We hold on to the last few lines in case we need to show them in an
+        error message.
+        """
+        while True:
+            line = await proc.stderr.readline()
+            if not line:
+                break
+            stderr_lines.append(line.decode(errors="replace").rstrip())
+            del stderr_lines[: -config.DOT_STDERR_LINES_KEPT]
+
+    async def _start_processes(self):
+        while len(self.procs) < self.num_processes:
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    self.prog,
+                    "-Tdot",
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    limit=config.DOT_OUTPUT_LINE_LIMIT,
+                )
+            except FileNotFoundError:
+                raise FileNotFoundError(
+                    "Couldn't find the Graphviz program {}. Please make sure "
+                    "Graphviz is installed and on your PATH.".format(self.prog)
+                )
+            stderr_lines = []
+            drainer = asyncio.ensure_future(
+                self._drain_stderr(proc, stderr_lines)
+            )
+            self.procs.append((proc, stderr_lines, drainer))
+
+    async def _run_job(self, proc, stderr_lines, gv_input):
+        """Sends a DOT string to a dot process and waits for the output.
+
+        dot's output for a graph ends with a line containing just "}" (the
+        closing braces of any subgraphs are indented), so that's how we know
+        we've read everything for this graph.
+        """
+        proc.stdin.write(gv_input.encode())
+        if not gv_input.endswith("\n"):
+            proc.stdin.write(b"\n")
+        await proc.stdin.drain()
+        out_lines = []
+        while True:
+            line = await proc.stdout.readline()
+            if not line:
+                raise RuntimeError(
+                    "{} exited unexpectedly during layout. Its last error "
+                    "output was:\n{}".format(
+                        self.prog, "\n".join(stderr_lines)
+                    )
+                )
+            out_lines.append(line.decode())
+            if line.rstrip(b"\r\n") == b"}":
+                break
+        return layout_utils.parse_dot_layout("".join(out_lines))
+
+    async def _worker(self, proc, stderr_lines, queue, results):
+        while True:
+            job = await queue.get()
+            if job is None:
+                return
+            i, gv_input = job
+            results[i] = await self._run_job(proc, stderr_lines, gv_input)
+
+    async def _produce(self, queue, gv_inputs):
+        for job in enumerate(gv_inputs):
+            # If the queue is full, this waits until a worker frees up a slot.
+            await queue.put(job)
+        # Tell every worker that there's nothing left to do.
+        for _ in self.procs:
+            await queue.put(None)
+
+    async def _layout_many(self, gv_inputs, timeout):
+        await self._start_processes()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        results = [None] * len(gv_inputs)
+        tasks = [asyncio.ensure_future(self._produce(queue, gv_inputs))]
+        for proc, stderr_lines, _ in self.procs:
+            tasks.append(
+                asyncio.ensure_future(
+                    self._worker(proc, stderr_lines, queue, results)
+                )
+            )
+        done, pending = await asyncio.wait(
+            tasks, timeout=timeout, return_when=asyncio.FIRST_EXCEPTION
+        )
+        for task in pending:
+            task.cancel()
+        if len(pending) > 0 and all(t.exception() is None for t in done):
+            # Nothing failed, so we must have run out of time.
+            await self._kill_processes()
+            raise LayoutTimeoutError(
+                "Layout took longer than {} second(s).".format(timeout)
+            )
+        for task in done:
+            if task.exception() is not None:
+                # Something broke partway through a job, so the processes'
+                # input / output streams might be out of sync with each other.
+                # Throw the processes away; we'll start new ones if the caller
+                # tries to lay out anything else.
+                await self._stop_processes()
+                raise task.exception()
+        return results
+
+    async def _stop_processes(self):
+        for proc, _, drainer in self.procs:
+            if proc.returncode is None:
+                proc.stdin.close()
+                try:
+                    await asyncio.wait_for(
+                        proc.wait(), config.DOT_SHUTDOWN_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    proc.kill()
+                    await proc.wait()
+            await drainer
+        self.procs = []
+
+    async def _kill_processes(self):
+        for proc, _, drainer in self.procs:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            await drainer
+        self.procs = []
+
+    def layout_many(self, gv_inputs, timeout=None):
+        gv_inputs = list(gv_inputs)
+        if len(gv_inputs) == 0:
+            return []
+        return self._get_loop().run_until_complete(
+            self._layout_many(gv_inputs, timeout)
+        )
+
+    def layout(self, gv_input, timeout=None):
+        return self.layout_many([gv_input], timeout)[0]
+
+    def close(self):
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.run_until_complete(self._stop_processes())
+            self.loop.close()
+        self.loop = None
+
+
+class LayeredEngine(object):
+    """Lays out graphs using the NumPy layout in layered_layout.py.
+
+    This is intended for components that are too large to lay out with dot.
+    This engine is fast enough that it doesn't bother supporting timeouts.
+    """
+
+    prog = "layered"
+
+    def layout(self, gv_input, timeout=None):
+        if timeout is not None:
+            raise ValueError("LayeredEngine doesn't support timeouts.")
+        (
+            node_ids,
+            widths,
+            heights,
+            sources,
+            targets,
+        ) = layout_utils.parse_gv_input(gv_input)
+        if len(node_ids) == 0:
+            return "0,0,0,0", {}, {}
+
+        bb_width, bb_height, x, y = layered_layout.layered_layout(
+            widths, heights, sources, targets
+        )
+        ctrl_pts = layered_layout.get_edge_ctrl_pts(
+            x, y, heights, sources, targets
+        )
+
+        # Format everything like dot's output, so that we can use the same
+        # code to handle layouts from every engine
+        node_pos = {}
+        for node_id, node_x, node_y in zip(node_ids, x.tolist(), y.tolist()):
+            node_pos[node_id] = "{:.2f},{:.2f}".format(node_x, node_y)
+        edge_pos = {}
+        for src, tgt, pts in zip(
+            sources.tolist(), targets.tolist(), ctrl_pts.tolist()
+        ):
+            edge_pos[(node_ids[src], node_ids[tgt])] = (
+                "{:.2f},{:.2f} {:.2f},{:.2f} {:.2f},{:.2f} {:.2f},{:.2f}"
+            ).format(*pts)
+        bb = "0,0,{:.2f},{:.2f}".format(bb_width, bb_height)
+        return bb, node_pos, edge_pos
+
+    def layout_many(self, gv_inputs, timeout=None):
+        return [self.layout(gv_input, timeout) for gv_input in gv_inputs]
+
+    def close(self):
+        pass
+
+
+class CachingEngine(object):
+    """Wraps another engine, reusing layouts stored in a LayoutCache.
+
+    Layouts that aren't in the cache are produced using the wrapped engine,
+    then added to the cache. This is used to avoid redoing layout when
+    resuming from a checkpoint (see checkpoint_utils.py); since layout is
+    deterministic, the cached layouts are the same ones the wrapped engine
+    would produce.
+    """
+
+    def __init__(self, engine, cache):
+        self.engine = engine
+        self.cache = cache
+        self.prog = engine.prog
+
+    def layout_many(self, gv_inputs, timeout=None):
+        gv_inputs = list(gv_inputs)
+        keys = [
+            checkpoint_utils.get_layout_key(self.prog, gv_input)
+            for gv_input in gv_inputs
+        ]
+        results = [self.cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if len(missing) > 0:
+            new_results = self.engine.layout_many(
+                [gv_inputs[i] for i in missing], timeout
+            )
+            for i, result in zip(missing, new_results):
+                self.cache.add(keys[i], result)
+                results[i] = result
+        return results
+
+    def layout(self, gv_input, timeout=None):
+        return self.layout_many([gv_input], timeout)[0]
+
+    def close(self):
+        self.engine.close()
+
+
+def get_layout_engine(dot_processes=0, prog="dot", interruptible=False):
+    """Returns the layout engine to use, given the -dp option's value.
+
+    0 (the default) means "lay things out in this process with PyGraphviz";
+    anything higher means "lay things out using this many dot processes."
+
+    If interruptible is True, the engine returned will support timeouts: so
+    we'll use a single dot process instead of PyGraphviz if dot_processes is 0.
+
+    If prog is "layered", this returns a LayeredEngine (and ignores the other
+    parameters).
+    """
+    if prog == LayeredEngine.prog:
+        return LayeredEngine()
+    if dot_processes == 0:
+        if interruptible:
+            return DotProcessPoolEngine(1, prog)
+        return PygraphvizEngine(prog)
+    return DotProcessPoolEngine(dot_processes, prog)
@@ -1,3 +1,5 @@
+import re
+import numpy
 from . import config
 
 
@@ -56,6 +58,126 @@ def get_control_points(pos):
     return coord_list
 
 
+def parse_dot_layout(dot_output):
+    """Extracts layout information from the output of "dot -Tdot".
+
+    This is the counterpart of reading attributes off of a pygraphviz.AGraph
+    that has been laid out: it's used when we run Graphviz in a separate
+    process (see layout_engines.DotProcessPoolEngine) and just get back the
+    laid-out graph as text.
+
+    Returns a 3-tuple of (bounding box string, node info, edge info):
+
+    -The bounding box string is formatted as "x1,y1,x2,y2" (suitable for
+     passing to get_bb_x2_y2()).
+
+    -Node info is a dict mapping integer node IDs to their "pos" strings
+     (suitable for passing to getxy()).
+
+    -Edge info is a dict mapping (source ID, target ID) 2-tuples of integer
+     node IDs to their "pos" strings (suitable for passing to
+     get_control_points()).
+
+    This assumes that all nodes in the graph have integer IDs, which is the
+    case for all of the graphs we generate for layout.
+
+    Raises a ValueError if no bounding box is found in the output.
+    """
+    # Graphviz splits long lines (e.g. long lists of edge control points)
+    # using a backslash followed by a newline. Undo that first.
+    text = dot_output.replace("\\\r\n", "").replace("\\\n", "")
+
+    bb_match = _DOT_BB_RE.search(text)
+    if bb_match is None:
+        raise ValueError("No bounding box found in dot output.")
+
+    node_pos = {}
+    for m in _DOT_NODE_RE.finditer(text):
+        pos_match = _DOT_POS_RE.search(m.group(2))
+        if pos_match is not None:
+            node_pos[int(m.group(1))] = pos_match.group(1)
+
+    edge_pos = {}
+    for m in _DOT_EDGE_RE.finditer(text):
+        pos_match = _DOT_POS_RE.search(m.group(3))
+        if pos_match is not None:
+            edge_pos[(int(m.group(1)), int(m.group(2)))] = pos_match.group(1)
+
+    return bb_match.group(1), node_pos, edge_pos
+
+
+# Regular expressions used by parse_dot_layout(). Node and edge statements in
+# dot's output look like
+#     12 [height=0.5, pos="27,90", width=0.75];
+#     12:s -> 13:n [pos="e,27,36.104 27,71.697 27,54.712 27,46.112"];
+# ... where the attribute lists can span multiple lines.
+_DOT_BB_RE = re.compile(r'\bbb="([^"]*)"')
+_DOT_POS_RE = re.compile(r'\bpos="([^"]*)"')
+_DOT_NODE_RE = re.compile(r"^\s*(\d+)\s*\[(.*?)\];", re.M | re.S)
+_DOT_EDGE_RE = re.compile(
+    r"^\s*(\d+)(?::\w+)?\s*->\s*(\d+)(?::\w+)?\s*\[(.*?)\];", re.M | re.S
+)
+
+
+def parse_gv_input(gv_input):
+    """Extracts the nodes and edges from a DOT string we've generated.
+
+    This is used by layout_engines.LayeredEngine, which -- unlike Graphviz --
+    needs to be given the graph as arrays rather than as a DOT string. This
+    only understands the very limited subset of the DOT language used in
+    AssemblyGraph.layout_component() and Pattern.get_gv_input(): node IDs must
+    be integers, and only the height and width node attributes are read.
+
+    Returns a 5-tuple of (node IDs, widths, heights, sources, targets). The
+    first element is a list of node IDs; the remaining elements are numpy
+    arrays, where sources and targets are indices into the node ID list.
+    Nodes that are only mentioned in edges are given Graphviz' default node
+    width and height (0.75 and 0.5 inches).
+    """
+    node_ids = []
+    node_id2index = {}
+    widths = []
+    heights = []
+
+    def add_node(node_id, width=0.75, height=0.5):
+        node_id2index[node_id] = len(node_ids)
+        node_ids.append(node_id)
+        widths.append(width)
+        heights.append(height)
+
+    for m in _GV_NODE_RE.finditer(gv_input):
+        attrs = dict(_GV_ATTR_RE.findall(m.group(2)))
+        add_node(
+            int(m.group(1)),
+            float(attrs.get("width", 0.75)),
+            float(attrs.get("height", 0.5)),
+        )
+
+    sources = []
+    targets = []
+    for m in _GV_EDGE_RE.finditer(gv_input):
+        src, tgt = int(m.group(1)), int(m.group(2))
+        for node_id in (src, tgt):
+            if node_id not in node_id2index:
+                add_node(node_id)
+        sources.append(node_id2index[src])
+        targets.append(node_id2index[tgt])
+
+    return (
+        node_ids,
+        numpy.array(widths, dtype=numpy.float64),
+        numpy.array(heights, dtype=numpy.float64),
+        numpy.array(sources, dtype=numpy.int64),
+        numpy.array(targets, dtype=numpy.int64),
+    )
+
+
+# Regular expressions used by parse_gv_input().
+_GV_NODE_RE = re.compile(r"^\s*(\d+)\s*\[([^\]]*)\];", re.M)
+_GV_EDGE_RE = re.compile(r"^\s*(\d+)\s*->\s*(\d+)", re.M)
+_GV_ATTR_RE = re.compile(r"(\w+)=([^,\]]*)")
+
+
 def shift_control_points(coord_list, left, bottom):
     r"""Given a list of coordinates (e.g. the output of get_control_points()),
     increases each x coordinate in the list by "left" and increases each y
@@ -95,6 +217,24 @@ def shift_control_points(coord_list, left, bottom):
     return new_coord_list
 
 
+def mirror_ctrl_pt_coords(coords, height):
+    """Reflects a list of control points vertically, and reverses them.
+
+    This gives the control points of the reverse complement of an edge in a
+    component that's the "mirror image" of another component: see
+    AssemblyGraph.mirror_component(). The reflection flips y coordinates
+    within a bounding box of the given height, and the reversal makes the
+    curve go from the (reverse complement edge's) source to its target.
+    """
+    if len(coords) % 2 != 0:
+        raise ValueError("Non-even number of control points")
+    new_coords = []
+    for i in range(len(coords) - 2, -1, -2):
+        new_coords.append(coords[i])
+        new_coords.append(height - coords[i + 1])
+    return new_coords
+
+
 def rotate(x, y):
     """Rotates a position by 90 degrees counterclockwise.
 
@@ -122,6 +262,113 @@ def rotate_ctrl_pt_coords(coords):
     return new_coords
 
 
+def rotate_ctrl_pt_buffer(coords):
+    """Rotates a flat numpy array of control point coordinates in place.
+
+    This is a vectorized version of rotate_ctrl_pt_coords().
+    """
+    if len(coords) % 2 != 0:
+        raise ValueError("Non-even number of control points")
+    x = coords[0::2].copy()
+    coords[0::2] = -coords[1::2]
+    coords[1::2] = x
+
+
+def _grow(arr, min_size):
+    """Returns a copy of a numpy array with room for at least min_size
+    elements (and at least twice as many elements as before).
+    """
+    new_arr = numpy.empty(max(min_size, 2 * len(arr)), dtype=arr.dtype)
+    new_arr[: len(arr)] = arr
+    return new_arr
+
+
+class ControlPointBuffer(object):
+    """Stores the control points of many edges in one flat float32 array.
+
+    Storing each edge's control points as a list of Python floats takes up a
+    lot of memory for large graphs, so we instead store all of the graph's
+    control points here, one edge after another ([x, y, x, y, ...]). Each
+    edge just stores the index returned by add(); the edge's coordinates are
+    located in coords[offsets[index]:offsets[index + 1]].
+
+    Edges are added while laying out the graph, so at first their coordinates
+    are relative to the pattern containing them. After layout, shift() is
+    used to convert these to absolute coordinates in place.
+    """
+
+    def __init__(self, capacity=1024):
+        self.coords = numpy.empty(capacity, dtype=numpy.float32)
+        self.offsets = numpy.zeros(capacity // 8 + 1, dtype=numpy.int64)
+        self.num_edges = 0
+
+    def add(self, coords):
+        """Adds an edge's control point coordinates, and returns its index."""
+        if len(coords) % 2 != 0:
+            raise ValueError("Non-even number of control points")
+        start = self.offsets[self.num_edges]
+        end = start + len(coords)
+        if end > len(self.coords):
+            self.coords = _grow(self.coords, end)
+        if self.num_edges + 2 > len(self.offsets):
+            self.offsets = _grow(self.offsets, self.num_edges + 2)
+        self.coords[start:end] = coords
+        self.num_edges += 1
+        self.offsets[self.num_edges] = end
+        return self.num_edges - 1
+
+    def get(self, index):
+        """Returns a (float32 numpy array) view of an edge's coordinates."""
+        return self.coords[self.offsets[index] : self.offsets[index + 1]]
+
+    def get_list(self, index, decimals=config.OUTPUT_PRECISION_DEFAULT):
+        """Returns a list of an edge's coordinates, rounded to a given number
+        of decimal places.
+
+        The rounding hides the noise from storing coordinates as float32s
+        (e.g. 222.66 would otherwise come out as 222.66099548339844).
+        """
+        coords = self.get(index).astype(numpy.float64)
+        return numpy.round(coords, decimals).tolist()
+
+    def mirror(self, index, height):
+        """Adds a mirrored copy of an edge (see mirror_ctrl_pt_coords()), and
+        returns the index of the copy.
+        """
+        points = self.get(index).reshape(-1, 2)[::-1].copy()
+        points[:, 1] = height - points[:, 1]
+        return self.add(points.ravel())
+
+    def shift(self, indices, lefts, bottoms):
+        """Shifts the coordinates of many edges at once.
+
+        This is a vectorized version of shift_control_points(). indices,
+        lefts, and bottoms should be numpy arrays with one entry per edge to
+        shift, giving the edge's index and the amounts to shift its x and y
+        coordinates by.
+        """
+        starts = self.offsets[indices]
+        points_per_edge = (self.offsets[indices + 1] - starts) // 2
+        # Figure out the index (in self.coords) of each point's x coordinate
+        edge_point_starts = numpy.cumsum(points_per_edge) - points_per_edge
+        point_nums = numpy.arange(points_per_edge.sum()) - numpy.repeat(
+            edge_point_starts, points_per_edge
+        )
+        x_indices = numpy.repeat(starts, points_per_edge) + (2 * point_nums)
+        self.coords[x_indices] += numpy.repeat(lefts, points_per_edge)
+        self.coords[x_indices + 1] += numpy.repeat(bottoms, points_per_edge)
+
+    def rotate(self, start=0):
+        """Rotates all of the coordinates in this buffer (see rotate()).
+
+        If start is given, only the coordinates of the edges added at or
+        after index start are rotated.
+        """
+        rotate_ctrl_pt_buffer(
+            self.coords[self.offsets[start] : self.offsets[self.num_edges]]
+        )
+
+
 def getxy(pos_string):
     """Given a string of the format "x,y", returns floats of x and y.
 
@@ -18,18 +18,192 @@
 # along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
-from distutils.dir_util import copy_tree
-import jinja2
-from . import graph_objects, arg_utils
+import json
+import shutil
+from . import (
+    config,
+    graph_objects,
+    arg_utils,
+    checkpoint_utils,
+    profile_utils,
+)
 from .msg_utils import operation_msg, conclude_msg
 
+# Support files that make_viz() fills in separately for each visualization.
+# These are always copied, even when the other support files are hardlinked
+# (see copy_support_files()) -- since writing to a hardlinked file would
+# change it in every output directory sharing it.
+TEMPLATED_SUPPORT_FILES = ("main.js", "index.html")
+
+
+def get_support_files_loc():
+    """Returns the location of the support_files/ directory.
+
+    support_files/ is located alongside this file (main.py).
+    """
+    curr_loc = os.path.dirname(os.path.realpath(__file__))
+    return os.path.join(curr_loc, "support_files")
+
+
+def copy_support_files(output_dir, shared_assets_dir=None):
+    """Copies the "support files" (HTML, JS, CSS, ...) needed for the
+    visualization to output_dir.
+
+    If shared_assets_dir is specified, it should be a directory containing a
+    copy of the support files (e.g. created by an earlier call of this
+    function). Rather than being copied, the support files in output_dir will
+    then be hard links to the files in shared_assets_dir, so that many
+    visualizations can share one copy of these files. (Files that can't be
+    hardlinked -- e.g. because output_dir is on a different filesystem than
+    shared_assets_dir -- are just copied.)
+    """
+    support_files_loc = get_support_files_loc()
+    for dirpath, dirnames, filenames in os.walk(support_files_loc):
+        rel_dir = os.path.relpath(dirpath, support_files_loc)
+        os.makedirs(os.path.join(output_dir, rel_dir), exist_ok=True)
+        for fn in filenames:
+            rel_path = os.path.normpath(os.path.join(rel_dir, fn))
+            dest = os.path.join(output_dir, rel_path)
+            if (
+                shared_assets_dir is not None
+                and rel_path not in TEMPLATED_SUPPORT_FILES
+            ):
+                try:
+                    os.link(os.path.join(shared_assets_dir, rel_path), dest)
+                    continue
+                except OSError:
+                    pass
+            shutil.copy2(os.path.join(dirpath, fn), dest)
+
+
+def fill_templates(output_dir, data_index, graph_basename):
+    """Fills in the templated support files in output_dir.
+
+    The {{ dataJSON }} tag in the main.js file is populated with data_index,
+    a small index of the graph's data (see
+    AssemblyGraph.write_data_chunks()).
+    """
+    # Even the index can be pretty large for graphs with lots of components,
+    # so rather than rendering it through Jinja2 we write out the text before
+    # the tag, then dump the index directly into the file, then write out the
+    # text after the tag.
+    mainjs_loc = os.path.join(output_dir, "main.js")
+    with open(mainjs_loc, "r") as mainjs_file:
+        mainjs_before, mainjs_after = mainjs_file.read().split(
+            "{{ dataJSON }}"
+        )
+    with open(mainjs_loc, "w") as mainjs_file:
+        mainjs_file.write(mainjs_before)
+        json.dump(data_index, mainjs_file)
+        mainjs_file.write(mainjs_after)
+
+    # Using Jinja2, populate the {{ graphFilename }} tag in the index.html
+    # file, so we can show the filename in the application title (this way
+    # the title is shown immediately, rather than flickering when the page
+    # is loaded). (... This is obviously much less important than the graph
+    # data, but it's a nice little detail that should help users if they
+    # have many MgSc tabs open at once.)
+    #
+    # This part of code taken from
+    # https://github.com/biocore/empress/blob/master/empress/core.py, in
+    # particular _get_template() and make_empress(), and
+    # https://github.com/biocore/empress/blob/master/tests/python/make-dev-page.py.
+    # (We import Jinja2 here, rather than at the top of this file, since
+    # it isn't needed until now and it takes a while to import.)
+    import jinja2
+
+    env = jinja2.Environment(loader=jinja2.FileSystemLoader(output_dir))
+
+    index_template = env.get_template("index.html")
+    with open(os.path.join(output_dir, "index.html"), "w") as index_file:
+        index_file.write(
+            index_template.render({"graphFilename": graph_basename})
+        )
+
+
+def load_assembly_graph(
+    input_file,
+    work_dir,
+    resume,
+    profiler,
+    dot_processes,
+    output_precision,
+    **settings
+):
+    """Parses the input graph, or loads it from a checkpoint in work_dir.
+
+    The settings should be the keyword arguments to pass to the
+    AssemblyGraph constructor (other than dot_processes and
+    output_precision). These are the settings that affect everything before
+    the output is written; the output-related settings (e.g. data_format)
+    don't matter for the checkpoints, so they can differ when resuming.
+    (dot_processes doesn't change the layouts dot produces, so it can also
+    differ.)
+    """
+    asm_graph = None
+    if work_dir is not None:
+        checkpoint_settings = checkpoint_utils.get_settings(
+            input_file, **settings
+        )
+        os.makedirs(work_dir, exist_ok=True)
+        if resume:
+            operation_msg(
+                "Looking for a checkpoint in work directory {}...".format(
+                    work_dir
+                )
+            )
+            asm_graph = checkpoint_utils.load_graph(
+                work_dir, checkpoint_settings
+            )
+            if asm_graph is None:
+                conclude_msg("None found; starting from scratch.")
+            else:
+                conclude_msg(
+                    "Found one (completed stages: {}).".format(
+                        ", ".join(asm_graph.completed_stages)
+                    )
+                )
+                asm_graph.output_precision = output_precision
+                asm_graph.init_layout_engines(dot_processes)
+        if asm_graph is None:
+            checkpoint_utils.clear_checkpoints(work_dir)
+            checkpoint_utils.save_settings(work_dir, checkpoint_settings)
+
+    if asm_graph is None:
+        with profiler.stage("parse"):
+            asm_graph = graph_objects.AssemblyGraph(
+                input_file,
+                dot_processes=dot_processes,
+                output_precision=output_precision,
+                **settings
+            )
+        if work_dir is not None:
+            checkpoint_utils.save_graph(asm_graph, work_dir)
+    return asm_graph
+
 
 def make_viz(
     input_file: str,
     output_dir: str,
-    # assume_oriented: bool,
+    assume_oriented: bool,
     max_node_count: int,
     max_edge_count: int,
+    dot_processes: int,
+    layout_time_budget: float,
+    oversized_components: str,
+    data_format: str,
+    output_precision: int,
+    compress_data: bool,
+    work_dir: str = None,
+    resume: bool = False,
+    profile: bool = False,
+    profile_detailed: bool = False,
+    top_components: int = None,
+    components_containing: str = None,
+    neighborhood: str = None,
+    neighborhood_radius: int = config.NEIGHBORHOOD_RADIUS_DEFAULT,
+    neighborhood_units: str = config.NEIGHBORHOOD_UNITS_DEFAULT,
+    shared_assets_dir: str = None,
     # metacarvel_bubble_file: str,
     # user_pattern_file: str,
     # spqr: bool,
@@ -39,63 +213,87 @@ def make_viz(
     # nbdf: bool,
     # npdf: bool,
 ):
-    """Creates a visualization."""
+    """Creates a visualization.
+
+    If work_dir is given, the pipeline's progress is checkpointed there (and,
+    if resume is True, resumed from the checkpoints already there); see
+    checkpoint_utils.py.
+
+    If profile or profile_detailed are True, a report of how much time and
+    memory each stage took is written to the output directory; see
+    profile_utils.py.
+
+    If top_components and/or components_containing (a comma-separated list
+    of node names) are given, only some of the graph's components are
+    visualized; see AssemblyGraph.select_components(). Similarly, if
+    neighborhood (a comma-separated list of node names) is given, only the
+    neighborhood around these nodes is visualized; see
+    AssemblyGraph.extract_neighborhood().
+
+    shared_assets_dir is only used in batch mode; see copy_support_files().
+    """
     arg_utils.check_dir_existence(output_dir)
     arg_utils.validate_max_counts(max_node_count, max_edge_count)
+    arg_utils.validate_dot_processes(dot_processes)
+    arg_utils.validate_layout_time_budget(layout_time_budget)
+    arg_utils.validate_output_precision(output_precision)
+    arg_utils.validate_top_components(top_components)
+    arg_utils.validate_neighborhood_radius(neighborhood_radius)
+    arg_utils.validate_resume(resume, work_dir)
+    node_names = arg_utils.parse_node_names(components_containing)
+    neighborhood_names = arg_utils.parse_node_names(neighborhood)
+    profiler = profile_utils.Profiler(profile, profile_detailed)
 
-    asm_graph = graph_objects.AssemblyGraph(
+    asm_graph = load_assembly_graph(
         input_file,
+        work_dir,
+        resume,
+        profiler,
+        dot_processes=dot_processes,
+        output_precision=output_precision,
+        assume_oriented=assume_oriented,
         max_node_count=max_node_count,
         max_edge_count=max_edge_count,
+        layout_time_budget=layout_time_budget,
+        oversized_components=oversized_components,
+        top_components=top_components,
+        components_containing=node_names,
+        neighborhood=neighborhood_names,
+        neighborhood_radius=neighborhood_radius,
+        neighborhood_units=neighborhood_units,
     )
 
     # Identify patterns, do layout, etc.
-    asm_graph.process()
-
-    # Get JSON representation of the graph data.
-    graph_data = asm_graph.to_json()
+    asm_graph.process(work_dir=work_dir, profiler=profiler)
 
-    operation_msg(
-        "Writing graph data to the output directory, {}...".format(output_dir)
-    )
+    with profiler.stage("write_output"):
+        operation_msg(
+            "Writing graph data to the output directory, {}...".format(
+                output_dir
+            )
+        )
 
-    # Make the output directory.
-    arg_utils.create_output_dir(output_dir)
+        # Make the output directory.
+        arg_utils.create_output_dir(output_dir)
 
-    # Copy "support files" to output directory. (This part of code taken from
-    # https://github.com/biocore/qurro/blob/master/qurro/generate.py, in the
-    # gen_visualization() function.)
-    #
-    # First, figure out where this file (main.py) is, since support_files/ is
-    # located alongside it.
-    curr_loc = os.path.dirname(os.path.realpath(__file__))
-    support_files_loc = os.path.join(curr_loc, "support_files")
-    copy_tree(support_files_loc, output_dir)
+        # Copy "support files" to output directory. (This part of code taken
+        # from https://github.com/biocore/qurro/blob/master/qurro/generate.py,
+        # in the gen_visualization() function.)
+        copy_support_files(output_dir, shared_assets_dir)
 
-    # Using Jinja2, populate the {{ dataJSON }} tag in the main.js file with
-    # the JSON representation of the graph data.
-    #
-    # Also, populate the {{ graphFilename }} tag in the index.html file, so we
-    # can show the filename in the application title (this way the title is
-    # shown immediately, rather than flickering when the page is loaded).
-    # (... This is obviously much less important than the first thing, but it's
-    # a nice little detail that should help users if they have many MgSc tabs
-    # open at once.)
-    #
-    # This part of code taken from
-    # https://github.com/biocore/empress/blob/master/empress/core.py, in
-    # particular _get_template() and make_empress(), and
-    # https://github.com/biocore/empress/blob/master/tests/python/make-dev-page.py.
-    env = jinja2.Environment(loader=jinja2.FileSystemLoader(output_dir))
+        # Write out the component data as a set of "chunk" files, which the
+        # viewer loads only when it needs to draw a component in them. The
+        # main.js file is populated with just a small index of these chunks.
+        data_index = asm_graph.write_data_chunks(
+            output_dir, data_format=data_format, compress=compress_data
+        )
+        fill_templates(output_dir, data_index, asm_graph.basename)
 
-    mainjs_template = env.get_template("main.js")
-    with open(os.path.join(output_dir, "main.js"), "w") as mainjs_file:
-        mainjs_file.write(mainjs_template.render({"dataJSON": graph_data}))
+        conclude_msg()
 
-    index_template = env.get_template("index.html")
-    with open(os.path.join(output_dir, "index.html"), "w") as index_file:
-        index_file.write(
-            index_template.render({"graphFilename": asm_graph.basename})
+    if profiler.enabled:
+        operation_msg(
+            "Writing the profiling report to the output directory..."
         )
-
-    conclude_msg()
+        profiler.write_report(output_dir, input_file)
+        conclude_msg()
@@ -0,0 +1,288 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+####
+# "Overview mode": summarizes every component in a graph, without laying
+# anything out. Each component gets one record (its node, edge, and pattern
+# counts, total length, and N50), and the components are drawn as a grid of
+# squares sized by their node counts, packed using NumPy rather than
+# Graphviz. This makes it possible to get a sense of what a huge graph looks
+# like in seconds, before choosing which components to visualize in full
+# (e.g. using -tc or -cc).
+
+import math
+import os
+from xml.sax.saxutils import escape
+import numpy
+from . import config, arg_utils
+from .graph_objects import AssemblyGraph
+from .msg_utils import operation_msg, conclude_msg
+
+TSV_COLUMNS = (
+    "size_rank",
+    "num_nodes",
+    "num_edges",
+    "num_patterns",
+    "total_length",
+    "n50",
+    "longest_node",
+    "x",
+    "y",
+    "side",
+)
+
+
+def get_length_stats(lengths, cc_indices, num_ccs):
+    """Computes the total length and N50 of each component at once.
+
+    lengths and cc_indices should be equal-length sequences of integers,
+    giving the length of each node and the (0-indexed) component that it's
+    in. Every component should contain at least one node.
+
+    Returns a 3-tuple of arrays of length num_ccs: the total length of each
+    component, the N50 of each component, and the position (in lengths) of
+    the longest node in each component.
+    """
+    lengths = numpy.asarray(lengths, dtype=numpy.int64)
+    cc_indices = numpy.asarray(cc_indices, dtype=numpy.int64)
+    # Sort the nodes by component, then in descending order by length. (If
+    # multiple nodes in a component are tied for the longest, the first one
+    # given is used as the longest node.)
+    order = numpy.lexsort((-lengths, cc_indices))
+    sorted_lengths = lengths[order]
+    cumsum = numpy.cumsum(sorted_lengths)
+    cc_range = numpy.arange(num_ccs)
+    starts = numpy.searchsorted(cc_indices[order], cc_range, side="left")
+    ends = numpy.searchsorted(cc_indices[order], cc_range, side="right")
+    before = numpy.where(starts > 0, cumsum[starts - 1], 0)
+    totals = cumsum[ends - 1] - before
+    # The N50 is the length of the first node (in descending order) at which
+    # the running total length reaches half of the component's total length.
+    # Since the running totals increase across all components, we can find
+    # this for every component with a single search. (We compare doubled
+    # values to avoid rounding.)
+    n50_indices = numpy.searchsorted(2 * cumsum, 2 * before + totals)
+    n50_indices = numpy.clip(n50_indices, starts, ends - 1)
+    return totals, sorted_lengths[n50_indices], order[starts]
+
+
+def summarize_components(asm_graph, ccs=None):
+    """Returns a dict describing every component in a decomposed
+    AssemblyGraph.
+
+    Each value is a list or array with one entry per component, in the
+    order used by asm_graph.get_connected_components() (ccs, if given,
+    should be its output). The counts of nodes and edges include duplicate
+    nodes and edges, as elsewhere; however, duplicate nodes aren't included
+    in the total lengths and N50s.
+    """
+    if ccs is None:
+        ccs = asm_graph.get_connected_components()
+    lengths = []
+    cc_indices = []
+    names = []
+    for cc_index, cc_tuple in enumerate(ccs):
+        for node_id in asm_graph.iter_basic_node_ids(cc_tuple[0]):
+            data = asm_graph.digraph.nodes[node_id]
+            if data.get("is_dup", False):
+                continue
+            lengths.append(data["length"])
+            cc_indices.append(cc_index)
+            names.append(data["name"])
+    totals, n50s, longest = get_length_stats(lengths, cc_indices, len(ccs))
+    return {
+        "num_nodes": numpy.array([t[1] for t in ccs], dtype=numpy.int64),
+        "num_edges": numpy.array([t[2] for t in ccs], dtype=numpy.int64),
+        "num_patterns": numpy.array([t[3] for t in ccs], dtype=numpy.int64),
+        "total_length": totals,
+        "n50": n50s,
+        "longest_node": [names[i] for i in longest],
+    }
+
+
+def pack_squares(sides, padding=config.OVERVIEW_PADDING):
+    """Packs squares into rows, left to right and then top to bottom.
+
+    sides should be an array of the squares' side lengths, sorted in
+    descending order -- so the height of each row is just the side of its
+    first square. The rows are about as wide as they would need to be to
+    fit all of the squares in a square-ish area.
+
+    Returns (xs, ys, width, height): (xs[i], ys[i]) is the top left corner
+    of the i-th square, and width and height are the dimensions of the
+    area containing all of the squares.
+    """
+    sides = numpy.asarray(sides, dtype=numpy.float64)
+    padded = sides + padding
+    max_width = max(math.sqrt(numpy.sum(padded * padded)), padded[0] + padding)
+    # ends[i] is the right side of square i (plus padding), if all of the
+    # squares were put in one row
+    ends = numpy.cumsum(padded)
+    xs = numpy.empty(len(sides))
+    ys = numpy.empty(len(sides))
+    start = 0
+    y = padding
+    while start < len(sides):
+        offset = ends[start] - padded[start]
+        # Fit as many squares as we can into this row (but at least one)
+        stop = max(
+            numpy.searchsorted(
+                ends, offset + max_width - padding, side="right"
+            ),
+            start + 1,
+        )
+        xs[start:stop] = padding + ends[start:stop] - padded[start:stop]
+        xs[start:stop] -= offset
+        ys[start:stop] = y
+        y += padded[start]
+        start = stop
+    width = numpy.max(xs + sides) + padding
+    return xs, ys, width, y
+
+
+def write_tsv(tsv_file, summary, xs, ys, sides):
+    """Writes out one line for each component, with the columns in
+    TSV_COLUMNS.
+    """
+    tsv_file.write("\t".join(TSV_COLUMNS) + "\n")
+    for i in range(len(sides)):
+        tsv_file.write(
+            "{}\t{}\t{}\t{}\t{}\t{}\t{}\t{:.2f}\t{:.2f}\t{:.2f}\n".format(
+                i + 1,
+                summary["num_nodes"][i],
+                summary["num_edges"][i],
+                summary["num_patterns"][i],
+                summary["total_length"][i],
+                summary["n50"][i],
+                summary["longest_node"][i],
+                xs[i],
+                ys[i],
+                sides[i],
+            )
+        )
+
+
+def write_svg(
+    svg_file,
+    summary,
+    xs,
+    ys,
+    sides,
+    width,
+    height,
+    max_components=config.OVERVIEW_MAX_DRAWN_COMPONENTS,
+):
+    """Draws the components as squares, with a tooltip for each one.
+
+    Only the first max_components components are drawn.
+    """
+    num_drawn = min(len(sides), max_components)
+    if num_drawn > 0:
+        # Crop off the rows we aren't drawing
+        height = ys[num_drawn - 1] + sides[num_drawn - 1]
+        height += config.OVERVIEW_PADDING
+    svg_file.write(
+        '<svg xmlns="http://www.w3.org/2000/svg" width="{0:.2f}" '
+        'height="{1:.2f}" viewBox="0 0 {0:.2f} {1:.2f}">\n'.format(
+            width, height
+        )
+    )
+    for i in range(num_drawn):
+        title = (
+            "Component {:,}: {:,} nodes, {:,} edges, {:,} patterns; total "
+            "length {:,} bp, N50 {:,} bp; longest node {}".format(
+                i + 1,
+                summary["num_nodes"][i],
+                summary["num_edges"][i],
+                summary["num_patterns"][i],
+                summary["total_length"][i],
+                summary["n50"][i],
+                summary["longest_node"][i],
+            )
+        )
+        svg_file.write(
+            '<g><title>{}</title><rect x="{:.2f}" y="{:.2f}" '
+            'width="{:.2f}" height="{:.2f}" fill="{}"/>'.format(
+                escape(title),
+                xs[i],
+                ys[i],
+                sides[i],
+                sides[i],
+                config.OVERVIEW_FILL_COLOR,
+            )
+        )
+        if sides[i] >= config.OVERVIEW_LABEL_MIN_SIDE:
+            svg_file.write(
+                '<text x="{:.2f}" y="{:.2f}" font-size="{:.2f}" '
+                'text-anchor="middle" dominant-baseline="central">'
+                "{}</text>".format(
+                    xs[i] + sides[i] / 2,
+                    ys[i] + sides[i] / 2,
+                    min(sides[i] / 3, 48),
+                    i + 1,
+                )
+            )
+        svg_file.write("</g>\n")
+    svg_file.write("</svg>\n")
+
+
+def make_overview(input_file: str, output_dir: str, assume_oriented: bool):
+    """Writes an overview of every component in a graph to output_dir.
+
+    This parses the graph and identifies patterns in it, but doesn't lay
+    anything out. The overview consists of a TSV file describing each
+    component (see TSV_COLUMNS) and an SVG file drawing the components.
+    """
+    arg_utils.check_dir_existence(output_dir)
+    # The overview includes every component, however large, so we don't use
+    # -maxn / -maxe here.
+    asm_graph = AssemblyGraph(
+        input_file,
+        assume_oriented=assume_oriented,
+        max_node_count=math.inf,
+        max_edge_count=math.inf,
+    )
+    asm_graph.decompose()
+
+    operation_msg("Summarizing components...")
+    ccs = asm_graph.get_connected_components()
+    summary = summarize_components(asm_graph, ccs)
+    sides = numpy.sqrt(summary["num_nodes"] * config.OVERVIEW_NODE_AREA)
+    xs, ys, width, height = pack_squares(sides)
+    conclude_msg()
+
+    operation_msg(
+        "Writing the overview to the output directory, {}...".format(
+            output_dir
+        )
+    )
+    arg_utils.create_output_dir(output_dir)
+    with open(os.path.join(output_dir, config.OVERVIEW_TSV_FILE), "w") as tf:
+        write_tsv(tf, summary, xs, ys, sides)
+    with open(os.path.join(output_dir, config.OVERVIEW_SVG_FILE), "w") as sf:
+        write_svg(sf, summary, xs, ys, sides, width, height)
+    conclude_msg()
+    if len(ccs) > config.OVERVIEW_MAX_DRAWN_COMPONENTS:
+        operation_msg(
+            "Note: only the largest {:,} of the {:,} components were drawn "
+            "in {}.".format(
+                config.OVERVIEW_MAX_DRAWN_COMPONENTS,
+                len(ccs),
+                config.OVERVIEW_SVG_FILE,
+            ),
+            True,
+        )
@@ -0,0 +1,317 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+####
+# Utilities for profiling the pipeline (--profile / --profile-detailed): this
+# records how much time and memory each stage of the pipeline, and the layout
+# of each component, took. The results are written to a JSON report in the
+# output directory, so that they can be compared across versions.
+
+import contextlib
+import cProfile
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from . import config
+
+# resource is only available on Unix-like systems
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def get_peak_rss_mb():
+    """Returns the peak resident set size of this process so far, in MiB.
+
+    This doesn't include the memory used by child processes (e.g. the dot
+    processes used when -dp is > 0). Returns None if we can't figure this
+    out on this system.
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, and in kilobytes everywhere else
+    if sys.platform == "darwin":
+        return max_rss / (1024 * 1024)
+    return max_rss / 1024
+
+
+class DecompositionStats(object):
+    """Counts and times the work done during pattern decomposition.
+
+    For each pattern validator (e.g. AssemblyGraph.is_valid_chain()), this
+    records how many times it was called, how many of these calls found a
+    pattern, and how long these calls took. It also records how many calls
+    were "revalidations" -- calls on a node that this validator already
+    rejected in an earlier pass of the decomposition -- and how many of
+    these revalidations were wasted (i.e. rejected the node again).
+
+    The functions that add patterns to the graph (add_pattern() and
+    add_bubble()) are also counted and timed.
+    """
+
+    def __init__(self):
+        # Number of passes through all of the validators
+        self.passes = 0
+        # Maps validator / adder function name to a dict of counts
+        self.validators = {}
+        self.adders = {}
+        # (validator name, node ID) pairs that a validator has rejected
+        self.rejected = set()
+
+    def wrap_validator(self, validator):
+        """Returns a version of a validator that updates these stats."""
+        name = validator.__name__
+        counts = self.validators.setdefault(
+            name,
+            {
+                "calls": 0,
+                "hits": 0,
+                "seconds": 0,
+                "revalidations": 0,
+                "wasted_revalidations": 0,
+            },
+        )
+
+        def counted_validator(g, node_id):
+            key = (name, node_id)
+            revalidation = key in self.rejected
+            start_time = time.perf_counter()
+            outputs = validator(g, node_id)
+            counts["seconds"] += time.perf_counter() - start_time
+            counts["calls"] += 1
+            if revalidation:
+                counts["revalidations"] += 1
+            if outputs[0]:
+                counts["hits"] += 1
+                self.rejected.discard(key)
+            else:
+                if revalidation:
+                    counts["wasted_revalidations"] += 1
+                self.rejected.add(key)
+            return outputs
+
+        return counted_validator
+
+    def wrap_adder(self, adder):
+        """Returns a version of add_pattern() / add_bubble() that updates
+        these stats.
+        """
+        counts = self.adders.setdefault(
+            adder.__name__, {"calls": 0, "seconds": 0}
+        )
+
+        def counted_adder(*args):
+            start_time = time.perf_counter()
+            pattern = adder(*args)
+            counts["seconds"] += time.perf_counter() - start_time
+            counts["calls"] += 1
+            return pattern
+
+        return counted_adder
+
+    def to_dict(self):
+        return {
+            "passes": self.passes,
+            "validators": self.validators,
+            "adders": self.adders,
+        }
+
+
+class Profiler(object):
+    """Records the time and memory used by parts of the pipeline.
+
+    If enabled is False, this doesn't do anything, so that code can use a
+    Profiler without needing to check if profiling was requested.
+
+    If enabled is True, this also keeps a DecompositionStats for pattern
+    decomposition.
+
+    If detailed is True (this implies enabled), then each stage is also
+    profiled using cProfile, and tracemalloc is used to record the peak
+    memory allocated by Python during each stage and where most of the
+    memory still allocated at the end of each stage came from. These slow
+    things down a lot, so they aren't done by default.
+
+    CPU times are just for this process: time spent in child processes
+    (e.g. dot processes when -dp is > 0) isn't included.
+    """
+
+    def __init__(self, enabled=False, detailed=False):
+        self.enabled = enabled or detailed
+        self.detailed = detailed
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        self.stages = []
+        self.components = []
+        # Small components (see config.PROFILE_MIN_COMPONENT_NODES) are lumped
+        # together in the report, since there can be huge numbers of them.
+        self.small_components = {
+            "count": 0,
+            "wall_seconds": 0,
+            "cpu_seconds": 0,
+        }
+        # Maps stage name to a cProfile.Profile for that stage
+        self.stage_cprofiles = {}
+        # Info about the component currently being laid out (see
+        # start_component())
+        self.curr_component = None
+        # Counters for AssemblyGraph.hierarchically_identify_patterns()
+        self.decomposition_stats = None
+        if self.enabled:
+            self.decomposition_stats = DecompositionStats()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Context manager that profiles a stage of the pipeline.
+
+        Stages shouldn't be nested.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        cprof = None
+        if self.detailed:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            elif hasattr(tracemalloc, "reset_peak"):
+                # (Only available in Python >= 3.9. On older versions, the
+                # peak reported for a stage is the peak since the start of
+                # profiling.)
+                tracemalloc.reset_peak()
+            cprof = cProfile.Profile()
+            cprof.enable()
+
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            record = {
+                "name": name,
+                "wall_seconds": time.perf_counter() - start_wall,
+                "cpu_seconds": time.process_time() - start_cpu,
+                "peak_rss_mb": get_peak_rss_mb(),
+            }
+            if self.detailed:
+                cprof.disable()
+                self.stage_cprofiles[name] = cprof
+                record["pstats_file"] = config.PROFILE_PSTATS_FILE.format(name)
+                traced_peak = tracemalloc.get_traced_memory()[1]
+                record["traced_peak_mb"] = traced_peak / (1024 * 1024)
+                record["top_allocations"] = self.get_top_allocations()
+            self.stages.append(record)
+
+    def get_top_allocations(self):
+        """Summarizes which lines of code allocated the most memory that is
+        still allocated (according to tracemalloc).
+        """
+        stats = tracemalloc.take_snapshot().statistics("lineno")
+        top = []
+        for stat in stats[: config.PROFILE_TOP_ALLOCATIONS]:
+            frame = stat.traceback[0]
+            top.append(
+                {
+                    "location": "{}:{}".format(frame.filename, frame.lineno),
+                    "size_mb": stat.size / (1024 * 1024),
+                    "count": stat.count,
+                }
+            )
+        return top
+
+    def start_component(self, cc_num, node_ct, edge_ct):
+        """Starts profiling the layout of a component.
+
+        This also stops profiling the previous component, if needed. (We
+        don't use a context manager for this, since AssemblyGraph.layout()
+        has a lot of different ways of finishing with a component.)
+        """
+        if not self.enabled:
+            return
+        self.stop_component()
+        self.curr_component = (
+            cc_num,
+            node_ct,
+            edge_ct,
+            time.perf_counter(),
+            time.process_time(),
+        )
+
+    def stop_component(self):
+        """Stops profiling the layout of the current component, if any."""
+        if self.curr_component is None:
+            return
+        cc_num, node_ct, edge_ct, start_wall, start_cpu = self.curr_component
+        wall_seconds = time.perf_counter() - start_wall
+        cpu_seconds = time.process_time() - start_cpu
+        if node_ct < config.PROFILE_MIN_COMPONENT_NODES:
+            self.small_components["count"] += 1
+            self.small_components["wall_seconds"] += wall_seconds
+            self.small_components["cpu_seconds"] += cpu_seconds
+        else:
+            self.components.append(
+                {
+                    "component": cc_num,
+                    "nodes": node_ct,
+                    "edges": edge_ct,
+                    "wall_seconds": wall_seconds,
+                    "cpu_seconds": cpu_seconds,
+                    "peak_rss_mb": get_peak_rss_mb(),
+                }
+            )
+        self.curr_component = None
+
+    def get_report(self, input_file):
+        return {
+            "input_file": input_file,
+            "python_version": platform.python_version(),
+            "platform": platform.platform(),
+            "total_wall_seconds": time.perf_counter() - self.start_wall,
+            "total_cpu_seconds": time.process_time() - self.start_cpu,
+            "peak_rss_mb": get_peak_rss_mb(),
+            "stages": self.stages,
+            "components": self.components,
+            "small_components": self.small_components,
+            "decomposition": self.decomposition_stats.to_dict(),
+        }
+
+    def write_report(self, output_dir, input_file):
+        """Writes out the JSON report (and .pstats files, if detailed) to
+        output_dir.
+
+        Returns the report (as a dict).
+        """
+        self.stop_component()
+        report = self.get_report(input_file)
+        with open(
+            os.path.join(output_dir, config.PROFILE_REPORT_FILE), "w"
+        ) as rf:
+            json.dump(report, rf, indent=1)
+        for name, cprof in self.stage_cprofiles.items():
+            cprof.dump_stats(
+                os.path.join(
+                    output_dir, config.PROFILE_PSTATS_FILE.format(name)
+                )
+            )
+        if self.detailed and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return report
@@ -0,0 +1,294 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+####
+# "Serve mode": rather than laying out every component of the graph up front,
+# this parses the graph and identifies patterns in it once, then runs a small
+# local HTTP server that serves the viewer and lays out each component only
+# when the viewer first asks for it. This makes it possible to start looking
+# at huge graphs (with many components) almost immediately, and avoids
+# spending time laying out components that nobody looks at.
+
+import http.server
+import json
+import os
+import re
+import threading
+import urllib.parse
+from . import config, arg_utils, checkpoint_utils, columnar_utils
+from . import profile_utils
+from .main import copy_support_files, fill_templates, load_assembly_graph
+from .msg_utils import operation_msg, conclude_msg
+
+# Matches the URL paths the viewer uses to request a component's data; the
+# group is the component's size rank.
+COMPONENT_PATH_RE = re.compile(
+    r"/{}/([0-9]+)\.json".format(re.escape(config.SERVE_COMPONENT_DIR))
+)
+
+
+class OnDemandLayout(object):
+    """Lays out the components of an AssemblyGraph one at a time, as they're
+    requested.
+
+    asm_graph should have already been decomposed (see
+    AssemblyGraph.decompose()). Each component's data is written to a JSON
+    file in output_dir's config.SERVE_COMPONENT_DIR directory once it has
+    been laid out, so each component is only laid out once. (If asm_graph
+    was loaded from a checkpoint in which it was already laid out, then
+    components are just written out, without being laid out again.)
+    """
+
+    def __init__(
+        self, asm_graph, output_dir, data_format=config.DATA_FORMAT_DEFAULT
+    ):
+        if data_format not in config.DATA_FORMAT_CHOICES:
+            raise ValueError(
+                "Unrecognized data format: {}".format(data_format)
+            )
+        self.asm_graph = asm_graph
+        self.output_dir = output_dir
+        self.data_format = data_format
+        self.component_dir = os.path.join(
+            output_dir, config.SERVE_COMPONENT_DIR
+        )
+        self.needs_layout = "laid_out" not in asm_graph.completed_stages
+        # Computing the components is O(|graph|), so we only do it once.
+        self.ccs = asm_graph.get_connected_components()
+        self.first_cc_num = asm_graph.num_too_large_components + 1
+        # The server handles one request at a time, but just in case: laying
+        # out two components at once would mess up asm_graph.ctrl_pts.
+        self.lock = threading.Lock()
+
+    def get_index(self):
+        """Returns an index of the graph's data for the viewer.
+
+        This is formatted like the output of
+        AssemblyGraph.write_data_chunks(), except that components haven't
+        been laid out yet: so each laid-out component just has an "on_demand"
+        flag, its node and edge counts, and the names of its nodes.
+        """
+        index = next(self.asm_graph.iter_dict_parts(cc_nums=()))
+        index["component_dir"] = config.SERVE_COMPONENT_DIR
+        index["components"] = [
+            {"skipped": True}
+        ] * self.asm_graph.num_too_large_components
+        for cc_node_ids, node_ct, edge_ct, _ in self.ccs:
+            names = set(
+                self.asm_graph.digraph.nodes[node_id]["name"]
+                for node_id in self.asm_graph.iter_basic_node_ids(cc_node_ids)
+            )
+            index["components"].append(
+                {
+                    "skipped": False,
+                    "on_demand": True,
+                    "num_nodes": node_ct,
+                    "num_edges": edge_ct,
+                    "node_names": sorted(names),
+                }
+            )
+        index["components"].extend(
+            [{"skipped": True}] * self.asm_graph.num_unselected_components
+        )
+        return index
+
+    def get_component_file(self, size_rank):
+        """Returns the path to the JSON file containing a component's data,
+        laying the component out (and writing this file) first if needed.
+
+        Raises a ValueError if there isn't a laid-out-able component with
+        this size rank.
+        """
+        cc_index = size_rank - self.first_cc_num
+        if cc_index < 0 or cc_index >= len(self.ccs):
+            raise ValueError(
+                "There isn't a component with size rank {} that can be laid "
+                "out.".format(size_rank)
+            )
+        path = os.path.join(self.component_dir, "{}.json".format(size_rank))
+        with self.lock:
+            if not os.path.exists(path):
+                component = self.get_component(size_rank)
+                os.makedirs(self.component_dir, exist_ok=True)
+                # Write to a temporary file and then move it into place, so
+                # that a half-written file is never served
+                tmp_path = path + ".tmp"
+                with open(tmp_path, "w") as cf:
+                    json.dump(component, cf)
+                os.replace(tmp_path, path)
+        return path
+
+    def get_component(self, size_rank):
+        """Lays out a component (if needed) and returns its data, formatted
+        as in AssemblyGraph.iter_dict_parts() (and converted to the columnar
+        format, if self.data_format is "columnar").
+        """
+        cc_nums = {size_rank}
+        if self.needs_layout:
+            ctrl_pt_start = self.asm_graph.ctrl_pts.num_edges
+            self.asm_graph.layout(cc_nums=cc_nums, ccs=self.ccs)
+            self.asm_graph.rotate_from_TB_to_LR(cc_nums, ctrl_pt_start)
+        parts = self.asm_graph.iter_dict_parts(cc_nums=cc_nums, ccs=self.ccs)
+        header = next(parts)
+        component = next(parts)
+        if self.data_format == "columnar":
+            component = columnar_utils.encode_component(
+                component,
+                header["node_attrs"],
+                header["edge_attrs"],
+                header["patt_attrs"],
+            )
+        return component
+
+
+class RequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves the files in the output directory, laying out components
+    as their data is requested.
+    """
+
+    def __init__(self, request, client_address, server):
+        super().__init__(
+            request,
+            client_address,
+            server,
+            directory=server.on_demand_layout.output_dir,
+        )
+
+    def do_GET(self):
+        path = urllib.parse.urlsplit(self.path).path
+        match = COMPONENT_PATH_RE.fullmatch(path)
+        if match is not None:
+            try:
+                self.server.on_demand_layout.get_component_file(
+                    int(match.group(1))
+                )
+            except ValueError as e:
+                self.send_error(404, str(e))
+                return
+            except Exception as e:
+                self.send_error(
+                    500, "Failed to lay out this component: {}".format(e)
+                )
+                raise
+        super().do_GET()
+
+
+def make_server(on_demand_layout, host, port):
+    """Returns an HTTP server for an OnDemandLayout.
+
+    The server handles one request at a time; layout is CPU-bound, so
+    handling requests in parallel wouldn't make things much faster.
+    """
+    server = http.server.HTTPServer((host, port), RequestHandler)
+    server.on_demand_layout = on_demand_layout
+    return server
+
+
+def serve(
+    input_file: str,
+    output_dir: str,
+    host: str,
+    port: int,
+    assume_oriented: bool,
+    max_node_count: int,
+    max_edge_count: int,
+    dot_processes: int,
+    layout_time_budget: float,
+    oversized_components: str,
+    data_format: str,
+    output_precision: int,
+    work_dir: str = None,
+    resume: bool = False,
+    top_components: int = None,
+    components_containing: str = None,
+    neighborhood: str = None,
+    neighborhood_radius: int = config.NEIGHBORHOOD_RADIUS_DEFAULT,
+    neighborhood_units: str = config.NEIGHBORHOOD_UNITS_DEFAULT,
+):
+    """Parses and decomposes a graph, then serves a visualization of it in
+    which components are laid out on demand.
+
+    Most of the parameters are the same as in main.make_viz(). If work_dir
+    is given, then the decomposed graph and every layout done are saved
+    there (see checkpoint_utils.py); restarting the server with resume=True
+    then reuses these.
+
+    This runs until it is interrupted (e.g. with Ctrl-C).
+    """
+    arg_utils.check_dir_existence(output_dir)
+    arg_utils.validate_max_counts(max_node_count, max_edge_count)
+    arg_utils.validate_dot_processes(dot_processes)
+    arg_utils.validate_layout_time_budget(layout_time_budget)
+    arg_utils.validate_output_precision(output_precision)
+    arg_utils.validate_top_components(top_components)
+    arg_utils.validate_neighborhood_radius(neighborhood_radius)
+    arg_utils.validate_resume(resume, work_dir)
+    profiler = profile_utils.Profiler()
+
+    asm_graph = load_assembly_graph(
+        input_file,
+        work_dir,
+        resume,
+        profiler,
+        dot_processes=dot_processes,
+        output_precision=output_precision,
+        assume_oriented=assume_oriented,
+        max_node_count=max_node_count,
+        max_edge_count=max_edge_count,
+        layout_time_budget=layout_time_budget,
+        oversized_components=oversized_components,
+        top_components=top_components,
+        components_containing=arg_utils.parse_node_names(
+            components_containing
+        ),
+        neighborhood=arg_utils.parse_node_names(neighborhood),
+        neighborhood_radius=neighborhood_radius,
+        neighborhood_units=neighborhood_units,
+    )
+    asm_graph.decompose(work_dir=work_dir, profiler=profiler)
+
+    operation_msg(
+        "Writing the viewer to the output directory, {}...".format(output_dir)
+    )
+    on_demand_layout = OnDemandLayout(asm_graph, output_dir, data_format)
+    arg_utils.create_output_dir(output_dir)
+    copy_support_files(output_dir)
+    fill_templates(
+        output_dir, on_demand_layout.get_index(), asm_graph.basename
+    )
+    conclude_msg()
+
+    layout_cache = None
+    if work_dir is not None:
+        layout_cache = checkpoint_utils.LayoutCache(
+            os.path.join(work_dir, config.CHECKPOINT_LAYOUTS_FILE)
+        )
+        asm_graph.use_layout_cache(layout_cache)
+    server = make_server(on_demand_layout, host, port)
+    try:
+        operation_msg(
+            "Serving the visualization at http://{}:{}/ (press Ctrl-C to "
+            "stop).".format(*server.server_address[:2]),
+            True,
+        )
+        server.serve_forever()
+    except KeyboardInterrupt:
+        operation_msg("Stopping the server.", True)
+    finally:
+        server.server_close()
+        if layout_cache is not None:
+            layout_cache.close()
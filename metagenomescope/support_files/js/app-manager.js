@@ -641,6 +641,11 @@ define(["jquery", "underscore", "drawer", "utils", "dom-utils"], function (
          */
         onTogglePatternCollapse(eve) {
             var pattern = eve.target;
+            // Patterns in skeleton components don't have anything inside them
+            // to collapse
+            if (pattern.data("isSkeleton")) {
+                return;
+            }
             // TODO set up
             if (pattern.data("isCollapsed")) {
                 this.uncollapsePattern(pattern);
@@ -762,17 +767,94 @@ define(["jquery", "underscore", "drawer", "utils", "dom-utils"], function (
          * an Error, and this'll stop before it actually calls
          * this.drawer.draw().
          *
+         * The data for the selected component(s) might not have been loaded
+         * yet, so we wait for this.dataHolder.loadComponents() before
+         * drawing anything.
+         *
+         * @returns {Promise} Resolved once the component(s) have been drawn.
+         *
          * @throws {Error} If component selection is invalid.
          */
         draw() {
+            var scope = this;
             var componentsToDraw = this.getComponentsToDraw();
-            this.drawer.draw(componentsToDraw, this.dataHolder);
-            // Only update this.currentlyDrawnComponents once
-            // this.drawer.draw() is finished.
-            this.currentlyDrawnComponents = componentsToDraw;
-            // Enable controls that only have meaning when stuff is drawn (e.g.
-            // the "fit graph" buttons)
-            domUtils.enableDrawNeededControls();
+            $("#textStatus").text("Loading component data...");
+            return this.dataHolder.loadComponents(componentsToDraw).then(
+                function () {
+                    scope.drawer.draw(componentsToDraw, scope.dataHolder);
+                    // Only update this.currentlyDrawnComponents once
+                    // this.drawer.draw() is finished.
+                    scope.currentlyDrawnComponents = componentsToDraw;
+                    scope.updateLayoutEngineStatus(componentsToDraw);
+                    // Enable controls that only have meaning when stuff is
+                    // drawn (e.g. the "fit graph" buttons)
+                    domUtils.enableDrawNeededControls();
+                },
+                function (error) {
+                    $("#textStatus").html("&nbsp;");
+                    alert("Failed to load component data: " + error.message);
+                    throw error;
+                }
+            );
+        }
+
+        /**
+         * Lets the user know if any of the drawn components weren't laid out
+         * using dot.
+         *
+         * This happens if dot ran out of time while laying out a component
+         * (see the -lt option in the python code) or if a component was too
+         * large to lay out with dot (see the -oc option), in which case the
+         * component was laid out using a faster but less pretty layout
+         * algorithm.
+         *
+         * @param {Array} componentsToDraw Size ranks of the drawn components.
+         */
+        updateLayoutEngineStatus(componentsToDraw) {
+            var nonDotRanks = [];
+            var skeletonRanks = [];
+            var engines = new Set();
+            _.each(
+                componentsToDraw,
+                function (cmpRank) {
+                    var engine = this.dataHolder.getComponentLayoutEngine(
+                        cmpRank
+                    );
+                    if (engine !== "dot") {
+                        nonDotRanks.push(cmpRank);
+                        engines.add(engine);
+                    }
+                    if (this.dataHolder.isComponentSkeleton(cmpRank)) {
+                        skeletonRanks.push(cmpRank);
+                    }
+                },
+                this
+            );
+            var notes = [];
+            if (nonDotRanks.length > 0) {
+                notes.push(
+                    "component(s) " +
+                        nonDotRanks.join(", ") +
+                        " were too large or took too long to lay out using " +
+                        "dot, and were instead laid out using " +
+                        Array.from(engines).join(", ") +
+                        "."
+                );
+            }
+            if (skeletonRanks.length > 0) {
+                notes.push(
+                    "component(s) " +
+                        skeletonRanks.join(", ") +
+                        " were too large to lay out fully, so only their " +
+                        "skeletons are shown (the contents of patterns in " +
+                        "these components are not drawn)."
+                );
+            }
+            if (notes.length > 0) {
+                $("#textStatus").text("Note: " + notes.join(" Also, "));
+            } else {
+                $("#textStatus").html("&nbsp;");
+            }
         }
 
         /**
@@ -1,9 +1,300 @@
-define(["underscore", "utils"], function (_, utils) {
+define(["underscore", "utils", "require"], function (_, utils, require) {
     class DataHolder {
+        /**
+         * @param {Object} dataJSON Graph data from the python script. The
+         *                          data for each laid-out component is
+         *                          usually not included in here, but is
+         *                          instead stored in one of the "chunk"
+         *                          files listed in dataJSON.chunk_files; see
+         *                          loadComponents().
+         */
         constructor(dataJSON) {
             this.data = dataJSON;
         }
 
+        /**
+         * Decodes a base64 string to an ArrayBuffer.
+         *
+         * @param {String} b64
+         *
+         * @returns {ArrayBuffer}
+         */
+        decodeBase64(b64) {
+            var str = atob(b64);
+            var bytes = new Uint8Array(str.length);
+            for (var i = 0; i < str.length; i++) {
+                bytes[i] = str.charCodeAt(i);
+            }
+            return bytes.buffer;
+        }
+
+        /**
+         * Decompresses a chunk of component data, if needed.
+         *
+         * If the python script was run with -cd, then each chunk's data is
+         * gzipped and stored (in base64) under the chunk's "gzip" key; we
+         * decompress this using a DecompressionStream.
+         *
+         * @param {Object} chunk Object defined in a chunk file.
+         *
+         * @returns {Promise} Resolves to the chunk's (decompressed) data,
+         *                    which maps size ranks to component data.
+         */
+        decompressChunk(chunk) {
+            if (!_.has(chunk, "gzip")) {
+                return Promise.resolve(chunk);
+            }
+            var stream = new Blob([this.decodeBase64(chunk.gzip)])
+                .stream()
+                .pipeThrough(new DecompressionStream("gzip"));
+            return new Response(stream).text().then(JSON.parse);
+        }
+
+        /**
+         * Converts a column of values stored in the "columnar" data format
+         * (see columnar_utils.py in the python code) to an Array.
+         *
+         * Numeric columns are stored as base64-encoded little-endian typed
+         * arrays; nulls are stored as NaN in float columns and as the
+         * smallest int32 value in int columns.
+         *
+         * @param {Object} col Column, with "type" and "data" properties (and
+         *                     an "offsets" property for "ragged_f4" columns).
+         *
+         * @returns {Array}
+         *
+         * @throws {Error} If the column's type is unrecognized.
+         */
+        decodeColumn(col) {
+            var arr;
+            if (col.type === "list") {
+                return col.data;
+            } else if (col.type === "u1") {
+                arr = new Uint8Array(this.decodeBase64(col.data));
+                return _.map(arr, function (v) {
+                    return v === 1;
+                });
+            } else if (col.type === "i4") {
+                arr = new Int32Array(this.decodeBase64(col.data));
+                return _.map(arr, function (v) {
+                    return v === -2147483648 ? null : v;
+                });
+            } else if (col.type === "f4" || col.type === "f8") {
+                if (col.type === "f4") {
+                    arr = new Float32Array(this.decodeBase64(col.data));
+                } else {
+                    arr = new Float64Array(this.decodeBase64(col.data));
+                }
+                return _.map(arr, function (v) {
+                    return isNaN(v) ? null : v;
+                });
+            } else if (col.type === "ragged_f4") {
+                arr = new Float32Array(this.decodeBase64(col.data));
+                var offsets = new Int32Array(this.decodeBase64(col.offsets));
+                var out = [];
+                for (var o = 0; o + 1 < offsets.length; o++) {
+                    out.push(
+                        Array.from(arr.subarray(offsets[o], offsets[o + 1]))
+                    );
+                }
+                return out;
+            } else {
+                throw new Error("Unrecognized column type: " + col.type);
+            }
+        }
+
+        /**
+         * Converts the data for a component stored in the "columnar" data
+         * format to the format used for normal (JSON) component data, in
+         * which each node / edge / pattern is stored as an Array of values.
+         *
+         * @param {Object} cmpData
+         *
+         * @returns {Object}
+         */
+        decodeColumnarComponent(cmpData) {
+            var scope = this;
+            // Converts an Array of columns to an Array of rows
+            var toRows = function (table) {
+                var cols = _.map(table.cols, function (col) {
+                    return scope.decodeColumn(col);
+                });
+                var rows = [];
+                for (var r = 0; r < table.count; r++) {
+                    rows.push(
+                        _.map(cols, function (col) {
+                            return col[r];
+                        })
+                    );
+                }
+                return rows;
+            };
+            var out = _.omit(cmpData, "columnar");
+
+            out.nodes = {};
+            var nodeIDs = this.decodeColumn(cmpData.nodes.ids);
+            _.each(toRows(cmpData.nodes), function (row, i) {
+                out.nodes[nodeIDs[i]] = row;
+            });
+
+            out.edges = {};
+            var srcIDs = this.decodeColumn(cmpData.edges.src);
+            var tgtIDs = this.decodeColumn(cmpData.edges.tgt);
+            _.each(toRows(cmpData.edges), function (row, i) {
+                if (!_.has(out.edges, srcIDs[i])) {
+                    out.edges[srcIDs[i]] = {};
+                }
+                out.edges[srcIDs[i]][tgtIDs[i]] = row;
+            });
+
+            out.patts = toRows(cmpData.patts);
+            return out;
+        }
+
+        /**
+         * Returns true if the data (nodes, edges, patterns) for a component
+         * is available.
+         *
+         * @param {Object} cmp Entry in this.data.components.
+         *
+         * @returns {Boolean}
+         */
+        isComponentLoaded(cmp) {
+            return !cmp.skipped && _.has(cmp, "nodes");
+        }
+
+        /**
+         * Merges the data in a (decompressed) chunk into
+         * this.data.components, so that the rest of this class can treat
+         * loaded components the same as inlined components.
+         *
+         * @param {Object} chunk Maps size ranks to component data.
+         */
+        addChunkData(chunk) {
+            var scope = this;
+            _.each(chunk, function (cmpData, sizeRank) {
+                if (cmpData.columnar) {
+                    cmpData = scope.decodeColumnarComponent(cmpData);
+                }
+                _.extend(scope.data.components[sizeRank - 1], cmpData);
+            });
+        }
+
+        /**
+         * Loads the data for some components from their chunk files.
+         *
+         * Chunk files are loaded using RequireJS (rather than by, say,
+         * fetch()ing JSON) because this works even when the viewer is opened
+         * using a file:// URL. Components that have already been loaded
+         * (including all components, if the data was inlined into
+         * dataJSON) aren't loaded again. Gzipped chunks are decompressed
+         * before their data is used.
+         *
+         * If the viewer is being served by mgsc-serve, components are instead
+         * laid out on demand: the data for these ("on_demand") components is
+         * fetch()ed from the server, which lays them out if needed.
+         *
+         * @param {Array} sizeRanks 1-indexed size ranks of the components to
+         *                          load.
+         *
+         * @returns {Promise} Resolved once all of these components have been
+         *                    loaded; rejected if a chunk file couldn't be
+         *                    loaded (or if the server couldn't lay out a
+         *                    component).
+         */
+        loadComponents(sizeRanks) {
+            var scope = this;
+            var chunkPaths = [];
+            var onDemandRanks = [];
+            _.each(sizeRanks, function (sizeRank) {
+                scope.validateComponentRank(sizeRank);
+                var cmp = scope.data.components[sizeRank - 1];
+                if (!cmp.skipped && !scope.isComponentLoaded(cmp)) {
+                    if (cmp.on_demand) {
+                        onDemandRanks.push(sizeRank);
+                    } else {
+                        chunkPaths.push(scope.data.chunk_files[cmp.chunk]);
+                    }
+                }
+            });
+            chunkPaths = _.uniq(chunkPaths);
+            return Promise.all(
+                [scope.loadChunks(chunkPaths)].concat(
+                    _.map(onDemandRanks, function (sizeRank) {
+                        return scope.fetchComponent(sizeRank);
+                    })
+                )
+            );
+        }
+
+        /**
+         * Fetches the data for a component that is laid out on demand by
+         * mgsc-serve.
+         *
+         * @param {Number} sizeRank
+         *
+         * @returns {Promise} Resolved once this component has been loaded.
+         */
+        fetchComponent(sizeRank) {
+            var scope = this;
+            var url = this.data.component_dir + "/" + sizeRank + ".json";
+            return fetch(url)
+                .then(function (response) {
+                    if (!response.ok) {
+                        throw new Error(
+                            "Requesting component " +
+                                sizeRank +
+                                " failed (" +
+                                response.status +
+                                " " +
+                                response.statusText +
+                                ")"
+                        );
+                    }
+                    return response.json();
+                })
+                .then(function (cmpData) {
+                    var chunk = {};
+                    chunk[sizeRank] = cmpData;
+                    scope.addChunkData(chunk);
+                });
+        }
+
+        /**
+         * Loads chunk files using RequireJS, and adds their data.
+         *
+         * @param {Array} chunkPaths Paths of the chunk files to load.
+         *
+         * @returns {Promise} Resolved once all of these chunks have been
+         *                    loaded.
+         */
+        loadChunks(chunkPaths) {
+            var scope = this;
+            return new Promise(function (resolve, reject) {
+                if (chunkPaths.length === 0) {
+                    resolve();
+                    return;
+                }
+                require(
+                    chunkPaths,
+                    function () {
+                        var decompressed = _.map(arguments, function (chunk) {
+                            return scope.decompressChunk(chunk);
+                        });
+                        Promise.all(decompressed)
+                            .then(function (chunks) {
+                                _.each(chunks, function (chunk) {
+                                    scope.addChunkData(chunk);
+                                });
+                                resolve();
+                            })
+                            .catch(reject);
+                    },
+                    reject
+                );
+            });
+        }
+
         /**
          * Returns the number of connected components in the graph, including
          * those that were skipped during layout.
@@ -129,6 +420,12 @@ define(["underscore", "utils"], function (_, utils) {
                 cmp
             ) {
                 if (!cmp.skipped) {
+                    // If the component's data hasn't been loaded, we can
+                    // still search through the node names included in the
+                    // index
+                    if (_.has(cmp, "node_names")) {
+                        return _.contains(cmp.node_names, queryName);
+                    }
                     // Return true if any of the values in cmp.nodes (the
                     // values in this Object are Arrays of node data) has the
                     // "name" property that matches the query name
@@ -210,6 +507,28 @@ define(["underscore", "utils"], function (_, utils) {
             }
         }
 
+        /**
+         * Returns the entry in this.data.components for a component, after
+         * checking that this component's data has been loaded.
+         *
+         * @param {Number} sizeRank
+         *
+         * @returns {Object}
+         *
+         * @throws {Error} If the size rank is invalid, or if this component
+         *                 hasn't been loaded yet (see loadComponents()).
+         */
+        getLoadedComponent(sizeRank) {
+            this.validateComponentRank(sizeRank);
+            var cmp = this.data.components[sizeRank - 1];
+            if (!this.isComponentLoaded(cmp)) {
+                throw new Error(
+                    "Component " + sizeRank + " hasn't been loaded."
+                );
+            }
+            return cmp;
+        }
+
         /**
          * Returns an Array of Arrays with data for all patterns in a given
          * component.
@@ -223,8 +542,7 @@ define(["underscore", "utils"], function (_, utils) {
          * @returns {Array}
          */
         getPatternsInComponent(sizeRank) {
-            this.validateComponentRank(sizeRank);
-            return this.data.components[sizeRank - 1].patts;
+            return this.getLoadedComponent(sizeRank).patts;
         }
 
         /**
@@ -233,8 +551,7 @@ define(["underscore", "utils"], function (_, utils) {
          * @returns {Array}
          */
         getNodesInComponent(sizeRank) {
-            this.validateComponentRank(sizeRank);
-            return this.data.components[sizeRank - 1].nodes;
+            return this.getLoadedComponent(sizeRank).nodes;
         }
 
         /**
@@ -243,8 +560,7 @@ define(["underscore", "utils"], function (_, utils) {
          * @returns {Array}
          */
         getEdgesInComponent(sizeRank) {
-            this.validateComponentRank(sizeRank);
-            return this.data.components[sizeRank - 1].edges;
+            return this.getLoadedComponent(sizeRank).edges;
         }
 
         getPattAttrs() {
@@ -272,6 +588,39 @@ define(["underscore", "utils"], function (_, utils) {
             return this.data.components[sizeRank - 1].bb;
         }
 
+        /**
+         * Returns the name of the layout program used to lay out a
+         * component.
+         *
+         * This is usually "dot", but components that took too long to lay
+         * out with dot (if the -lt option was used) or that were too large
+         * to lay out with dot (if the -oc option was used) will have been
+         * laid out with something else.
+         *
+         * @param {Number} sizeRank
+         * @returns {String}
+         */
+        getComponentLayoutEngine(sizeRank) {
+            this.validateComponentRank(sizeRank);
+            return this.data.components[sizeRank - 1].layout_engine;
+        }
+
+        /**
+         * Returns true if only the "skeleton" of a component was laid out.
+         *
+         * In skeleton components, only the top level of the component is
+         * included in the data: patterns are stored without any of their
+         * children, and edges incident on patterns point to the patterns
+         * themselves (rather than to nodes within the patterns).
+         *
+         * @param {Number} sizeRank
+         * @returns {Boolean}
+         */
+        isComponentSkeleton(sizeRank) {
+            this.validateComponentRank(sizeRank);
+            return this.data.components[sizeRank - 1].skeleton;
+        }
+
         getNodeInfo(nodeID) {
             // NOTE: unlike in getPatternInfo(), node IDs are sorta stored as
             // strings in the data JSON -- even though they're integers,
@@ -283,7 +632,7 @@ define(["underscore", "utils"], function (_, utils) {
             var nodeAttrs = this.getNodeAttrs();
             for (var i = 0; i < this.data.components.length; i++) {
                 var cmp = this.data.components[i];
-                if (!cmp.skipped) {
+                if (this.isComponentLoaded(cmp)) {
                     if (_.has(cmp.nodes, nodeID)) {
                         return cmp.nodes[nodeID];
                     }
@@ -295,7 +644,7 @@ define(["underscore", "utils"], function (_, utils) {
         getNodeName(nodeID) {
             for (var i = 0; i < this.data.components.length; i++) {
                 var cmp = this.data.components[i];
-                if (!cmp.skipped) {
+                if (this.isComponentLoaded(cmp)) {
                     if (_.has(cmp.nodes, nodeID)) {
                         return cmp.nodes[nodeID][this.getNodeAttrs().name];
                     }
@@ -308,7 +657,7 @@ define(["underscore", "utils"], function (_, utils) {
             var edgeAttrs = this.getEdgeAttrs();
             for (var i = 0; i < this.data.components.length; i++) {
                 var cmp = this.data.components[i];
-                if (!cmp.skipped) {
+                if (this.isComponentLoaded(cmp)) {
                     if (_.has(cmp.edges, srcID)) {
                         if (_.has(cmp.edges[srcID], tgtID)) {
                             return cmp.edges[srcID][tgtID];
@@ -350,7 +699,7 @@ define(["underscore", "utils"], function (_, utils) {
             }
             for (var i = 0; i < this.data.components.length; i++) {
                 var cmp = this.data.components[i];
-                if (!cmp.skipped) {
+                if (this.isComponentLoaded(cmp)) {
                     for (var p = 0; p < cmp.patts.length; p++) {
                         if (cmp.patts[p][pattAttrs.pattern_id] === intID) {
                             return cmp.patts[p];
@@ -156,6 +156,15 @@ define([
                             "padding-bottom": 0,
                         },
                     },
+                    {
+                        // The contents of patterns in skeleton components
+                        // weren't laid out, so these patterns are just shown
+                        // as empty boxes
+                        selector: "node.pattern.skeleton",
+                        style: {
+                            "border-style": "dashed",
+                        },
+                    },
                     {
                         // Give collapsed patterns a number indicating child count
                         selector: "node.pattern[?isCollapsed]",
@@ -521,13 +530,14 @@ define([
             });
         }
 
-        renderPattern(pattAttrs, pattVals, dx, dy) {
+        renderPattern(pattAttrs, pattVals, dx, dy, isSkeleton = false) {
             var pattID = pattVals[pattAttrs.pattern_id];
             var pattData = {
                 id: pattID,
                 w: pattVals[pattAttrs.width],
                 h: pattVals[pattAttrs.height],
                 isCollapsed: false,
+                isSkeleton: isSkeleton,
             };
 
             // Add parent ID, if needed.
@@ -552,6 +562,9 @@ define([
             } else {
                 classes += " M";
             }
+            if (isSkeleton) {
+                classes += " skeleton";
+            }
             var x =
                 dx + (pattVals[pattAttrs.left] + pattVals[pattAttrs.right]) / 2;
             var y =
@@ -567,6 +580,7 @@ define([
                 );
             }
             this.numDrawnPatterns++;
+            return [x, y];
         }
 
         /**
@@ -884,11 +898,15 @@ define([
          * @param {Array} componentsToDraw 1-indexed size rank numbers of the
          *                                 component(s) to draw.
          *
-         * @param {DataHolder} dataHolder Object containing graph data.
+         * @param {DataHolder} dataHolder Object containing graph data. The
+         *                              data for all of the components in
+         *                              componentsToDraw should already have
+         *                              been loaded (see
+         *                              DataHolder.loadComponents()).
          *
          * @throws {Error} If componentsToDraw contains duplicate values and/or
          *                 if any of the numbers within it are invalid with
-         *                 respect to the dataHolder.
+         *                 respect to the dataHolder (or haven't been loaded).
          */
         draw(componentsToDraw, dataHolder) {
             var scope = this;
@@ -904,16 +922,27 @@ define([
             var dy = 0;
             var firstCompWidth = null;
             _.each(componentsToDraw, function (sizeRank) {
-                // Draw patterns
+                // Draw patterns. We record their positions alongside those of
+                // nodes, since in skeleton components edges can be incident
+                // on patterns.
+                var node2pos = {};
+                var isSkeleton = dataHolder.isComponentSkeleton(sizeRank);
                 var pattAttrs = dataHolder.getPattAttrs();
                 _.each(dataHolder.getPatternsInComponent(sizeRank), function (
                     pattVals
                 ) {
-                    scope.renderPattern(pattAttrs, pattVals, dx, dy);
+                    node2pos[
+                        pattVals[pattAttrs.pattern_id]
+                    ] = scope.renderPattern(
+                        pattAttrs,
+                        pattVals,
+                        dx,
+                        dy,
+                        isSkeleton
+                    );
                 });
 
                 // Draw nodes
-                var node2pos = {};
                 var nodeAttrs = dataHolder.getNodeAttrs();
                 _.each(dataHolder.getNodesInComponent(sizeRank), function (
                     nodeVals,
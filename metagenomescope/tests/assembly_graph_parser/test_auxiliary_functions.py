@@ -1,7 +1,11 @@
 import pytest
+import networkx as nx
+from metagenomescope.input_node_utils import negate_fastg_node_id
 from metagenomescope.assembly_graph_parser import (
     sniff_filetype,
     is_not_pos_int,
+    remove_complement_components,
+    check_oriented,
 )
 
 
@@ -91,3 +95,26 @@ def test_sniff_filetype():
 #
 #     with pytest.raises(NotImplementedError):
 #         AssemblyGraph("metagenomescope/tests/input/garbage.thing")
+
+
+def test_remove_complement_components():
+    g = nx.DiGraph()
+    g.add_edge("1+", "2+")
+    g.add_edge("2-", "1-")
+    g.add_edge("3+", "3+")
+    g.add_edge("3-", "3-")
+    g.add_node("4-")
+    remove_complement_components(g, negate_fastg_node_id)
+    assert sorted(g.nodes) == ["1+", "2+", "3+", "4-"]
+    assert sorted(g.edges) == [("1+", "2+"), ("3+", "3+")]
+
+
+def test_check_oriented():
+    g = nx.DiGraph()
+    g.add_edge("1+", "2+")
+    g.add_edge("2-", "1-")
+    check_oriented(g, negate_fastg_node_id)
+    g.add_edge("2+", "2-")
+    with pytest.raises(ValueError) as ei:
+        check_oriented(g, negate_fastg_node_id)
+    assert "can't be treated as oriented" in str(ei.value)
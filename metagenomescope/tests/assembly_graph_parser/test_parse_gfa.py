@@ -1,3 +1,5 @@
+import pytest
+
 # from .utils import run_tempfile_test
 from metagenomescope.input_node_utils import negate_node_id
 from metagenomescope.assembly_graph_parser import parse_gfa
@@ -109,6 +111,31 @@ def test_parse_self_implied_edge():
         assert edge_id in digraph.edges
 
 
+def test_parse_gfa_assume_oriented():
+    digraph = parse_gfa(
+        "metagenomescope/tests/input/sample1.gfa", assume_oriented=True
+    )
+    # Each node should only be included in the orientation it's used in. (6
+    # isn't used in any edges, so it's just included as a positive node.)
+    assert sorted(digraph.nodes) == ["-4", "1", "2", "3", "5", "6"]
+    assert digraph.nodes["-4"]["orientation"] == "-"
+    assert digraph.nodes["6"]["orientation"] == "+"
+    # ... and implied edges shouldn't be added.
+    assert sorted(digraph.edges) == [
+        ("-4", "5"),
+        ("1", "2"),
+        ("3", "-4"),
+        ("3", "2"),
+    ]
+
+
+def test_parse_gfa_assume_oriented_fails_if_unorientable():
+    # 2+ -> 2- means that both strands of 2 have to be in the same component
+    with pytest.raises(ValueError) as ei:
+        parse_gfa("metagenomescope/tests/input/loop.gfa", assume_oriented=True)
+    assert "can't be treated as oriented" in str(ei.value)
+
+
 def get_sample1_gfa():
     """Just returns a list representation of sample1.gfa, which as mentioned
     is from https://github.com/sjackman/gfalint/tree/master/examples.
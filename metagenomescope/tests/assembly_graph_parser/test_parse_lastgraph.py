@@ -51,6 +51,16 @@ def test_parse_lastgraph_good():
         assert digraph.edges[edge_id]["multiplicity"] == 9
 
 
+def test_parse_lastgraph_assume_oriented():
+    digraph = parse_lastgraph(
+        "metagenomescope/tests/input/cycletest_LastGraph", assume_oriented=True
+    )
+    assert sorted(digraph.nodes) == ["1", "2"]
+    assert sorted(digraph.edges) == [("1", "2"), ("2", "1")]
+    assert digraph.edges["1", "2"]["multiplicity"] == 5
+    assert digraph.edges["2", "1"]["multiplicity"] == 9
+
+
 # The remaining functions in this file test a few expected-to-fail LastGraph
 # files. These should all be caught by validate_lastgraph_file(), which we've
 # already thoroughly unit-tested using these same exact inputs, so this isn't
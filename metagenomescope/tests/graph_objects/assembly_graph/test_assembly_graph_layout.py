@@ -1,5 +1,6 @@
 import pytest
 from metagenomescope.graph_objects import AssemblyGraph
+from metagenomescope.input_node_utils import negate_node_id
 
 
 def test_ccs_avoided_due_to_max_node_ct(capsys):
@@ -26,3 +27,141 @@ def test_error_if_all_ccs_avoided():
             "metagenomescope/tests/input/sample1.gfa", max_node_count=0
         )
     assert "All components were too large to lay out." in str(ei.value)
+
+
+def test_layout_engine_recorded_per_component():
+    ag = AssemblyGraph("metagenomescope/tests/input/sample1.gfa")
+    ag.process()
+    for cmp in ag.to_dict()["components"]:
+        assert cmp["layout_engine"] == "dot"
+
+
+def test_layout_time_budget_fallback(capsys):
+    # The budget is so small that the deadline will have passed before we
+    # even try to lay out anything, so every component that isn't a single
+    # node should be laid out using the fallback engine.
+    ag = AssemblyGraph(
+        "metagenomescope/tests/input/sample1.gfa", layout_time_budget=1e-9
+    )
+    ag.process()
+    captured = capsys.readouterr()
+    assert (
+        "Component 1 took more than 1e-09 second(s) to lay out; laying it out "
+        "using sfdp instead..."
+    ) in captured.out
+    data = ag.to_dict()
+    for cmp in data["components"]:
+        if len(cmp["nodes"]) > 1:
+            assert cmp["layout_engine"] == "sfdp"
+        else:
+            assert cmp["layout_engine"] == "dot"
+    # Check that the fallback layout is actually usable
+    for node_data in data["components"][0]["nodes"].values():
+        assert node_data[data["node_attrs"]["x"]] is not None
+
+
+def test_oversized_components_layered(capsys):
+    ag = AssemblyGraph(
+        "metagenomescope/tests/input/sample1.gfa",
+        max_node_count=2,
+        oversized_components="layered",
+    )
+    assert ag.num_too_large_components == 0
+    ag.process()
+    captured = capsys.readouterr()
+    assert (
+        "Component (5 nodes, 4 edges) exceeds -maxn or -maxe; it will be laid "
+        "out using the layered layout."
+    ) in captured.out
+    data = ag.to_dict()
+    assert not any(cmp["skipped"] for cmp in data["components"])
+    x = data["node_attrs"]["x"]
+    for cmp in data["components"]:
+        if len(cmp["nodes"]) > 2:
+            assert cmp["layout_engine"] == "layered"
+        else:
+            assert cmp["layout_engine"] == "dot"
+        for node_data in cmp["nodes"].values():
+            assert node_data[x] is not None
+
+
+def test_oversized_components_skeleton():
+    ag = AssemblyGraph(
+        "metagenomescope/tests/input/hierarchical_test_graph.gml",
+        max_node_count=5,
+        oversized_components="skeleton",
+    )
+    ag.process()
+    data = ag.to_dict()
+    assert len(data["components"]) == 1
+    cmp = data["components"][0]
+    assert cmp["skeleton"]
+    assert not cmp["skipped"]
+    assert cmp["layout_engine"] == "dot"
+
+    # Only the top level of the component should be included
+    patt_parent_id = data["patt_attrs"]["parent_id"]
+    node_parent_id = data["node_attrs"]["parent_id"]
+    assert len(cmp["patts"]) > 0
+    for patt_data in cmp["patts"]:
+        assert patt_data[patt_parent_id] is None
+        assert patt_data[data["patt_attrs"]["width"]] > 0
+    for node_data in cmp["nodes"].values():
+        assert node_data[node_parent_id] is None
+
+    # Every edge should be between top-level nodes and/or patterns
+    top_level_ids = set(cmp["nodes"].keys()) | set(
+        p[data["patt_attrs"]["pattern_id"]] for p in cmp["patts"]
+    )
+    num_edges = 0
+    for src, tgts in cmp["edges"].items():
+        assert src in top_level_ids
+        for tgt in tgts:
+            assert tgt in top_level_ids
+            num_edges += 1
+    assert num_edges == len(ag.decomposed_digraph.edges)
+
+
+def test_mirrored_components(capsys):
+    # sample1.gfa's two 5-node components are reverse complements of each
+    # other, so the second one's layout should be derived from the first's.
+    ag = AssemblyGraph("metagenomescope/tests/input/sample1.gfa")
+    ag.process()
+    captured = capsys.readouterr()
+    assert "Done (mirrored component 1)." in captured.out
+    assert ag.cc_num_to_bb[1] == ag.cc_num_to_bb[2]
+    assert ag.cc_num_to_layout_engine[2] == "dot"
+
+    name2data = {data["name"]: data for _, data in ag.digraph.nodes(data=True)}
+    for name, data in name2data.items():
+        if data["cc_num"] != 1:
+            continue
+        twin = name2data[negate_node_id(name)]
+        assert twin["cc_num"] == 2
+        # The layout has been rotated from top -> bottom to left -> right, so
+        # the mirroring is now horizontal.
+        assert twin["y"] == pytest.approx(data["y"])
+        assert twin["x"] == pytest.approx(-ag.cc_num_to_bb[1][0] - data["x"])
+
+    for (src, tgt), data in ag.decomposed_digraph.edges.items():
+        if data["cc_num"] == 2:
+            assert len(ag.get_ctrl_pt_coords(data)) > 0
+
+
+def test_get_complement_name_func():
+    ag = AssemblyGraph("metagenomescope/tests/input/sample1.gfa")
+    assert ag.get_complement_name_func() is negate_node_id
+    # GML files don't have implied reverse complement nodes, so we can't do
+    # any mirroring.
+    ag = AssemblyGraph("metagenomescope/tests/input/marygold_fig2a.gml")
+    assert ag.get_complement_name_func() is None
+
+
+def test_assume_oriented():
+    ag = AssemblyGraph(
+        "metagenomescope/tests/input/sample1.gfa", assume_oriented=True
+    )
+    ag.process()
+    assert ag.get_complement_name_func() is None
+    data = ag.to_dict()
+    assert [len(cmp["nodes"]) for cmp in data["components"]] == [5, 1]
@@ -0,0 +1,93 @@
+import pytest
+import networkx as nx
+from metagenomescope.graph_objects import AssemblyGraph
+
+ECOLI = "metagenomescope/tests/input/E_coli_LastGraph"
+
+
+def get_cc_names(ag):
+    """Returns a list of the sets of node names in each component of ag."""
+    return [
+        set(ag.digraph.nodes[n]["name"] for n in cc)
+        for cc in nx.weakly_connected_components(ag.digraph)
+    ]
+
+
+def test_select_top_components():
+    full_ag = AssemblyGraph(ECOLI)
+    full_ccs = list(nx.weakly_connected_components(full_ag.digraph))
+    assert len(full_ccs) == 61
+    # The three largest components (by nodes, then edges) in the graph
+    sizes = sorted(
+        (
+            (len(cc), len(full_ag.digraph.subgraph(cc).edges))
+            for cc in full_ccs
+        ),
+        reverse=True,
+    )
+
+    ag = AssemblyGraph(ECOLI, top_components=3)
+    assert ag.num_unselected_components == 58
+    assert ag.num_too_large_components == 0
+    ccs = list(nx.weakly_connected_components(ag.digraph))
+    assert (
+        sorted(
+            ((len(cc), len(ag.digraph.subgraph(cc).edges)) for cc in ccs),
+            reverse=True,
+        )
+        == sizes[:3]
+    )
+
+    # Asking for more components than exist is fine
+    ag = AssemblyGraph(ECOLI, top_components=100)
+    assert ag.num_unselected_components == 0
+    assert len(ag.digraph) == len(full_ag.digraph)
+
+
+def test_select_components_containing():
+    ag = AssemblyGraph(ECOLI, components_containing=["89"])
+    assert ag.num_unselected_components == 60
+    cc_names = get_cc_names(ag)
+    assert len(cc_names) == 1
+    assert "89" in cc_names[0]
+
+    # Selecting two nodes in the same component just selects that component
+    ag = AssemblyGraph(ECOLI, components_containing=["89", "-89"])
+    assert ag.num_unselected_components == 60
+
+    with pytest.raises(ValueError) as e:
+        AssemblyGraph(ECOLI, components_containing=["89", "abc", "123456"])
+    assert "Can't find node(s) 123456, abc in the graph" in str(e.value)
+
+
+def test_select_both():
+    # Find a node in a small component
+    full_ag = AssemblyGraph(ECOLI)
+    small_cc_names = min(get_cc_names(full_ag), key=len)
+    small_name = sorted(small_cc_names)[0]
+
+    ag = AssemblyGraph(
+        ECOLI, top_components=2, components_containing=[small_name]
+    )
+    assert ag.num_unselected_components == 58
+    cc_names = get_cc_names(ag)
+    assert small_cc_names in cc_names
+
+    # If the named node is in one of the top components, we don't select
+    # anything extra
+    ag = AssemblyGraph(ECOLI, top_components=1, components_containing=["89"])
+    assert ag.num_unselected_components == 60
+
+
+def test_unselected_components_skipped_in_output():
+    ag = AssemblyGraph(
+        "metagenomescope/tests/input/sample1.gfa", top_components=1
+    )
+    assert ag.num_unselected_components == 3
+    ag.process()
+    components = ag.to_dict()["components"]
+    assert len(components) == 4
+    assert not components[0]["skipped"]
+    assert len(components[0]["nodes"]) == 5
+    for cmp in components[1:]:
+        assert cmp == {"skipped": True}
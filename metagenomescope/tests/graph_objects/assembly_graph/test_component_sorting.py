@@ -15,26 +15,30 @@ def test_component_sorting_simple():
     # Components 1/2 and 3/4 have the same number of nodes/edges/patterns, so
     # the precise ordering is arbitrary. We just check that the number of
     # top-level nodes ("real" nodes or collapsed patterns, stored in the 0th
-    # position of each 3-tuple in wccs) is correct, and that the total numbers
-    # of "real" nodes and edges in the component (stored in the 1st and 2nd
-    # position of each 3-tuple) is also correct.
+    # position of each 4-tuple in wccs) is correct, and that the total numbers
+    # of "real" nodes, edges, and patterns in the component (stored in the
+    # 1st, 2nd, and 3rd positions of each 4-tuple) are also correct.
     assert len(wccs) == 4
 
     assert len(wccs[0][0]) == 4
     assert wccs[0][1] == 5
     assert wccs[0][2] == 4
+    assert wccs[0][3] == 1
 
     assert len(wccs[1][0]) == 4
     assert wccs[1][1] == 5
     assert wccs[1][2] == 4
+    assert wccs[1][3] == 1
 
     assert len(wccs[2][0]) == 1
     assert wccs[2][1] == 1
     assert wccs[2][2] == 0
+    assert wccs[2][3] == 0
 
     assert len(wccs[3][0]) == 1
     assert wccs[3][1] == 1
     assert wccs[3][2] == 0
+    assert wccs[3][3] == 0
 
 
 def test_component_sorting_ecoli_graph():
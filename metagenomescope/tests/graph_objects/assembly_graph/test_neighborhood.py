@@ -0,0 +1,99 @@
+import pytest
+from metagenomescope.graph_objects import AssemblyGraph
+
+# A chain of nodes 1 -> 2 -> 3 -> 4 -> 5, plus an isolated node 6
+LENGTHS = {"1": 10, "2": 5, "3": 100, "4": 20, "5": 10, "6": 10}
+
+
+def write_chain_gfa(tmp_path):
+    lines = ["H\tVN:Z:1.0"]
+    for name, length in LENGTHS.items():
+        lines.append("S\t{}\t{}".format(name, "A" * length))
+    for src, tgt in (("1", "2"), ("2", "3"), ("3", "4"), ("4", "5")):
+        lines.append("L\t{}\t+\t{}\t+\t0M".format(src, tgt))
+    filename = str(tmp_path / "chain.gfa")
+    with open(filename, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return filename
+
+
+def get_names(ag):
+    return set(ag.digraph.nodes[n]["name"] for n in ag.digraph.nodes)
+
+
+def with_complements(names):
+    return set(names) | set("-" + n for n in names)
+
+
+def test_neighborhood_hops(tmp_path):
+    filename = write_chain_gfa(tmp_path)
+    ag = AssemblyGraph(filename, neighborhood=["3"], neighborhood_radius=1)
+    assert get_names(ag) == with_complements(["2", "3", "4"])
+    # 2 -> 3 -> 4, and -4 -> -3 -> -2
+    assert len(ag.digraph.edges) == 4
+
+    ag = AssemblyGraph(filename, neighborhood=["3"], neighborhood_radius=0)
+    assert get_names(ag) == with_complements(["3"])
+
+    # Edge directions are ignored
+    ag = AssemblyGraph(filename, neighborhood=["5"], neighborhood_radius=2)
+    assert get_names(ag) == with_complements(["3", "4", "5"])
+
+    # Seeding with a reverse complement node gives the same neighborhood
+    ag = AssemblyGraph(filename, neighborhood=["-5"], neighborhood_radius=2)
+    assert get_names(ag) == with_complements(["3", "4", "5"])
+
+    ag = AssemblyGraph(
+        filename, neighborhood=["1", "6"], neighborhood_radius=1
+    )
+    assert get_names(ag) == with_complements(["1", "2", "6"])
+
+
+def test_neighborhood_bp(tmp_path):
+    filename = write_chain_gfa(tmp_path)
+    # Nodes adjacent to 3 are always included. Node 1 is 5 bp away from 3
+    # (node 2 is between them), and node 5 is 20 bp away from 3.
+    for radius, names in (
+        (0, ["2", "3", "4"]),
+        (4, ["2", "3", "4"]),
+        (5, ["1", "2", "3", "4"]),
+        (20, ["1", "2", "3", "4", "5"]),
+    ):
+        ag = AssemblyGraph(
+            filename,
+            neighborhood=["3"],
+            neighborhood_radius=radius,
+            neighborhood_units="bp",
+        )
+        assert get_names(ag) == with_complements(names)
+
+    # The length of a long node is counted when going through it
+    ag = AssemblyGraph(
+        filename,
+        neighborhood=["2"],
+        neighborhood_radius=99,
+        neighborhood_units="bp",
+    )
+    assert get_names(ag) == with_complements(["1", "2", "3"])
+
+
+def test_neighborhood_then_select(tmp_path):
+    filename = write_chain_gfa(tmp_path)
+    ag = AssemblyGraph(
+        filename,
+        neighborhood=["1", "6"],
+        neighborhood_radius=1,
+        top_components=1,
+    )
+    assert get_names(ag) in (
+        set(["1", "2"]),
+        set(["-1", "-2"]),
+    )
+    assert ag.num_unselected_components == 3
+
+
+def test_neighborhood_missing_node(tmp_path):
+    filename = write_chain_gfa(tmp_path)
+    with pytest.raises(ValueError) as e:
+        AssemblyGraph(filename, neighborhood=["3", "7"])
+    assert "Can't find node(s) 7 in the graph." == str(e.value)
@@ -1,3 +1,8 @@
+import base64
+import gzip
+import io
+import json
+import pytest
 from metagenomescope.graph_objects import AssemblyGraph
 
 
@@ -7,3 +12,111 @@ def test_to_dict_simple():
 
     data = ag.to_dict()
     assert type(data) == dict
+
+
+def test_write_json_matches_to_dict():
+    ag = AssemblyGraph(
+        "metagenomescope/tests/input/sample1.gfa", max_node_count=2
+    )
+    ag.process()
+    json_file = io.StringIO()
+    ag.write_json(json_file)
+    written = json.loads(json_file.getvalue())
+    assert written == json.loads(json.dumps(ag.to_dict()))
+    # The placeholders for too-large components should come first
+    assert written["components"][0] == {"skipped": True}
+
+
+def test_write_data_chunks(tmp_path):
+    ag = AssemblyGraph(
+        "metagenomescope/tests/input/sample1.gfa", max_node_count=2
+    )
+    ag.process()
+    full = json.loads(json.dumps(ag.to_dict()))
+    index = ag.write_data_chunks(str(tmp_path), chunk_size=1)
+    # With a chunk size of 1, each laid-out component gets its own chunk
+    laid_out = [c for c in full["components"] if not c["skipped"]]
+    assert len(index["chunk_files"]) == len(laid_out)
+    assert index["node_attrs"] == full["node_attrs"]
+
+    chunks = []
+    for chunk_path in index["chunk_files"]:
+        with open(str(tmp_path / chunk_path), "r") as chunk_file:
+            text = chunk_file.read()
+        assert text.startswith("define(") and text.endswith(");\n")
+        chunks.append(json.loads(text[len("define(") : -len(");\n")]))
+
+    name_pos = full["node_attrs"]["name"]
+    for i, cmp in enumerate(index["components"]):
+        if full["components"][i]["skipped"]:
+            assert cmp == {"skipped": True}
+        else:
+            cmp_data = chunks[cmp["chunk"]][str(i + 1)]
+            assert cmp_data == full["components"][i]
+            assert cmp["bb"] == cmp_data["bb"]
+            assert cmp["num_nodes"] == len(cmp_data["nodes"])
+            assert cmp["node_names"] == sorted(
+                set(n[name_pos] for n in cmp_data["nodes"].values())
+            )
+
+    # With a huge chunk size, everything should go in one chunk
+    index = ag.write_data_chunks(str(tmp_path), chunk_size=1000000000)
+    assert index["chunk_files"] == ["data/chunk1.js"]
+
+
+def test_write_data_chunks_columnar(tmp_path):
+    ag = AssemblyGraph("metagenomescope/tests/input/sample1.gfa")
+    ag.process()
+    index = ag.write_data_chunks(str(tmp_path), data_format="columnar")
+    with open(str(tmp_path / index["chunk_files"][0]), "r") as chunk_file:
+        text = chunk_file.read()
+    chunk = json.loads(text[len("define(") : -len(");\n")])
+    assert all(cmp["columnar"] for cmp in chunk.values())
+
+    with pytest.raises(ValueError) as ei:
+        ag.write_data_chunks(str(tmp_path), data_format="xml")
+    assert "Unrecognized data format: xml" in str(ei.value)
+
+
+def test_to_dict_output_precision():
+    ag = AssemblyGraph(
+        "metagenomescope/tests/input/sample1.gfa", output_precision=0
+    )
+    ag.process()
+    data = ag.to_dict()
+    for cmp in data["components"]:
+        assert all(v == round(v) for v in cmp["bb"])
+        for node_data in cmp["nodes"].values():
+            for attr in ("x", "y", "width", "height"):
+                val = node_data[data["node_attrs"][attr]]
+                assert val == round(val)
+        for edges_from_src in cmp["edges"].values():
+            for edge_data in edges_from_src.values():
+                coords = edge_data[data["edge_attrs"]["ctrl_pt_coords"]]
+                assert all(v == round(v) for v in coords)
+        for patt_data in cmp["patts"]:
+            for attr in ("left", "bottom", "right", "top"):
+                val = patt_data[data["patt_attrs"][attr]]
+                assert val == round(val)
+
+
+def test_write_data_chunks_compressed(tmp_path):
+    ag = AssemblyGraph("metagenomescope/tests/input/sample1.gfa")
+    ag.process()
+    plain_dir = tmp_path / "plain"
+    gzip_dir = tmp_path / "gzip"
+    plain_index = ag.write_data_chunks(str(plain_dir))
+    gzip_index = ag.write_data_chunks(str(gzip_dir), compress=True)
+    assert plain_index == gzip_index
+
+    for chunk_path in plain_index["chunk_files"]:
+        with open(str(plain_dir / chunk_path), "r") as chunk_file:
+            plain_text = chunk_file.read()
+        with open(str(gzip_dir / chunk_path), "r") as chunk_file:
+            gzip_text = chunk_file.read()
+        gzip_chunk = json.loads(gzip_text[len("define(") : -len(");\n")])
+        assert list(gzip_chunk.keys()) == ["gzip"]
+        decompressed = gzip.decompress(base64.b64decode(gzip_chunk["gzip"]))
+        assert json.loads(decompressed) == json.loads(
+            plain_text[len("define(") : -len(");\n")]
+        )
@@ -77,3 +77,65 @@ def test_create_output_dir():
         # the actual error message includes some extra text (e.g. "[Errno 17]")
         # so we get around this by just checking part of the message looks ok
         assert "File exists: '{}'".format(tmpdir) in str(e.value)
+
+
+def test_validate_dot_processes():
+    with pytest.raises(ValueError) as e:
+        arg_utils.validate_dot_processes(-1)
+    assert "Number of dot processes must be at least 0" == str(e.value)
+
+    arg_utils.validate_dot_processes(0)
+    arg_utils.validate_dot_processes(4)
+
+
+def test_validate_output_precision():
+    with pytest.raises(ValueError) as e:
+        arg_utils.validate_output_precision(-1)
+    assert "Output precision must be at least 0" == str(e.value)
+
+    arg_utils.validate_output_precision(0)
+    arg_utils.validate_output_precision(3)
+
+
+def test_validate_workers():
+    with pytest.raises(ValueError) as e:
+        arg_utils.validate_workers(0)
+    assert "Number of workers must be at least 1" == str(e.value)
+
+    arg_utils.validate_workers(None)
+    arg_utils.validate_workers(1)
+    arg_utils.validate_workers(8)
+
+
+def test_validate_resume():
+    with pytest.raises(ValueError) as e:
+        arg_utils.validate_resume(True, None)
+    assert "--resume requires a work directory (-wd)" == str(e.value)
+
+    arg_utils.validate_resume(False, None)
+    arg_utils.validate_resume(True, "wd")
+
+
+def test_validate_top_components():
+    arg_utils.validate_top_components(None)
+    arg_utils.validate_top_components(1)
+    with pytest.raises(ValueError) as e:
+        arg_utils.validate_top_components(0)
+    assert "Number of top components must be at least 1" == str(e.value)
+
+
+def test_parse_node_names():
+    assert arg_utils.parse_node_names(None) is None
+    assert arg_utils.parse_node_names("40") == ["40"]
+    assert arg_utils.parse_node_names(" 40, -40,,51 ") == ["40", "-40", "51"]
+    with pytest.raises(ValueError) as e:
+        arg_utils.parse_node_names(" , ")
+    assert "No node names given" == str(e.value)
+
+
+def test_validate_neighborhood_radius():
+    arg_utils.validate_neighborhood_radius(0)
+    arg_utils.validate_neighborhood_radius(5)
+    with pytest.raises(ValueError) as e:
+        arg_utils.validate_neighborhood_radius(-1)
+    assert "Neighborhood radius must be at least 0" == str(e.value)
@@ -0,0 +1,104 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+import os
+import pytest
+from metagenomescope import batch, config
+
+
+def write_manifest(tmp_path, text):
+    manifest = tmp_path / "manifest.tsv"
+    manifest.write_text(text)
+    return str(manifest)
+
+
+def test_read_manifest(tmp_path):
+    manifest = write_manifest(
+        tmp_path, "# comment\na.gfa\tout/a\n\n  b.gfa\tout b \n"
+    )
+    assert batch.read_manifest(manifest) == [
+        ("a.gfa", "out/a"),
+        ("b.gfa", "out b"),
+    ]
+
+
+def test_read_manifest_errors(tmp_path):
+    manifest = write_manifest(tmp_path, "a.gfa\tout/a\nb.gfa out/b\n")
+    with pytest.raises(ValueError) as ei:
+        batch.read_manifest(manifest)
+    assert "Line 2 of the manifest file" in str(ei.value)
+
+    manifest = write_manifest(tmp_path, "a.gfa\tout/a\nb.gfa\tout/./a\n")
+    with pytest.raises(ValueError) as ei:
+        batch.read_manifest(manifest)
+    err = str(ei.value)
+    assert "Output directory out/./a is listed multiple times" in err
+
+    manifest = write_manifest(tmp_path, "# nothing here\n\n")
+    with pytest.raises(ValueError) as ei:
+        batch.read_manifest(manifest)
+    assert "The manifest file doesn't list any graphs." == str(ei.value)
+
+
+def test_run_batch(tmp_path):
+    good_dir = str(tmp_path / "out" / "good")
+    good_dir_2 = str(tmp_path / "out" / "good2")
+    bad_dir = str(tmp_path / "out" / "bad")
+    pairs = [
+        ("metagenomescope/tests/input/sample1.gfa", good_dir),
+        ("metagenomescope/tests/input/loop.gfa", good_dir_2),
+        ("metagenomescope/tests/input/nonexistent.gfa", bad_dir),
+    ]
+    results = batch.run_batch(
+        pairs,
+        1,
+        assume_oriented=False,
+        max_node_count=config.MAXN_DEFAULT,
+        max_edge_count=config.MAXE_DEFAULT,
+        dot_processes=0,
+        layout_time_budget=None,
+        oversized_components="skip",
+        data_format="json",
+        output_precision=2,
+        compress_data=False,
+    )
+    assert [r["output_dir"] for r in results] == [
+        good_dir,
+        good_dir_2,
+        bad_dir,
+    ]
+    assert results[0]["error"] is None
+    assert results[1]["error"] is None
+    assert results[2]["error"].startswith("FileNotFoundError")
+    assert not os.path.exists(bad_dir)
+
+    # Static files should be hardlinked to the same (now removed) shared
+    # copy; files filled in for each graph should be separate copies.
+    def get_inode(*path_parts):
+        return os.stat(os.path.join(*path_parts)).st_ino
+
+    assert get_inode(good_dir, "js", "drawer.js") == get_inode(
+        good_dir_2, "js", "drawer.js"
+    )
+    assert get_inode(good_dir, "main.js") != get_inode(good_dir_2, "main.js")
+    assert os.path.exists(os.path.join(good_dir, "data", "chunk1.js"))
+    # The shared copy should've been removed
+    assert sorted(os.listdir(str(tmp_path / "out"))) == ["good", "good2"]
+
+    # If any of the output directories already exist, nothing should be done
+    with pytest.raises(FileExistsError):
+        batch.run_batch(pairs, 1)
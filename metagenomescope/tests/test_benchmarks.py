@@ -0,0 +1,126 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+import filecmp
+import os
+import pytest
+from metagenomescope import assembly_graph_parser
+from metagenomescope.benchmarks import generator, harness
+from metagenomescope.graph_objects import AssemblyGraph
+
+
+@pytest.mark.parametrize("mix", list(generator.STRUCTURE_MIXES))
+def test_generated_graphs_parse(tmp_path, mix):
+    graph = generator.generate_graph(300, mix=mix, seed=3)
+    num_nodes = len(graph.lengths)
+    num_edges = len(graph.edges)
+    assert 300 <= num_nodes < 400
+    for ext, nodes_per_node in (
+        ("gfa", 2),
+        ("LastGraph", 2),
+        ("fastg", 2),
+        # MetaCarvel graphs don't include reverse complements
+        ("gml", 1),
+    ):
+        filename = str(tmp_path / "graph.{}".format(ext))
+        generator.write_graph(graph, filename)
+        digraph = assembly_graph_parser.parse(filename)
+        assert len(digraph) == nodes_per_node * num_nodes
+        assert len(digraph.edges) == nodes_per_node * num_edges
+
+
+def test_generator_is_deterministic(tmp_path):
+    for i, seed in enumerate((5, 5, 6)):
+        graph = generator.generate_graph(200, seed=seed)
+        generator.write_graph(graph, str(tmp_path / "{}.gfa".format(i)))
+    assert filecmp.cmp(str(tmp_path / "0.gfa"), str(tmp_path / "1.gfa"))
+    assert not filecmp.cmp(str(tmp_path / "0.gfa"), str(tmp_path / "2.gfa"))
+
+
+def test_generated_structures(tmp_path):
+    for mix, attr in (("chains", "chains"), ("bubbles", "bubbles")):
+        filename = str(tmp_path / "{}.gfa".format(mix))
+        generator.write_graph(generator.generate_graph(200, mix=mix), filename)
+        ag = AssemblyGraph(filename)
+        ag.hierarchically_identify_patterns()
+        assert len(getattr(ag, attr)) > 0
+
+    # Each tiny motif is its own component
+    graph = generator.generate_graph(100, mix="tiny")
+    assert graph.num_components >= 100 / 3
+
+
+def test_get_mix():
+    assert generator.get_mix("chains") == {"chain": 1}
+    assert generator.get_mix({"bubble": 2}) == {"bubble": 2}
+    with pytest.raises(ValueError) as e:
+        generator.get_mix("spaghetti")
+    assert "Unrecognized structure mix: spaghetti" in str(e.value)
+    with pytest.raises(ValueError) as e:
+        generator.get_mix({"spaghetti": 1})
+    assert "Unrecognized motif type: spaghetti" == str(e.value)
+    with pytest.raises(ValueError) as e:
+        generator.get_mix({"chain": 0})
+    assert "At least one motif fraction must be positive" == str(e.value)
+
+
+def test_run_benchmarks(tmp_path):
+    graph_dir = str(tmp_path / "graphs")
+    history_file = str(tmp_path / "history.jsonl")
+    records = harness.run_benchmarks(
+        [100],
+        ["gfa", "lastgraph"],
+        ["mixed"],
+        graph_dir=graph_dir,
+        history_file=history_file,
+        max_node_count=50,
+    )
+    assert len(records) == 2
+    assert sorted(os.listdir(graph_dir)) == [
+        "synthetic_mixed_100_seed0.LastGraph",
+        "synthetic_mixed_100_seed0.gfa",
+    ]
+    for record in records:
+        assert record["error"] is None
+        assert record["options"] == {"max_node_count": 50}
+        assert list(record["times"]) == [
+            "parse",
+            "decomposition",
+            "layout",
+            "serialization",
+        ]
+        for times in record["times"].values():
+            assert times["wall_seconds"] >= 0
+
+    # Running again should append to the history, and reuse the graphs
+    gfa_file = os.path.join(graph_dir, "synthetic_mixed_100_seed0.gfa")
+    mtime = os.path.getmtime(gfa_file)
+    harness.run_benchmarks(
+        [100],
+        ["gfa"],
+        ["mixed"],
+        graph_dir=graph_dir,
+        history_file=history_file,
+    )
+    history = harness.read_history(history_file)
+    assert [r["case"]["filetype"] for r in history] == [
+        "gfa",
+        "lastgraph",
+        "gfa",
+    ]
+    assert os.path.getmtime(gfa_file) == mtime
+    assert history[2]["options"] == {}
@@ -0,0 +1,122 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+import json
+import os
+import pytest
+from metagenomescope import checkpoint_utils, config
+from metagenomescope.graph_objects import AssemblyGraph
+
+INPUT = "metagenomescope/tests/input/sample1.gfa"
+
+
+class FailingEngine(object):
+    """Layout engine that fails if anything actually needs to be laid out."""
+
+    prog = "dot"
+
+    def layout_many(self, gv_inputs, timeout=None):
+        raise RuntimeError("Tried to lay something out.")
+
+    def layout(self, gv_input, timeout=None):
+        raise RuntimeError("Tried to lay something out.")
+
+    def close(self):
+        pass
+
+
+def test_layout_cache(tmp_path):
+    path = str(tmp_path / "layouts.pickle")
+    cache = checkpoint_utils.LayoutCache(path)
+    assert len(cache) == 0
+    assert cache.get(b"a") is None
+    cache.add(b"a", ("0,0,1,1", {0: "1,2"}, {}))
+    cache.add(b"b", ("0,0,2,2", {}, {(0, 1): "1,2 3,4"}))
+    cache.close()
+
+    # Simulate a crash in the middle of writing another record
+    with open(path, "ab") as f:
+        f.write(b"\x80\x05\x95garbage")
+
+    cache = checkpoint_utils.LayoutCache(path)
+    assert len(cache) == 2
+    assert cache.get(b"a") == ("0,0,1,1", {0: "1,2"}, {})
+    # The partial record should be gone, so new records can be read back
+    cache.add(b"c", ("0,0,3,3", {}, {}))
+    cache.close()
+    cache = checkpoint_utils.LayoutCache(path)
+    assert len(cache) == 3
+    assert cache.get(b"c") == ("0,0,3,3", {}, {})
+    cache.close()
+
+
+def test_get_layout_key():
+    key = checkpoint_utils.get_layout_key("dot", "digraph {}")
+    assert key == checkpoint_utils.get_layout_key("dot", "digraph {}")
+    assert key != checkpoint_utils.get_layout_key("sfdp", "digraph {}")
+    assert key != checkpoint_utils.get_layout_key("dot", "digraph { }")
+
+
+def test_load_graph_settings(tmp_path):
+    wd = str(tmp_path)
+    settings = checkpoint_utils.get_settings(INPUT, max_node_count=5)
+    assert settings["input_file"] == os.path.abspath(INPUT)
+    assert checkpoint_utils.load_graph(wd, settings) is None
+
+    checkpoint_utils.save_settings(wd, settings)
+    checkpoint_utils.save_graph(AssemblyGraph(INPUT), wd)
+    ag = checkpoint_utils.load_graph(wd, settings)
+    assert ag.completed_stages == ["parsed"]
+
+    other_settings = checkpoint_utils.get_settings(INPUT, max_node_count=6)
+    with pytest.raises(ValueError) as errorinfo:
+        checkpoint_utils.load_graph(wd, other_settings)
+    assert "differences: max_node_count" in str(errorinfo.value)
+
+    checkpoint_utils.clear_checkpoints(wd)
+    assert os.listdir(wd) == []
+
+
+def test_process_resume(tmp_path):
+    wd = str(tmp_path)
+    ag = AssemblyGraph(INPUT)
+    ag.process(work_dir=wd)
+    assert ag.completed_stages == ["parsed", "decomposed", "laid_out"]
+    expected = json.loads(json.dumps(ag.to_dict()))
+    assert os.path.exists(os.path.join(wd, config.CHECKPOINT_GRAPH_FILE))
+
+    # Resuming from the final checkpoint shouldn't redo anything
+    settings = checkpoint_utils.get_settings(INPUT)
+    checkpoint_utils.save_settings(wd, settings)
+    ag = checkpoint_utils.load_graph(wd, settings)
+    ag.layout_engine = FailingEngine()
+    ag.process(work_dir=wd)
+    assert json.loads(json.dumps(ag.to_dict())) == expected
+
+    # Starting layout over from scratch (as if we crashed in the middle of
+    # layout) should just reuse the layouts saved in the work directory
+    ag = AssemblyGraph(INPUT)
+    ag.layout_engine = FailingEngine()
+    ag.process(work_dir=wd)
+    assert json.loads(json.dumps(ag.to_dict())) == expected
+
+    # ... and without these layouts, we'd actually have to do layout
+    os.remove(os.path.join(wd, config.CHECKPOINT_LAYOUTS_FILE))
+    ag = AssemblyGraph(INPUT)
+    ag.layout_engine = FailingEngine()
+    with pytest.raises(RuntimeError):
+        ag.process(work_dir=wd)
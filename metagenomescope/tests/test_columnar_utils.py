@@ -0,0 +1,121 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+import base64
+import numpy
+from metagenomescope import columnar_utils
+from metagenomescope.graph_objects import AssemblyGraph
+
+
+def decode(col):
+    """Python version of DataHolder.decodeColumn() in the JS code."""
+    if col["type"] == "list":
+        return col["data"]
+    arr = numpy.frombuffer(
+        base64.b64decode(col["data"]), dtype="<" + col["type"][-2:]
+    )
+    if col["type"] == "u1":
+        return [bool(v) for v in arr]
+    elif col["type"] == "i4":
+        return [
+            None if v == columnar_utils.INT32_NULL else int(v) for v in arr
+        ]
+    elif col["type"] == "ragged_f4":
+        offsets = numpy.frombuffer(
+            base64.b64decode(col["offsets"]), dtype="<i4"
+        )
+        return [
+            list(arr[offsets[i] : offsets[i + 1]])
+            for i in range(len(offsets) - 1)
+        ]
+    else:
+        return [None if numpy.isnan(v) else float(v) for v in arr]
+
+
+def test_encode_column_types():
+    col = columnar_utils.encode_column([True, False, True])
+    assert col["type"] == "u1"
+    assert decode(col) == [True, False, True]
+
+    col = columnar_utils.encode_column([1, None, -5])
+    assert col["type"] == "i4"
+    assert decode(col) == [1, None, -5]
+
+    col = columnar_utils.encode_column([1, 2.5, None])
+    assert col["type"] == "f8"
+    assert decode(col) == [1, 2.5, None]
+
+    col = columnar_utils.encode_column([1.1, 2.5], float32=True)
+    assert col["type"] == "f4"
+    assert decode(col) == [numpy.float32(1.1), 2.5]
+
+    # Ints that don't fit in an int32 should be stored as floats
+    big = columnar_utils.INT32_MAX + 1
+    col = columnar_utils.encode_column([big, 3])
+    assert col["type"] == "f8"
+    assert decode(col) == [big, 3]
+
+    for vals in (["a", "b"], ["+", None], [True, None], [1, "a"], [None]):
+        col = columnar_utils.encode_column(vals)
+        assert col == {"type": "list", "data": vals}
+
+
+def test_encode_ragged_column():
+    col = columnar_utils.encode_ragged_column([[1, 2, 3, 4], [], [5.5, 6]])
+    assert col["type"] == "ragged_f4"
+    assert decode(col) == [[1, 2, 3, 4], [], [5.5, 6]]
+
+
+def test_encode_component():
+    ag = AssemblyGraph("metagenomescope/tests/input/sample1.gfa")
+    ag.process()
+    data = ag.to_dict()
+    for cmp in data["components"]:
+        enc = columnar_utils.encode_component(
+            cmp, data["node_attrs"], data["edge_attrs"], data["patt_attrs"]
+        )
+        assert enc["columnar"]
+        assert enc["bb"] == cmp["bb"]
+
+        node_cols = [decode(col) for col in enc["nodes"]["cols"]]
+        node_ids = decode(enc["nodes"]["ids"])
+        assert sorted(node_ids) == sorted(cmp["nodes"].keys())
+        for i, node_id in enumerate(node_ids):
+            for col, orig_val in zip(node_cols, cmp["nodes"][node_id]):
+                if type(orig_val) is float:
+                    assert numpy.isclose(col[i], orig_val)
+                else:
+                    assert col[i] == orig_val
+
+        edge_cols = [decode(col) for col in enc["edges"]["cols"]]
+        srcs = decode(enc["edges"]["src"])
+        tgts = decode(enc["edges"]["tgt"])
+        assert enc["edges"]["count"] == len(srcs)
+        ctrl_pt_pos = data["edge_attrs"]["ctrl_pt_coords"]
+        for i, (src, tgt) in enumerate(zip(srcs, tgts)):
+            orig = cmp["edges"][src][tgt]
+            assert numpy.allclose(
+                edge_cols[ctrl_pt_pos][i], orig[ctrl_pt_pos], atol=0.01
+            )
+
+        assert enc["patts"]["count"] == len(cmp["patts"])
+        pattern_ids = decode(
+            enc["patts"]["cols"][data["patt_attrs"]["pattern_id"]]
+        )
+        assert pattern_ids == [
+            p[data["patt_attrs"]["pattern_id"]] for p in cmp["patts"]
+        ]
@@ -89,3 +89,12 @@ def test_negate_node_id():
     assert input_node_utils.negate_node_id("-contig_id_123") == "contig_id_123"
     assert input_node_utils.negate_node_id("abcdef") == "-abcdef"
     assert input_node_utils.negate_node_id("-abcdef") == "abcdef"
+
+
+def test_negate_fastg_node_id():
+    assert input_node_utils.negate_fastg_node_id("1+") == "1-"
+    assert input_node_utils.negate_fastg_node_id("1-") == "1+"
+    assert input_node_utils.negate_fastg_node_id("contig_2-") == "contig_2+"
+    with pytest.raises(ValueError) as ei:
+        input_node_utils.negate_fastg_node_id("1")
+    assert "Node ID 1 doesn't end with + or -" in str(ei.value)
@@ -0,0 +1,93 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+import numpy
+from metagenomescope import layered_layout
+
+
+def _layout(widths, heights, edges):
+    sources = numpy.array([e[0] for e in edges], dtype=numpy.int64)
+    targets = numpy.array([e[1] for e in edges], dtype=numpy.int64)
+    return layered_layout.layered_layout(
+        numpy.array(widths, dtype=numpy.float64),
+        numpy.array(heights, dtype=numpy.float64),
+        sources,
+        targets,
+    )
+
+
+def test_break_cycles():
+    # 0 -> 1 -> 2 -> 0, and 3 -> 1
+    positions = layered_layout.break_cycles(
+        4, numpy.array([0, 1, 2, 3]), numpy.array([1, 2, 0, 1])
+    )
+    # 3 is the only node without incoming edges, so it should come first
+    assert positions[3] == 0
+    assert sorted(positions.tolist()) == [0, 1, 2, 3]
+    # Exactly one edge in the cycle should go backwards
+    backwards = [
+        positions[s] > positions[t] for s, t in ((0, 1), (1, 2), (2, 0))
+    ]
+    assert sum(backwards) == 1
+
+
+def test_assign_ranks_longest_path():
+    # 0 -> 1 -> 2, and 0 -> 2: 2 should be on rank 2, not rank 1
+    sources = numpy.array([0, 1, 0])
+    targets = numpy.array([1, 2, 2])
+    positions = numpy.array([0, 1, 2])
+    ranks = layered_layout.assign_ranks(3, positions, sources, targets)
+    assert ranks.tolist() == [0, 1, 2]
+
+
+def test_layered_layout_simple():
+    # 0 -> 1, 0 -> 2, 1 -> 3, 2 -> 3: a bubble
+    bb_width, bb_height, x, y = _layout(
+        [0.75] * 4, [0.5] * 4, [(0, 1), (0, 2), (1, 3), (2, 3)]
+    )
+    # Two ranks of nodes 0.75 in (54 pt) wide, separated by 18 pt
+    assert bb_width == 54 + 18 + 54
+    # Three ranks of nodes 0.5 in (36 pt) high, separated by 36 pt
+    assert bb_height == (36 * 3) + (36 * 2)
+    assert y.tolist() == [162, 90, 90, 18]
+    # Nodes 0 and 3 are alone on their ranks, so they should be centered
+    assert x[0] == x[3] == bb_width / 2
+    assert sorted([x[1], x[2]]) == [27, 27 + 54 + 18]
+
+
+def test_layered_layout_cycle_and_loop():
+    bb_width, bb_height, x, y = _layout(
+        [1, 1, 1], [1, 1, 1], [(0, 1), (1, 2), (2, 0), (1, 1)]
+    )
+    # The cycle gets broken, so each node should end up on its own rank
+    assert sorted(y.tolist()) == [36, 36 + 72 + 36, 36 + (2 * (72 + 36))]
+    assert x.tolist() == [36, 36, 36]
+    assert bb_width == 72
+
+
+def test_get_edge_ctrl_pts():
+    x = numpy.array([50.0, 50.0])
+    y = numpy.array([100.0, 10.0])
+    heights = numpy.array([0.5, 0.25])
+    pts = layered_layout.get_edge_ctrl_pts(
+        x, y, heights, numpy.array([0, 1]), numpy.array([1, 1])
+    )
+    # Normal edge: a straight line from the bottom of node 0 (y = 100 - 18)
+    # to the top of node 1 (y = 10 + 9)
+    assert pts[0].tolist() == [50, 82, 50, 61, 50, 40, 50, 19]
+    # Loop on node 1: goes out to the right of the node and back
+    assert pts[1].tolist() == [50, 1, 68, 1, 68, 19, 50, 19]
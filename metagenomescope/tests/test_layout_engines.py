@@ -0,0 +1,170 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+import os
+import shutil
+import stat
+import time
+import pytest
+from metagenomescope import checkpoint_utils, layout_engines, layout_utils
+
+GV_INPUTS = [
+    layout_utils.get_gv_header() + "\t0 -> 1;\n\t1 -> 2;\n\t0 -> 2;\n}",
+    layout_utils.get_gv_header() + "\t3 -> 4;\n}",
+    layout_utils.get_gv_header() + "\t5 [height=2,width=3];\n}",
+]
+
+
+def test_get_layout_engine():
+    assert isinstance(
+        layout_engines.get_layout_engine(0), layout_engines.PygraphvizEngine
+    )
+    engine = layout_engines.get_layout_engine(3)
+    assert isinstance(engine, layout_engines.DotProcessPoolEngine)
+    assert engine.num_processes == 3
+
+    # PyGraphviz can't be interrupted, so we should use a dot process instead
+    engine = layout_engines.get_layout_engine(0, "sfdp", interruptible=True)
+    assert isinstance(engine, layout_engines.DotProcessPoolEngine)
+    assert engine.num_processes == 1
+    assert engine.prog == "sfdp"
+
+
+def test_get_timeout():
+    assert layout_engines.get_timeout(None) is None
+    assert 0 < layout_engines.get_timeout(time.monotonic() + 100) <= 100
+    with pytest.raises(layout_engines.LayoutTimeoutError):
+        layout_engines.get_timeout(time.monotonic() - 1)
+
+
+def test_layered_engine():
+    assert isinstance(
+        layout_engines.get_layout_engine(4, "layered"),
+        layout_engines.LayeredEngine,
+    )
+    engine = layout_engines.LayeredEngine()
+    results = engine.layout_many(GV_INPUTS)
+    bb, node_pos, edge_pos = results[0]
+    # 0 -> 1 -> 2 and 0 -> 2: three ranks, each with one default-sized node
+    assert bb == "0,0,54.00,180.00"
+    assert node_pos == {0: "27.00,162.00", 1: "27.00,90.00", 2: "27.00,18.00"}
+    assert (
+        edge_pos[(0, 1)]
+        == "27.00,144.00 27.00,132.00 27.00,120.00 27.00,108.00"
+    )
+    assert set(edge_pos.keys()) == {(0, 1), (1, 2), (0, 2)}
+    # Control points should be usable like those produced by dot
+    assert len(layout_utils.get_control_points(edge_pos[(0, 2)])) == 8
+    assert results[2] == ("0,0,216.00,144.00", {5: "108.00,72.00"}, {})
+    assert engine.layout(layout_utils.get_gv_header() + "}") == (
+        "0,0,0,0",
+        {},
+        {},
+    )
+
+
+def test_pool_engine_needs_processes():
+    with pytest.raises(ValueError) as e:
+        layout_engines.DotProcessPoolEngine(0)
+    assert "Need at least 1 process to lay out graphs." == str(e.value)
+
+
+def test_pygraphviz_engine():
+    engine = layout_engines.PygraphvizEngine()
+    results = engine.layout_many(GV_INPUTS)
+    assert len(results) == 3
+    bb, node_pos, edge_pos = results[0]
+    assert bb.startswith("0,0,")
+    assert set(node_pos.keys()) == {0, 1, 2}
+    assert set(edge_pos.keys()) == {(0, 1), (1, 2), (0, 2)}
+    assert set(results[2][1].keys()) == {5}
+    assert results[2][2] == {}
+
+    with pytest.raises(ValueError) as e:
+        engine.layout(GV_INPUTS[0], timeout=5)
+    assert "PygraphvizEngine doesn't support timeouts." == str(e.value)
+
+
+@pytest.mark.skipif(shutil.which("dot") is None, reason="dot not on PATH")
+def test_pool_engine_matches_pygraphviz():
+    expected = layout_engines.PygraphvizEngine().layout_many(GV_INPUTS)
+    engine = layout_engines.DotProcessPoolEngine(2)
+    try:
+        # Submit enough graphs that the queue fills up
+        assert engine.layout_many(GV_INPUTS * 3) == expected * 3
+        assert engine.layout_many([]) == []
+    finally:
+        engine.close()
+    # The engine should still work after being closed
+    try:
+        assert engine.layout(GV_INPUTS[1]) == expected[1]
+    finally:
+        engine.close()
+
+
+def test_pool_engine_missing_program():
+    engine = layout_engines.DotProcessPoolEngine(1, prog="not-a-real-dot")
+    try:
+        with pytest.raises(FileNotFoundError) as e:
+            engine.layout(GV_INPUTS[0])
+        assert "Couldn't find the Graphviz program not-a-real-dot" in str(
+            e.value
+        )
+    finally:
+        engine.close()
+
+
+def test_pool_engine_timeout(tmp_path):
+    # A "layout program" that never writes anything out
+    prog = os.path.join(str(tmp_path), "slowdot")
+    with open(prog, "w") as f:
+        f.write("#!/bin/sh\nexec sleep 60\n")
+    os.chmod(prog, os.stat(prog).st_mode | stat.S_IXUSR)
+
+    engine = layout_engines.DotProcessPoolEngine(2, prog=prog)
+    try:
+        start = time.monotonic()
+        with pytest.raises(layout_engines.LayoutTimeoutError):
+            engine.layout_many(GV_INPUTS, timeout=0.5)
+        assert time.monotonic() - start < 30
+        # The processes should've been killed
+        assert engine.procs == []
+    finally:
+        engine.close()
+
+
+def test_caching_engine(tmp_path):
+    calls = []
+
+    class CountingEngine(layout_engines.LayeredEngine):
+        def layout_many(self, gv_inputs, timeout=None):
+            calls.append(len(gv_inputs))
+            return super().layout_many(gv_inputs, timeout)
+
+    expected = layout_engines.LayeredEngine().layout_many(GV_INPUTS)
+    cache = checkpoint_utils.LayoutCache(str(tmp_path / "layouts.pickle"))
+    engine = layout_engines.CachingEngine(CountingEngine(), cache)
+    assert engine.prog == "layered"
+    assert engine.layout_many(GV_INPUTS[:2]) == expected[:2]
+    assert calls == [2]
+    # Only the layout that isn't in the cache yet should be computed
+    assert engine.layout_many(GV_INPUTS) == expected
+    assert calls == [2, 1]
+    assert engine.layout(GV_INPUTS[1]) == expected[1]
+    assert calls == [2, 1]
+    engine.close()
+    cache.close()
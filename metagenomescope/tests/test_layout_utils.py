@@ -15,6 +15,7 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+import numpy
 import pytest
 from metagenomescope import layout_utils
 
@@ -41,6 +42,20 @@ def test_shift_control_points_odd():
         layout_utils.shift_control_points([1, 2, 3], 10, 100)
 
 
+def test_mirror_ctrl_pt_coords():
+    assert layout_utils.mirror_ctrl_pt_coords([1, 2, 3, 4, 5, 6], 10) == [
+        5,
+        4,
+        3,
+        6,
+        1,
+        8,
+    ]
+    assert layout_utils.mirror_ctrl_pt_coords([], 10) == []
+    with pytest.raises(ValueError):
+        layout_utils.mirror_ctrl_pt_coords([1, 2, 3], 10)
+
+
 def test_getxy():
     assert layout_utils.getxy("5,-2") == (5, -2)
     assert layout_utils.getxy("123.456,789.012") == (123.456, 789.012)
@@ -68,3 +83,107 @@ def test_getxy():
 
     with pytest.raises(ValueError):
         layout_utils.getxy("one, two")
+
+
+def test_parse_dot_layout():
+    dot_output = (
+        "digraph thing {\n"
+        '\tgraph [bb="0,0,54,108"];\n'
+        '\tnode [label="\\N"];\n'
+        '\t0 [height=0.5, pos="27,90", width=0.75];\n'
+        '\t1 [height=0.5,\n\t\tpos="27,18",\n\t\twidth=0.75];\n'
+        '\t0:s -> 1:n [pos="e,27,36.104 27,71.697 27,\\\n63.983 27,54.712 '
+        '27,46.112"];\n'
+        "}\n"
+    )
+    bb, node_pos, edge_pos = layout_utils.parse_dot_layout(dot_output)
+    assert bb == "0,0,54,108"
+    assert node_pos == {0: "27,90", 1: "27,18"}
+    assert edge_pos == {
+        (0, 1): "e,27,36.104 27,71.697 27,63.983 27,54.712 27,46.112"
+    }
+
+
+def test_parse_dot_layout_no_bb():
+    with pytest.raises(ValueError) as e:
+        layout_utils.parse_dot_layout("digraph thing {\n}\n")
+    assert "No bounding box found in dot output." == str(e.value)
+
+
+def test_parse_gv_input():
+    gv_input = (
+        layout_utils.get_gv_header()
+        + "\t5 [height=1.5,width=2,shape=house];\n"
+        + "\t7 [height=0.25,width=0.5,shape=invhouse];\n"
+        + "\t5 -> 7;\n"
+        + "\t7 -> 9;\n"
+        + "}"
+    )
+    node_ids, widths, heights, sources, targets = layout_utils.parse_gv_input(
+        gv_input
+    )
+    assert node_ids == [5, 7, 9]
+    assert widths.tolist() == [2, 0.5, 0.75]
+    assert heights.tolist() == [1.5, 0.25, 0.5]
+    assert sources.tolist() == [0, 1]
+    assert targets.tolist() == [1, 2]
+
+
+def test_control_point_buffer():
+    # Use a tiny initial capacity, so that the buffer has to grow
+    buf = layout_utils.ControlPointBuffer(capacity=2)
+    assert buf.add([1, 2, 3, 4, 5, 6, 7, 8]) == 0
+    assert buf.add([10, 10]) == 1
+    assert buf.add([0.5, 1.25, -2, 3]) == 2
+    assert buf.get(0).dtype == numpy.float32
+    assert buf.get_list(0) == [1, 2, 3, 4, 5, 6, 7, 8]
+    assert buf.get_list(1) == [10, 10]
+    assert buf.get_list(2) == [0.5, 1.25, -2, 3]
+
+    buf.shift(
+        numpy.array([0, 2]), numpy.array([100, 5.3]), numpy.array([1, -2])
+    )
+    assert buf.get_list(0) == [101, 3, 103, 5, 105, 7, 107, 9]
+    assert buf.get_list(1) == [10, 10]
+    assert buf.get_list(2) == [5.8, -0.75, 3.3, 1]
+
+    assert buf.mirror(0, 10) == 3
+    assert buf.get_list(3) == layout_utils.mirror_ctrl_pt_coords(
+        [101, 3, 103, 5, 105, 7, 107, 9], 10
+    )
+
+    buf.rotate()
+    assert buf.get_list(1) == [-10, 10]
+
+    with pytest.raises(ValueError):
+        buf.add([1, 2, 3])
+
+
+def test_control_point_buffer_rounding():
+    buf = layout_utils.ControlPointBuffer()
+    buf.add([222.66, 3497.07])
+    # float32 can't represent these exactly
+    assert buf.get(0).tolist() != [222.66, 3497.07]
+    assert buf.get_list(0) == [222.66, 3497.07]
+    assert buf.get_list(0, decimals=0) == [223, 3497]
+
+
+def test_rotate_ctrl_pt_buffer():
+    coords = numpy.array([1, 2, 3, 4, -5, 0], dtype=float)
+    layout_utils.rotate_ctrl_pt_buffer(coords)
+    assert coords.tolist() == layout_utils.rotate_ctrl_pt_coords(
+        [1, 2, 3, 4, -5, 0]
+    )
+    with pytest.raises(ValueError):
+        layout_utils.rotate_ctrl_pt_buffer(numpy.array([1.0]))
+
+
+def test_control_point_buffer_rotate_start():
+    buf = layout_utils.ControlPointBuffer()
+    buf.add([1, 2])
+    buf.add([3, 4, 5, 6])
+    buf.add([7, 8])
+    buf.rotate(start=1)
+    assert buf.get_list(0) == [1, 2]
+    assert buf.get_list(1) == [-4, 3, -6, 5]
+    assert buf.get_list(2) == [-8, 7]
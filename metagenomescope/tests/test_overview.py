@@ -0,0 +1,84 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+import itertools
+import os
+import numpy
+import pytest
+from metagenomescope import overview
+
+
+def test_get_length_stats():
+    # Component 0: lengths 5, 3, 2 (total 10; 5 >= 10 / 2, so N50 is 5)
+    # Component 1: lengths 4, 4, 4, 4 (total 16; 4 + 4 >= 16 / 2)
+    # Component 2: lengths 1, 1, 10 (total 12; 10 >= 12 / 2)
+    # Component 3: length 7
+    # Component 4: lengths 3, 3, 2, 2 (total 10; 3 + 3 >= 10 / 2)
+    lengths = [3, 4, 4, 1, 2, 5, 4, 10, 4, 1, 7, 2, 3, 3, 2]
+    cc_indices = [0, 1, 1, 2, 0, 0, 1, 2, 1, 2, 3, 4, 4, 4, 4]
+    totals, n50s, longest = overview.get_length_stats(lengths, cc_indices, 5)
+    assert totals.tolist() == [10, 16, 12, 7, 10]
+    assert n50s.tolist() == [5, 4, 10, 7, 3]
+    assert longest.tolist() == [5, 1, 7, 10, 12]
+
+
+def test_pack_squares():
+    sides = numpy.array([50, 30, 30, 20, 10, 10, 10, 5, 5, 1], dtype=float)
+    xs, ys, width, height = overview.pack_squares(sides, padding=2)
+    assert xs[0] == ys[0] == 2
+    # No squares should overlap, and they should all fit in the area
+    for i, j in itertools.combinations(range(len(sides)), 2):
+        assert (
+            xs[i] + sides[i] + 2 <= xs[j]
+            or xs[j] + sides[j] + 2 <= xs[i]
+            or ys[i] + sides[i] + 2 <= ys[j]
+            or ys[j] + sides[j] + 2 <= ys[i]
+        )
+    assert numpy.all(xs + sides + 2 <= width)
+    assert numpy.all(ys + sides + 2 <= height)
+    # The area should be roughly square
+    assert 0.5 < width / height < 2
+
+
+def test_make_overview(tmp_path):
+    output_dir = str(tmp_path / "overview")
+    overview.make_overview(
+        "metagenomescope/tests/input/sample1.gfa", output_dir, False
+    )
+    with open(os.path.join(output_dir, "overview.tsv"), "r") as tf:
+        lines = [line.rstrip("\n").split("\t") for line in tf]
+    assert lines[0] == list(overview.TSV_COLUMNS)
+    # See test_component_sorting_simple() for a description of these
+    # components. Nodes 1 - 6 have lengths 8, 10, 21, 7, 8, and 4.
+    assert [line[:6] for line in lines[1:]] == [
+        ["1", "5", "4", "1", "54", "10"],
+        ["2", "5", "4", "1", "54", "10"],
+        ["3", "1", "0", "0", "4", "4"],
+        ["4", "1", "0", "0", "4", "4"],
+    ]
+    assert set(line[6] for line in lines[1:3]) == set(["3", "-3"])
+
+    with open(os.path.join(output_dir, "overview.svg"), "r") as sf:
+        svg = sf.read()
+    assert svg.count("<rect") == 4
+    assert "<title>Component 1: 5 nodes, 4 edges, 1 patterns;" in svg
+
+    # The output directory shouldn't be overwritten
+    with pytest.raises(FileExistsError):
+        overview.make_overview(
+            "metagenomescope/tests/input/sample1.gfa", output_dir, False
+        )
@@ -0,0 +1,146 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+import json
+import os
+import pstats
+import time
+from metagenomescope import config, profile_utils
+from metagenomescope.graph_objects import AssemblyGraph
+
+
+def test_disabled_profiler():
+    profiler = profile_utils.Profiler()
+    assert not profiler.enabled
+    with profiler.stage("a"):
+        pass
+    profiler.start_component(1, 100, 100)
+    profiler.stop_component()
+    assert profiler.stages == []
+    assert profiler.components == []
+
+
+def test_profiler_stages_and_components(tmp_path):
+    profiler = profile_utils.Profiler(enabled=True)
+    with profiler.stage("a"):
+        time.sleep(0.01)
+    profiler.start_component(1, 100, 200)
+    # Starting a new component should stop the previous one
+    profiler.start_component(2, 4, 3)
+    profiler.start_component(3, 1, 0)
+    profiler.stop_component()
+
+    assert len(profiler.stages) == 1
+    stage = profiler.stages[0]
+    assert stage["name"] == "a"
+    assert stage["wall_seconds"] >= 0.01
+    assert stage["peak_rss_mb"] > 0
+    assert "pstats_file" not in stage
+    assert [
+        (c["component"], c["nodes"], c["edges"]) for c in profiler.components
+    ] == [(1, 100, 200)]
+    # Components with < 5 nodes are lumped together
+    assert profiler.small_components["count"] == 2
+
+    report = profiler.write_report(str(tmp_path), "graph.gfa")
+    with open(os.path.join(str(tmp_path), config.PROFILE_REPORT_FILE)) as rf:
+        assert json.load(rf) == json.loads(json.dumps(report))
+    assert report["input_file"] == "graph.gfa"
+    assert report["stages"] == profiler.stages
+    assert os.listdir(str(tmp_path)) == [config.PROFILE_REPORT_FILE]
+
+
+def test_detailed_profiler(tmp_path):
+    profiler = profile_utils.Profiler(detailed=True)
+    assert profiler.enabled
+    ag = AssemblyGraph("metagenomescope/tests/input/sample1.gfa")
+    ag.process(profiler=profiler)
+    assert [s["name"] for s in profiler.stages] == [
+        "scale",
+        "decompose",
+        "layout",
+        "rotate",
+    ]
+    for stage in profiler.stages:
+        assert stage["traced_peak_mb"] > 0
+        assert 0 < len(stage["top_allocations"]) <= 10
+    assert profiler.decomposition_stats.passes >= 2
+    assert (
+        sum(c["nodes"] for c in profiler.components)
+        + profiler.small_components["count"]
+        > 0
+    )
+
+    profiler.write_report(str(tmp_path), "sample1.gfa")
+    stats = pstats.Stats(
+        os.path.join(
+            str(tmp_path), config.PROFILE_PSTATS_FILE.format("layout")
+        )
+    )
+    assert any(func[2] == "layout" for func in stats.stats)
+
+
+def test_decomposition_stats():
+    ag = AssemblyGraph("metagenomescope/tests/input/sample1.gfa")
+    ag.scale_nodes()
+    ag.compute_node_dimensions()
+    ag.scale_edges()
+    stats = profile_utils.DecompositionStats()
+    ag.hierarchically_identify_patterns(stats)
+
+    # Counting things shouldn't change the decomposition
+    ag2 = AssemblyGraph("metagenomescope/tests/input/sample1.gfa")
+    ag2.scale_nodes()
+    ag2.compute_node_dimensions()
+    ag2.scale_edges()
+    ag2.hierarchically_identify_patterns()
+    assert sorted(ag.decomposed_digraph.nodes) == sorted(
+        ag2.decomposed_digraph.nodes
+    )
+
+    data = stats.to_dict()
+    # The last pass is the one where nothing was found
+    assert data["passes"] >= 2
+    validators = data["validators"]
+    assert list(validators) == [
+        "is_valid_chain",
+        "is_valid_cyclic_chain",
+        "is_valid_3node_bubble",
+        "is_valid_bubble",
+        "is_valid_superbubble",
+    ]
+    assert validators["is_valid_chain"]["hits"] == len(ag.chains)
+    assert validators["is_valid_cyclic_chain"]["hits"] == len(ag.cyclic_chains)
+    assert sum(
+        validators[v]["hits"]
+        for v in (
+            "is_valid_3node_bubble",
+            "is_valid_bubble",
+            "is_valid_superbubble",
+        )
+    ) == len(ag.bubbles)
+    for counts in validators.values():
+        assert counts["calls"] >= counts["hits"]
+        assert counts["calls"] >= counts["revalidations"]
+        assert counts["revalidations"] >= counts["wasted_revalidations"]
+    # Every node was checked again in the last pass, so there must have been
+    # some revalidations
+    assert validators["is_valid_chain"]["revalidations"] > 0
+    assert data["adders"]["add_bubble"]["calls"] == len(ag.bubbles)
+    assert data["adders"]["add_pattern"]["calls"] == len(ag.chains) + len(
+        ag.cyclic_chains
+    )
@@ -0,0 +1,174 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+####
+# Scaling tests: these time parts of the pipeline on synthetic graphs of
+# doubling sizes, and fail if the time taken grows much faster than linearly
+# with the size of the graph -- in order to catch accidentally quadratic code.
+#
+# These take a while, so they're skipped unless the MGSC_SCALING_TESTS
+# environment variable is set (e.g. by "make scalingtest").
+
+import contextlib
+import io
+import math
+import os
+import pickle
+import time
+import pytest
+from metagenomescope.benchmarks import generator
+from metagenomescope.graph_objects import AssemblyGraph
+
+pytestmark = [
+    pytest.mark.scaling,
+    pytest.mark.skipif(
+        not os.environ.get("MGSC_SCALING_TESTS"),
+        reason="MGSC_SCALING_TESTS isn't set",
+    ),
+]
+
+# Numbers of nodes in the graphs we'll time things on
+SIZES = (1000, 2000, 4000, 8000)
+
+# If the time taken grows like (size ^ exponent), then linear code should
+# have an exponent of about 1 and quadratic code should have an exponent of
+# about 2. Exponents can be a bit above 1 for code that is linear in theory
+# (due to e.g. caching), so we leave some room.
+MAX_EXPONENT = 1.5
+
+
+def get_growth_exponent(sizes, times):
+    """Fits a line to log(time) vs. log(size), and returns its slope."""
+    xs = [math.log(s) for s in sizes]
+    ys = [math.log(t) for t in times]
+    x_mean = sum(xs) / len(xs)
+    y_mean = sum(ys) / len(ys)
+    numerator = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
+    denominator = sum((x - x_mean) * (x - x_mean) for x in xs)
+    return numerator / denominator
+
+
+def time_func(func, get_input, repeats=3):
+    """Returns the fastest time (in seconds) taken by func(get_input()).
+
+    get_input() is called before starting each timing, so that functions that
+    modify their input can be given a fresh copy every time.
+    """
+    best = None
+    for _ in range(repeats):
+        func_input = get_input()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start_time = time.perf_counter()
+            func(func_input)
+            elapsed = time.perf_counter() - start_time
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def check_growth(name, times):
+    exponent = get_growth_exponent(SIZES, times)
+    assert exponent <= MAX_EXPONENT, (
+        "{} took {} seconds on graphs with {} nodes: this grows like "
+        "n ^ {:.2f}".format(
+            name, ", ".join("{:.3f}".format(t) for t in times), SIZES, exponent
+        )
+    )
+
+
+def scale(asm_graph):
+    asm_graph.scale_nodes()
+    asm_graph.compute_node_dimensions()
+    asm_graph.scale_edges()
+
+
+def load_graph(filename):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return AssemblyGraph(filename)
+
+
+@pytest.fixture(scope="module")
+def graph_files(tmp_path_factory):
+    # We use LastGraph files, since (unlike GFA files) they're parsed quickly
+    # enough to not slow these tests down much. Small components keep layout
+    # fast.
+    graph_dir = tmp_path_factory.mktemp("scaling")
+    filenames = []
+    for num_nodes in SIZES:
+        filename = str(graph_dir / "graph{}.LastGraph".format(num_nodes))
+        generator.write_graph(
+            generator.generate_graph(num_nodes, component_size=100), filename
+        )
+        filenames.append(filename)
+    return filenames
+
+
+@pytest.fixture(scope="module")
+def parsed_graphs(graph_files):
+    # Pickled, so that we can make fresh copies of them quickly
+    return [pickle.dumps(load_graph(f)) for f in graph_files]
+
+
+@pytest.fixture(scope="module")
+def decomposed_graphs(parsed_graphs):
+    graphs = []
+    for data in parsed_graphs:
+        asm_graph = pickle.loads(data)
+        scale(asm_graph)
+        asm_graph.hierarchically_identify_patterns()
+        graphs.append(pickle.dumps(asm_graph))
+    return graphs
+
+
+def test_parse_scaling(graph_files):
+    times = [time_func(AssemblyGraph, lambda: f) for f in graph_files]
+    check_growth("Parsing", times)
+
+
+def test_scale_scaling(parsed_graphs):
+    times = [time_func(scale, lambda: pickle.loads(d)) for d in parsed_graphs]
+    check_growth("Scaling nodes and edges", times)
+
+
+def test_decomposition_scaling(parsed_graphs):
+    def decompose(asm_graph):
+        scale(asm_graph)
+        asm_graph.hierarchically_identify_patterns()
+
+    # Scaling is so much faster than decomposition that it doesn't really
+    # matter that we time it along with decomposition here
+    times = [
+        time_func(decompose, lambda: pickle.loads(d)) for d in parsed_graphs
+    ]
+    check_growth("Hierarchical decomposition", times)
+
+
+def test_layout_and_to_dict_scaling(decomposed_graphs):
+    layout_times = []
+    to_dict_times = []
+    for data in decomposed_graphs:
+        asm_graph = pickle.loads(data)
+        # Layout is slow enough that there isn't much noise in timing it
+        layout_times.append(
+            time_func(lambda g: g.layout(), lambda: asm_graph, repeats=1)
+        )
+        # to_dict() doesn't modify the graph, so we can reuse it
+        to_dict_times.append(
+            time_func(lambda g: g.to_dict(), lambda: asm_graph)
+        )
+    check_growth("Layout", layout_times)
+    check_growth("Conversion to a dict", to_dict_times)
@@ -0,0 +1,127 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+import pytest
+from metagenomescope import serve
+from metagenomescope.graph_objects import AssemblyGraph
+
+
+def get_full_and_on_demand(input_file, output_dir, **kwargs):
+    """Returns (the dict representation of a fully laid-out graph, an
+    OnDemandLayout for a decomposed copy of the same graph).
+    """
+    full_graph = AssemblyGraph(input_file, **kwargs)
+    full_graph.process()
+    # Round-trip through JSON, to convert tuples to lists, etc.
+    full = json.loads(full_graph.to_json())
+    asm_graph = AssemblyGraph(input_file, **kwargs)
+    asm_graph.decompose()
+    return full, serve.OnDemandLayout(asm_graph, output_dir)
+
+
+def test_on_demand_layout_matches_full_layout(tmp_path):
+    full, odl = get_full_and_on_demand(
+        "metagenomescope/tests/input/E_coli_LastGraph", str(tmp_path)
+    )
+    # Components that are mirror images of other components are laid out
+    # from scratch on demand, rather than by flipping their twin's layout.
+    twin_indices = odl.asm_graph.find_mirror_components(odl.ccs)
+    assert len(twin_indices) > 0
+    # Lay out components in reverse order, to check that laying out one
+    # component doesn't depend on the others having been laid out
+    num_components = len(full["components"])
+    for size_rank in range(num_components, 0, -1):
+        component = json.loads(json.dumps(odl.get_component(size_rank)))
+        full_component = full["components"][size_rank - 1]
+        if size_rank - odl.first_cc_num in twin_indices:
+            assert component["nodes"].keys() == full_component["nodes"].keys()
+        else:
+            assert component == full_component
+
+
+def test_get_index(tmp_path):
+    full_graph = AssemblyGraph("metagenomescope/tests/input/sample1.gfa")
+    full_graph.process()
+    full_index = full_graph.write_data_chunks(str(tmp_path / "full"))
+
+    asm_graph = AssemblyGraph("metagenomescope/tests/input/sample1.gfa")
+    asm_graph.decompose()
+    odl = serve.OnDemandLayout(asm_graph, str(tmp_path / "served"))
+    index = odl.get_index()
+    assert index["component_dir"] == "components"
+    assert len(index["components"]) == len(full_index["components"])
+    for cmp, full_cmp in zip(index["components"], full_index["components"]):
+        assert cmp["on_demand"]
+        for key in ("skipped", "num_nodes", "num_edges", "node_names"):
+            assert cmp[key] == full_cmp[key]
+    # Nothing should have been laid out yet
+    assert asm_graph.ctrl_pts.num_edges == 0
+    assert len(asm_graph.cc_num_to_bb) == 0
+
+
+def test_get_component_file(tmp_path):
+    asm_graph = AssemblyGraph("metagenomescope/tests/input/sample1.gfa")
+    asm_graph.decompose()
+    odl = serve.OnDemandLayout(asm_graph, str(tmp_path))
+    path = odl.get_component_file(1)
+    assert path == os.path.join(str(tmp_path), "components", "1.json")
+    with open(path, "r") as cf:
+        component = json.load(cf)
+    assert component["layout_engine"] == "dot"
+    assert len(component["bb"]) == 2
+
+    # The component shouldn't be laid out again
+    num_edges = asm_graph.ctrl_pts.num_edges
+    assert odl.get_component_file(1) == path
+    assert asm_graph.ctrl_pts.num_edges == num_edges
+
+    for bad_rank in (0, len(odl.ccs) + 1):
+        with pytest.raises(ValueError) as ei:
+            odl.get_component_file(bad_rank)
+        assert "There isn't a component with size rank {}".format(
+            bad_rank
+        ) in str(ei.value)
+
+
+def test_server(tmp_path):
+    asm_graph = AssemblyGraph("metagenomescope/tests/input/sample1.gfa")
+    asm_graph.decompose()
+    odl = serve.OnDemandLayout(asm_graph, str(tmp_path), "columnar")
+    (tmp_path / "index.html").write_text("hi")
+    server = serve.make_server(odl, "127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        url = "http://127.0.0.1:{}/".format(server.server_address[1])
+        with urllib.request.urlopen(url + "index.html") as resp:
+            assert resp.read() == b"hi"
+        with urllib.request.urlopen(url + "components/2.json?x=1") as resp:
+            component = json.loads(resp.read())
+        assert component["columnar"]
+        assert os.path.exists(str(tmp_path / "components" / "2.json"))
+        with pytest.raises(urllib.error.HTTPError) as ei:
+            urllib.request.urlopen(url + "components/100.json")
+        assert ei.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
@@ -0,0 +1,102 @@
+# Copyright (C) 2016-- Marcus Fedarko, Jay Ghurye, Todd Treangen, Mihai Pop
+# Authored by Marcus Fedarko
+#
+# This file is part of MetagenomeScope.
+#
+# MetagenomeScope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# MetagenomeScope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with MetagenomeScope.  If not, see <http://www.gnu.org/licenses/>.
+import os
+import subprocess
+import sys
+import time
+import metagenomescope
+
+# Directory containing the metagenomescope package, so that the subprocesses
+# below can import it even if it isn't installed
+ROOT_DIR = os.path.dirname(os.path.dirname(metagenomescope.__file__))
+
+# Dependencies that take a while to import, and that shouldn't be imported
+# until they're actually needed
+HEAVY_MODULES = (
+    "networkx",
+    "numpy",
+    "jinja2",
+    "gfapy",
+    "pyfastg",
+    "pygraphviz",
+)
+
+
+def run_python(code):
+    """Runs some Python code in a fresh interpreter, and returns its stdout
+    and the number of seconds this took.
+    """
+    start_time = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT_DIR,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    return out.stdout.decode(), time.perf_counter() - start_time
+
+
+def get_imported_heavy_modules(code):
+    stdout, _ = run_python(
+        "import sys\n"
+        "{}\n"
+        "print(' '.join(m for m in {} if m in sys.modules))".format(
+            code, HEAVY_MODULES
+        )
+    )
+    return stdout.split()
+
+
+def test_cli_imports_no_heavy_modules():
+    assert get_imported_heavy_modules("import metagenomescope._cli") == []
+
+
+def test_cli_help_is_faster_than_importing_pipeline():
+    help_code = (
+        "from metagenomescope._cli import run_script\n"
+        "try:\n"
+        "    run_script(['-h'])\n"
+        "except SystemExit:\n"
+        "    pass"
+    )
+    stdout, help_time = run_python(help_code)
+    assert "Visualizes an assembly graph" in stdout
+    _, pipeline_time = run_python("import metagenomescope.main")
+    # Both of these include the time taken to start Python, so this isn't as
+    # strict as it may look
+    assert help_time < pipeline_time
+
+
+def test_parsing_only_imports_needed_modules():
+    modules = get_imported_heavy_modules(
+        "from metagenomescope import assembly_graph_parser as agp\n"
+        "agp.parse('metagenomescope/tests/input/cycletest_LastGraph')"
+    )
+    assert "networkx" in modules
+    assert "gfapy" not in modules
+    assert "pyfastg" not in modules
+    assert "pygraphviz" not in modules
+    assert "jinja2" not in modules
+
+    modules = get_imported_heavy_modules(
+        "from metagenomescope import assembly_graph_parser as agp\n"
+        "agp.parse('metagenomescope/tests/input/loop.gfa')"
+    )
+    assert "gfapy" in modules
+    assert "pyfastg" not in modules
@@ -75,6 +75,13 @@ setup(
         "jinja2",
     ],
     extras_require={"dev": ["pytest", "pytest-cov", "flake8", "black"]},
-    entry_points={"console_scripts": ["mgsc=metagenomescope._cli:run_script"]},
+    entry_points={
+        "console_scripts": [
+            "mgsc=metagenomescope._cli:run_script",
+            "mgsc-batch=metagenomescope._cli:run_batch_script",
+            "mgsc-serve=metagenomescope._cli:run_serve_script",
+            "mgsc-overview=metagenomescope._cli:run_overview_script",
+        ]
+    },
     zip_safe=False,
 )